@@ -6,12 +6,28 @@ import sys
 from pathlib import Path
 from datetime import datetime
 from collections import deque, Counter
+from queue import Queue, Full
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+from functools import lru_cache
 import re
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 import time
 import gzip
 import hashlib
 import csv
+import os
+import http.client
+import ssl
+import threading
+import sqlite3
+import zlib
+import base64
+import unicodedata
+import mmap
+import multiprocessing
+import math
+import heapq
+from array import array
 
 """
 Bluesky follow/unfollow/search tool (batched, v3)
@@ -22,31 +38,649 @@ while keeping the batched streaming structure across modes.
 Modes:
   - following     : review/manage the accounts you already follow
   - searching     : discover accounts by keyword search
-  - degreesearch  : breadth-first exploration across followers of matching seeds
-  - wordmap       : build a word frequency map from bios/descriptions (followers or following)
+  - degreesearch  : best-first exploration across followers of matching seeds
+  - wordmap       : build a word frequency map from bios/descriptions (followers or following;
+                    --actors for many accounts at once)
+  - wordmerge     : combine per-actor wordmap counts and rank distinctive terms (offline)
+  - review        : batch-review candidates a --policy run deferred ('ask')
+  - vecexport     : expand a sharded vector store into per-account vector files (offline)
+  - crawl         : save a compact follow-graph snapshot (interned IDs, CSR arrays)
+  - graph         : neighbours, degrees and k-hop queries on a crawl snapshot (offline)
+  - mutuals       : diff your follows against your followers (mutuals, not following back, fans)
 
 Key structure:
   * Pagination functions yield batches of size --limit.
   * Actions occur batch-by-batch, not after preloading huge lists.
 """
 
+# ------------------------- HTTP transports -------------------------
+# Every XRPC call goes through run_curl(), which delegates the wire work to a
+# pluggable transport.  Transports return (status, headers, body_text) and
+# raise RuntimeError on connection-level failures; run_curl() keeps the JSON
+# parsing and XRPC error semantics identical for all of them.
+
+class CurlTransport:
+    """
+    Original backend: one `curl` subprocess per request (no connection reuse).
+    Kept as a fallback for environments where the in-process stack misbehaves.
+    """
+    name = "curl"
+
+    def request(self, method, url, headers=None, data=None):
+        cmd = ["curl", "-sS", "-D", "-", "-X", method, url, "-H", "Content-Type: application/json"]
+        if headers:
+            for k, v in headers.items():
+                cmd += ["-H", f"{k}: {v}"]
+        if data is not None:
+            cmd += ["-d", json.dumps(data)]
+        res = subprocess.run(cmd, capture_output=True, text=True)
+        if res.returncode != 0:
+            raise RuntimeError(f"curl failed: {res.stderr.strip()}")
+        return self._split_response(res.stdout)
+
+    @staticmethod
+    def _split_response(out):
+        # `-D -` prepends the header block(s) to the body; interim responses
+        # (e.g. "100 Continue") each contribute their own block.
+        status, resp_headers, rest = None, {}, out
+        while rest.startswith("HTTP/"):
+            head, sep, rest = rest.partition("\r\n\r\n")
+            if not sep:
+                head, sep, rest = head.partition("\n\n")
+            lines = head.splitlines()
+            try:
+                status = int(lines[0].split()[1])
+            except (IndexError, ValueError):
+                status = None
+            resp_headers = {}
+            for line in lines[1:]:
+                k, _, v = line.partition(":")
+                resp_headers[k.strip().lower()] = v.strip()
+        return status, resp_headers, rest
+
+    def close(self):
+        pass
+
+class PooledTransport:
+    """
+    Stdlib (http.client) transport with a per-host pool of keep-alive
+    connections, so paging and bulk lookups pay the TCP+TLS handshake once.
+    Thread-safe: each request checks a connection out of the pool.
+    """
+    name = "pooled"
+
+    def __init__(self, max_idle_per_host=8, timeout=60.0):
+        self.max_idle_per_host = max(1, int(max_idle_per_host))
+        self.timeout = float(timeout)
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_ctx = ssl.create_default_context()
+
+    def _new_conn(self, scheme, netloc):
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_ctx)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _acquire(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self._new_conn(scheme, netloc), False
+
+    def _release(self, scheme, netloc, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, headers=None, data=None):
+        parts = urlsplit(url)
+        scheme, netloc = parts.scheme.lower(), parts.netloc
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        hdrs = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+        if headers:
+            hdrs.update(headers)
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        retried = False
+        while True:
+            conn, reused = self._acquire(scheme, netloc)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=hdrs)
+                sent = True
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if reused and not retried and (not sent or method.upper() == "GET"):
+                    # The server probably dropped an idle keep-alive socket: retry
+                    # once on a fresh one, but never re-send a POST it may have seen.
+                    retried = True
+                    continue
+                raise RuntimeError(f"{self.name} request failed: {e}")
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(scheme, netloc, conn)
+            if resp_headers.get("content-encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            return resp.status, resp_headers, raw.decode("utf-8", "replace")
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+class HttpxTransport:
+    """
+    httpx-based transport with HTTP/2 multiplexing (requires `httpx[http2]`).
+    """
+    name = "http2"
+
+    def __init__(self, timeout=60.0, max_connections=16):
+        import httpx
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    def request(self, method, url, headers=None, data=None):
+        hdrs = {"Content-Type": "application/json"}
+        if headers:
+            hdrs.update(headers)
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        try:
+            resp = self._client.request(method, url, headers=hdrs, content=body)
+        except self._httpx.HTTPError as e:
+            raise RuntimeError(f"{self.name} request failed: {e}")
+        return resp.status_code, {k.lower(): v for k, v in resp.headers.items()}, resp.text
+
+    def close(self):
+        self._client.close()
+
+TRANSPORT_CHOICES = ["auto", "http2", "pooled", "curl"]
+_TRANSPORT = None
+
+def make_transport(name="auto"):
+    """
+    Build a transport by name.  'auto' prefers HTTP/2 (if httpx and h2 are
+    installed) and otherwise falls back to the stdlib keep-alive pool.
+    """
+    if name == "curl":
+        return CurlTransport()
+    if name == "pooled":
+        return PooledTransport()
+    if name in ("auto", "http2"):
+        try:
+            import h2  # noqa: F401  (httpx needs it for http2=True)
+            return HttpxTransport()
+        except ImportError:
+            if name == "http2":
+                raise SystemExit(
+                    "The 'http2' transport requires httpx with HTTP/2 support. "
+                    "Install it with:  pip install 'httpx[http2]'"
+                )
+            return PooledTransport()
+    raise ValueError(f"Unknown transport: {name}")
+
+def set_transport(transport):
+    """Install `transport` (an instance or a name) as the process-wide backend."""
+    global _TRANSPORT
+    if isinstance(transport, str):
+        transport = make_transport(transport)
+    if _TRANSPORT is not None and _TRANSPORT is not transport:
+        _TRANSPORT.close()
+    _TRANSPORT = transport
+    return transport
+
+def get_transport():
+    global _TRANSPORT
+    if _TRANSPORT is None:
+        _TRANSPORT = make_transport("auto")
+    return _TRANSPORT
+
+# ------------------------- Rate limiting -------------------------
+class TokenBucket:
+    """
+    Token bucket that hands out reservations: acquire() takes a token (the
+    balance may go negative) and sleeps for the time needed to earn it back.
+    `rate=None` means "not known yet" and does not pace.
+    """
+
+    def __init__(self, rate=None, burst=10):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        else:
+            self.tokens = self.capacity
+        self._stamp = now
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self.blocked_until - now)
+            if self.tokens < 0 and self.rate:
+                wait = max(wait, -self.tokens / self.rate)
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def retune(self, rate=None, remaining=None, block_for=None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if rate is not None:
+                self.rate = max(rate, 1e-3)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+            if block_for:
+                self.blocked_until = max(self.blocked_until, now + block_for)
+
+class RateLimiter:
+    """
+    Paces requests separately for reads (GET) and writes (POST) using the
+    server's `ratelimit-limit/remaining/reset` headers: the remaining budget
+    is spread evenly over the time left in the window, so long runs settle
+    at the highest rate the server allows instead of bursting into 429s.
+    """
+
+    # Keep a little headroom below the advertised budget.
+    SAFETY = 0.9
+
+    def __init__(self, burst=10):
+        self.buckets = {"read": TokenBucket(burst=burst), "write": TokenBucket(burst=burst)}
+        self.throttled = 0
+        # Consecutive 429s, for backing off when no usable reset header came.
+        self._streak = 0
+
+    @staticmethod
+    def kind_of(method):
+        return "read" if method.upper() == "GET" else "write"
+
+    def acquire(self, method):
+        return self.buckets[self.kind_of(method)].acquire()
+
+    @staticmethod
+    def _window_left(reset):
+        # bsky.social sends an epoch timestamp; the IETF draft uses delta-seconds.
+        reset = float(reset)
+        return reset - time.time() if reset > 1e9 else reset
+
+    @classmethod
+    def _header_seconds(cls, headers, name):
+        # Seconds encoded in a reset/retry-after header; None when absent or
+        # unparseable (e.g. an HTTP-date Retry-After).
+        value = headers.get(name)
+        if value is None:
+            return None
+        try:
+            return max(1.0, cls._window_left(value))
+        except ValueError:
+            return None
+
+    def update(self, method, status, headers):
+        bucket = self.buckets[self.kind_of(method)]
+        left = self._header_seconds(headers, "ratelimit-reset")
+        try:
+            remaining = headers.get("ratelimit-remaining")
+            remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+        if status == 429:
+            self.throttled += 1
+            self._streak += 1
+            delay = left if left is not None else self._header_seconds(headers, "retry-after")
+            if delay is None:
+                delay = min(60.0, 2.0 * 2 ** (self._streak - 1))
+            delay = min(RATE_LIMIT_MAX_WAIT, delay)
+            bucket.retune(remaining=0, block_for=delay)
+            return delay
+        self._streak = 0
+        if remaining is not None and left is not None:
+            bucket.retune(rate=self.SAFETY * remaining / left, remaining=remaining,
+                          block_for=min(RATE_LIMIT_MAX_WAIT, left) if remaining <= 0 else None)
+        return 0.0
+
+    def summary(self):
+        r, w = self.buckets["read"], self.buckets["write"]
+        return (f"Rate limiter: waited read={r.waited:.1f}s, write={w.waited:.1f}s; "
+                f"429 responses={self.throttled}")
+
+_RATE_LIMITER = None
+# How many times run_curl re-sends a request answered with 429.
+RATE_LIMIT_RETRIES = 5
+# Longest single sleep spent waiting out a server rate-limit window (seconds).
+RATE_LIMIT_MAX_WAIT = 300.0
+
+def set_rate_limiter(limiter):
+    """Install (or disable, with None) the process-wide RateLimiter."""
+    global _RATE_LIMITER
+    _RATE_LIMITER = limiter
+    return limiter
+
+def get_rate_limiter():
+    return _RATE_LIMITER
+
+# ------------------------- Metrics -------------------------
+# One process-wide registry: run_curl records per-endpoint request counts,
+# latency histograms, bytes and retries; modes add their own counters and
+# report progress through Progress.  main() can export everything as a JSON
+# summary and/or a Prometheus textfile (--metrics-json / --metrics-prom).
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus-style upper bounds, in seconds)."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, buckets=BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _prom_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and histograms keyed by name and
+    labels.  Exports: snapshot() (JSON-ready dict), prometheus() (text
+    exposition format), and export() which (re)writes the configured files.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+        self.json_path = None
+        self.prom_path = None
+        self.export_interval = 60.0
+        self.progress_interval = 10.0
+        self._last_export = time.monotonic()
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    def value(self, name, **labels):
+        """Sum of a counter over every series matching `labels`."""
+        want = set(_label_key(labels))
+        with self._lock:
+            return sum(v for k, v in self.counters.get(name, {}).items() if want <= set(k))
+
+    def snapshot(self):
+        with self._lock:
+            hist = {}
+            for name, series in self.histograms.items():
+                hist[name] = [{
+                    "labels": dict(k), "count": h.count, "sum": round(h.sum, 6),
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                    "buckets": dict(zip([str(b) for b in h.bounds] + ["+Inf"], h.counts)),
+                } for k, h in series.items()]
+            return {
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "elapsed_sec": round(time.time() - self.started, 3),
+                "counters": {n: [{"labels": dict(k), "value": v} for k, v in s.items()]
+                             for n, s in self.counters.items()},
+                "gauges": {n: [{"labels": dict(k), "value": v} for k, v in s.items()]
+                           for n, s in self.gauges.items()},
+                "histograms": hist,
+            }
+
+    def prometheus(self):
+        out = []
+        with self._lock:
+            for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted(table):
+                    out.append(f"# TYPE {name} {kind}")
+                    for key, v in sorted(table[name].items()):
+                        out.append(f"{name}{_prom_labels(key)} {v}")
+            for name in sorted(self.histograms):
+                out.append(f"# TYPE {name} histogram")
+                for key, h in sorted(self.histograms[name].items()):
+                    cum = 0
+                    for bound, n in zip([str(b) for b in h.bounds] + ["+Inf"], h.counts):
+                        cum += n
+                        out.append(f"{name}_bucket{_prom_labels(key, [('le', bound)])} {cum}")
+                    out.append(f"{name}_sum{_prom_labels(key)} {h.sum:.6f}")
+                    out.append(f"{name}_count{_prom_labels(key)} {h.count}")
+        out.append("# TYPE bsky_run_elapsed_seconds gauge")
+        out.append(f"bsky_run_elapsed_seconds {time.time() - self.started:.3f}")
+        return "\n".join(out) + "\n"
+
+    def export(self, force=True):
+        """Write the JSON/Prometheus files if configured (throttled unless forced)."""
+        now = time.monotonic()
+        if not force and now - self._last_export < self.export_interval:
+            return
+        self._last_export = now
+        if self.json_path:
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_text_atomic(self.json_path, json.dumps(self.snapshot(), indent=2))
+        if self.prom_path:
+            self.prom_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_text_atomic(self.prom_path, self.prometheus())
+
+    def summary(self):
+        requests = self.value("bsky_http_requests_total")
+        errors = self.value("bsky_http_errors_total")
+        retries = self.value("bsky_http_retries_total")
+        received = self.value("bsky_http_response_bytes_total")
+        with self._lock:
+            merged = Histogram()
+            for h in self.histograms.get("bsky_http_request_duration_seconds", {}).values():
+                merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+                merged.count += h.count
+        ms = lambda q: "-" if merged.quantile(q) is None else f"<={merged.quantile(q) * 1000:g}ms"
+        return (f"HTTP: {requests} request(s), {errors} error(s), {retries} retr(ies), "
+                f"{received / 1e6:.1f} MB received; latency p50 {ms(0.5)}, p95 {ms(0.95)}")
+
+_METRICS = Metrics()
+
+def set_metrics(metrics):
+    """Replace the process-wide Metrics registry (e.g. a fresh one per run)."""
+    global _METRICS
+    _METRICS = metrics
+    return metrics
+
+def get_metrics():
+    return _METRICS
+
+def _xrpc_endpoint(url):
+    # ".../xrpc/app.bsky.graph.getFollows?actor=..." -> "app.bsky.graph.getFollows"
+    return urlsplit(url).path.rsplit("/", 1)[-1] or "unknown"
+
+class Progress:
+    """
+    Per-mode progress: advance() counts processed accounts into the metrics
+    registry and, at most every `interval` seconds, prints the count, the
+    throughput and (when `total` is known, e.g. from followsCount) an ETA.
+    `start` resumes the count (e.g. from a checkpoint) without skewing the rate.
+    """
+
+    def __init__(self, mode, total=None, unit="accounts", interval=None, start=0):
+        self.mode = mode
+        self.total = total if total and total > 0 else None
+        self.unit = unit
+        self.interval = get_metrics().progress_interval if interval is None else interval
+        self.done = self.start = start
+        self.started = time.monotonic()
+        self._last = self.started
+        metrics = get_metrics()
+        if self.total:
+            metrics.set("bsky_progress_total", self.total, mode=mode, unit=unit)
+
+    def advance(self, n=1):
+        self.done += n
+        metrics = get_metrics()
+        metrics.inc("bsky_items_processed_total", n, mode=self.mode, unit=self.unit)
+        now = time.monotonic()
+        if self.interval and now - self._last >= self.interval:
+            self._last = now
+            sys.stderr.write(self.line() + "\n")
+            sys.stderr.flush()
+            metrics.set("bsky_progress_rate", round(self.rate(), 3), mode=self.mode, unit=self.unit)
+            metrics.export(force=False)
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return (self.done - self.start) / elapsed if elapsed > 0 else 0.0
+
+    def line(self):
+        rate = self.rate()
+        text = f"[{self.mode}] {self.done:,}"
+        if self.total:
+            text += f"/{self.total:,} {self.unit} ({min(100.0, 100.0 * self.done / self.total):.1f}%)"
+        else:
+            text += f" {self.unit}"
+        text += f", {rate:.1f}/s"
+        if self.total and rate > 0 and self.done < self.total:
+            left = int((self.total - self.done) / rate)
+            text += f", ETA {left // 3600}h{left % 3600 // 60:02d}m{left % 60:02d}s"
+        return text
+
+    def finish(self):
+        if self.done > self.start:
+            sys.stderr.write(self.line() + " (done)\n")
+            sys.stderr.flush()
+
 # ------------------------- HTTP helper -------------------------
+class XrpcError(RuntimeError):
+    """An XRPC error response; `error` is the server's error code (e.g. ExpiredToken)."""
+
+    def __init__(self, message, error=None, status=None, headers=None):
+        super().__init__(message)
+        self.error = error
+        self.status = status
+        self.headers = headers or {}
+
+# Error codes that mean "get a new accessJwt and try again".
+TOKEN_ERRORS = ("ExpiredToken", "InvalidToken")
+
 def run_curl(method, url, headers=None, data=None):
-    cmd = ["curl", "-sS", "-X", method, url, "-H", "Content-Type: application/json"]
-    if headers:
-        for k, v in headers.items():
-            cmd += ["-H", f"{k}: {v}"]
-    if data is not None:
-        cmd += ["-d", json.dumps(data)]
-    res = subprocess.run(cmd, capture_output=True, text=True)
-    if res.returncode != 0:
-        raise RuntimeError(f"curl failed: {res.stderr.strip()}")
+    """
+    Issue one XRPC call through the active transport and return parsed JSON.
+    (The name predates the pluggable transports; 'curl' is just one backend.)
+    With a RateLimiter installed, calls are paced and 429s wait for the
+    window to reset and are retried instead of raising.
+    With a Session installed, requests made with any of its access tokens
+    use the current one, and an ExpiredToken/InvalidToken (or any 401)
+    answer refreshes it and retries once.
+    """
+    session = get_active_session()
+    if session is None:
+        return _xrpc_request(method, url, headers, data)
+    sent = session.authorize(headers)
+    try:
+        return _xrpc_request(method, url, sent, data)
+    except XrpcError as e:
+        if (e.error not in TOKEN_ERRORS and e.status != 401) or not session.owns(sent):
+            raise
+        get_metrics().inc("bsky_http_retries_total", endpoint=_xrpc_endpoint(url), reason=e.error or str(e.status))
+        session.refresh(stale=sent)
+        return _xrpc_request(method, url, session.authorize(headers), data)
+
+def _xrpc_request(method, url, headers, data):
+    limiter = get_rate_limiter()
+    metrics = get_metrics()
+    endpoint = _xrpc_endpoint(url)
+    attempt = 0
+    while True:
+        if limiter is not None:
+            waited = limiter.acquire(method)
+            if waited:
+                metrics.inc("bsky_ratelimit_wait_seconds_total", waited, kind=limiter.kind_of(method))
+        t0 = time.perf_counter()
+        try:
+            status, resp_headers, body = get_transport().request(method, url, headers=headers, data=data)
+        except Exception:
+            metrics.inc("bsky_http_requests_total", endpoint=endpoint, status="transport_error")
+            raise
+        metrics.observe("bsky_http_request_duration_seconds", time.perf_counter() - t0, endpoint=endpoint)
+        metrics.inc("bsky_http_requests_total", endpoint=endpoint, status=status)
+        metrics.inc("bsky_http_response_bytes_total", len(body.encode("utf-8")) if body else 0, endpoint=endpoint)
+        if data is not None:
+            metrics.inc("bsky_http_request_bytes_total", len(json.dumps(data).encode("utf-8")), endpoint=endpoint)
+        if limiter is None:
+            break
+        limiter.update(method, status, resp_headers)
+        if status != 429 or attempt >= RATE_LIMIT_RETRIES:
+            break
+        attempt += 1
+        metrics.inc("bsky_http_retries_total", endpoint=endpoint, reason="429")
     try:
-        out = json.loads(res.stdout) if res.stdout else {}
+        out = json.loads(body) if body else {}
     except json.JSONDecodeError:
-        raise RuntimeError(f"Non-JSON response from {url}: {res.stdout[:300]}")
+        metrics.inc("bsky_http_errors_total", endpoint=endpoint, error="NonJSON")
+        raise RuntimeError(f"Non-JSON response from {url}: {body[:300]}")
     if isinstance(out, dict) and "error" in out:
-        raise RuntimeError(f"{method} {url} -> {out.get('error')}: {out.get('message')}")
+        metrics.inc("bsky_http_errors_total", endpoint=endpoint, error=out.get("error"))
+        raise XrpcError(f"{method} {url} -> {out.get('error')}: {out.get('message')}",
+                        error=out.get("error"), status=status, headers=resp_headers)
     return out
 
 # ------------------------- IO helpers -------------------------
@@ -72,6 +706,11 @@ def read_keywords(path: Path):
 
 # ------------------------- ATProto helpers -------------------------
 def get_session(service, identifier, password):
+    access, _, did, handle = create_session(service, identifier, password)
+    return access, did, handle
+
+def create_session(service, identifier, password):
+    """com.atproto.server.createSession -> (accessJwt, refreshJwt, did, handle)."""
     url = f"{service}/xrpc/com.atproto.server.createSession"
     payload = {"identifier": identifier, "password": password}
     out = run_curl("POST", url, data=payload)
@@ -80,89 +719,301 @@ def get_session(service, identifier, password):
     handle = out.get("handle") or identifier
     if not access or not did:
         raise RuntimeError("Login succeeded but did not return accessJwt and/or did")
-    return access, did, handle
+    return access, out.get("refreshJwt"), did, handle
+
+def _jwt_lifetime(token):
+    # (iat, exp) claims of a JWT in epoch seconds; either is None when unreadable.
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError, TypeError):
+        return None, None
+    if not isinstance(claims, dict):
+        return None, None
+    iat, exp = claims.get("iat"), claims.get("exp")
+    return (float(iat) if isinstance(iat, (int, float)) else None,
+            float(exp) if isinstance(exp, (int, float)) else None)
+
+class Session:
+    """
+    Logged-in session that outlives one run.  Tokens are cached per
+    service + identifier in a JSON file only the current user can read
+    (mode 0600, folder 0700); a cached session is reused instead of calling
+    createSession.  The accessJwt is refreshed via refreshSession shortly
+    before its `exp`, or when the server answers ExpiredToken; if the
+    refreshJwt is no longer accepted, the password is used to log in again.
+    """
+
+    # Refresh this many seconds before the accessJwt expires (at most a
+    # quarter of the token's lifetime, for short-lived tokens).
+    REFRESH_MARGIN = 120.0
+
+    def __init__(self, service, identifier, password=None, cache_path=None):
+        self.service = service
+        self.identifier = identifier
+        self._password = password
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.access = self.refresh_jwt = self.did = self.handle = None
+        self.reused = False
+        self._issued = set()  # every accessJwt this session handed out
+        self._lock = threading.RLock()
+
+    @property
+    def _cache_key(self):
+        return f"{self.service}|{self.identifier.lower()}"
+
+    def _set(self, access, refresh_jwt, did, handle):
+        self.access, self.refresh_jwt, self.did, self.handle = access, refresh_jwt, did, handle
+        self._issued.add(access)
+
+    def open(self):
+        """Reuse the cached session when present, otherwise log in."""
+        cached = self._load_cache().get(self._cache_key)
+        if cached and cached.get("accessJwt") and cached.get("did"):
+            self._set(cached["accessJwt"], cached.get("refreshJwt"), cached["did"], cached.get("handle"))
+            self.reused = True
+            self.ensure_fresh()
+        else:
+            self.login()
+        return self
+
+    def login(self):
+        if not self._password:
+            raise RuntimeError("Session expired and no password is available to log in again")
+        with self._lock:
+            self._set(*create_session(self.service, self.identifier, self._password))
+            self._save_cache()
+
+    def refresh(self, stale=None):
+        """
+        Swap in a new accessJwt.  `stale` (headers or a token) skips the call
+        when another thread already refreshed past it.
+        """
+        with self._lock:
+            if stale is not None and self._bearer(stale) not in (None, self.access):
+                return
+            if self.refresh_jwt:
+                try:
+                    out = run_curl("POST", f"{self.service}/xrpc/com.atproto.server.refreshSession",
+                                   headers={"Authorization": f"Bearer {self.refresh_jwt}"})
+                    if out.get("accessJwt"):
+                        self._set(out["accessJwt"], out.get("refreshJwt") or self.refresh_jwt,
+                                  out.get("did") or self.did, out.get("handle") or self.handle)
+                        self._save_cache()
+                        get_metrics().inc("bsky_session_refreshes_total", how="refreshSession")
+                        return
+                except XrpcError as e:
+                    if e.error not in TOKEN_ERRORS:
+                        raise
+            self.login()
+            get_metrics().inc("bsky_session_refreshes_total", how="createSession")
+
+    def ensure_fresh(self):
+        iat, exp = _jwt_lifetime(self.access) if self.access else (None, None)
+        if exp is None:
+            return
+        margin = self.REFRESH_MARGIN if iat is None else min(self.REFRESH_MARGIN, (exp - iat) / 4)
+        if exp - time.time() < margin:
+            self.refresh(stale=self.access)
+
+    @staticmethod
+    def _bearer(headers_or_token):
+        if isinstance(headers_or_token, str):
+            return headers_or_token
+        auth = (headers_or_token or {}).get("Authorization") or ""
+        return auth[7:] if auth.startswith("Bearer ") else None
+
+    def owns(self, headers):
+        return self._bearer(headers) in self._issued
+
+    def authorize(self, headers):
+        """`headers` with an outdated accessJwt of this session replaced by a fresh one."""
+        if not self.owns(headers):
+            return headers
+        self.ensure_fresh()
+        if self._bearer(headers) == self.access:
+            return headers
+        return {**headers, "Authorization": f"Bearer {self.access}"}
+
+    def _load_cache(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8")) or {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        sessions = self._load_cache()
+        sessions[self._cache_key] = {
+            "did": self.did, "handle": self.handle,
+            "accessJwt": self.access, "refreshJwt": self.refresh_jwt,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(sessions, fh, indent=2)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.cache_path)
+
+_SESSION = None
+
+def set_active_session(session):
+    """Install (or clear, with None) the Session run_curl refreshes tokens through."""
+    global _SESSION
+    _SESSION = session
+    return session
+
+def get_active_session():
+    return _SESSION
 
 # ------------------------- Pagination helpers (generators) -------------------------
-def iter_follows(service, access_jwt, actor_handle, batch_size=100, max_pages=1000):
+# Default number of pages fetched ahead of the consumer (see read_ahead).
+PREFETCH_PAGES = 2
+
+def read_ahead(iterable, depth=PREFETCH_PAGES):
     """
-    Yield lists of follows (accounts you follow) in batches of size `batch_size`.
+    Iterate `iterable` on a background thread, keeping at most `depth` items
+    buffered ahead of the consumer.  Producer exceptions are re-raised in the
+    consumer; closing the generator early (break, max_pages reached) stops
+    the producer after the item it is currently fetching.
+    """
+    if depth <= 0:
+        yield from iterable
+        return
+    buf = Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buf.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    break
+            else:
+                put((done, None))
+        except BaseException as e:
+            put((done, e))
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, err = buf.get()
+            if item is done:
+                if err is not None:
+                    raise err
+                return
+            yield item
+    finally:
+        stop.set()
+
+def _paginate(access_jwt, base_url, query, key, batch_size, max_pages, cursor=None, stop_on_repeat=True):
+    """
+    Walk an XRPC list endpoint and yield (batch, next_cursor) per page;
+    next_cursor is None on the last page.  An empty page ends the listing
+    and is yielded as ([], None); stopping at `max_pages` leaves the last
+    next_cursor set.
     """
-    base_url = f"{service}/xrpc/app.bsky.graph.getFollows"
     headers = {"Authorization": f"Bearer {access_jwt}"}
-    cursor = None
     pages = 0
     while pages < max_pages:
-        q = f"?actor={actor_handle}&limit={max(1, int(batch_size))}"
+        q = f"?{query}&limit={max(1, int(batch_size))}"
         if cursor:
             q += f"&cursor={cursor}"
         out = run_curl("GET", base_url + q, headers=headers)
-        batch = out.get("follows", []) or []
+        batch = out.get(key, []) or []
         if not batch:
+            yield [], None
             break
-        yield batch
         cursor_new = out.get("cursor")
+        if stop_on_repeat and cursor_new == cursor:
+            cursor_new = None
+        yield batch, (cursor_new or None)
         pages += 1
-        if not cursor_new or cursor_new == cursor:
+        if not cursor_new:
             break
         cursor = cursor_new
 
-def iter_followers(service, access_jwt, actor, batch_size=100, max_pages=1000):
+def _iter_pages(pages, on_cursor, prefetch, cache_profiles=False):
+    # on_cursor runs in the consumer's thread, so checkpoints only ever see
+    # cursors of pages that have actually been handed out.
+    for batch, next_cursor in read_ahead(pages, prefetch):
+        if on_cursor:
+            on_cursor(next_cursor)
+        if batch:
+            if cache_profiles:
+                cache_page_profiles(batch)
+            yield batch
+
+def iter_follows(service, access_jwt, actor_handle, batch_size=100, max_pages=1000, cursor=None, on_cursor=None,
+                 prefetch=0):
+    """
+    Yield lists of follows (accounts you follow) in batches of size `batch_size`.
+    `cursor` resumes from a saved position.  If given, `on_cursor(next)` is
+    called before each page is yielded with the cursor of the following page
+    (None once the listing is exhausted), for checkpointing; it is left set
+    when the walk stops at `max_pages`.
+    `prefetch` > 0 fetches up to that many pages ahead in the background.
+    """
+    pages = _paginate(access_jwt, f"{service}/xrpc/app.bsky.graph.getFollows", f"actor={actor_handle}",
+                      "follows", batch_size, max_pages, cursor)
+    return _iter_pages(pages, on_cursor, prefetch, cache_profiles=True)
+
+def iter_followers(service, access_jwt, actor, batch_size=100, max_pages=1000, cursor=None, on_cursor=None,
+                   prefetch=0):
     """
     Yield the 'followers' list page-by-page (batches of size <= batch_size).
+    `cursor`, `on_cursor` and `prefetch` behave as in iter_follows.
     """
-    base_url = f"{service}/xrpc/app.bsky.graph.getFollowers"
-    headers = {"Authorization": f"Bearer {access_jwt}"}
-    cursor = None
-    pages = 0
-    while pages < max_pages:
-        q = f"?actor={actor}&limit={max(1, int(batch_size))}"
-        if cursor:
-            q += f"&cursor={cursor}"
-        out = run_curl("GET", base_url + q, headers=headers)
-        batch = out.get("followers", []) or []
-        if not batch:
-            break
-        yield batch
-        cursor_new = out.get("cursor")
-        pages += 1
-        if not cursor_new or cursor_new == cursor:
-            break
-        cursor = cursor_new
+    pages = _paginate(access_jwt, f"{service}/xrpc/app.bsky.graph.getFollowers", f"actor={actor}",
+                      "followers", batch_size, max_pages, cursor)
+    return _iter_pages(pages, on_cursor, prefetch, cache_profiles=True)
 
-def iter_search_actors(service, access_jwt, keyword, batch_size=50, max_pages=5):
+def iter_search_actors(service, access_jwt, keyword, batch_size=50, max_pages=5, prefetch=0):
     """
     Search actors by keyword and yield results in batches (pages).
     """
-    base_url = f"{service}/xrpc/app.bsky.actor.searchActors"
-    headers = {"Authorization": f"Bearer {access_jwt}"}
-    cursor = None
-    pages = 0
-    while pages < max_pages:
-        q = f"?q={keyword}&limit={max(1, int(batch_size))}"
-        if cursor:
-            q += f"&cursor={cursor}"
-        out = run_curl("GET", base_url + q, headers=headers)
-        batch = out.get("actors", []) or []
-        if not batch:
-            break
-        yield batch
-        cursor = out.get("cursor")
-        pages += 1
-        if not cursor:
-            break
+    pages = _paginate(access_jwt, f"{service}/xrpc/app.bsky.actor.searchActors", f"q={quote(keyword)}",
+                      "actors", batch_size, max_pages, stop_on_repeat=False)
+    return _iter_pages(pages, None, prefetch)
 
 # ------------------------- Record helpers -------------------------
-def delete_follow_record(service, access_jwt, my_repo, at_uri):
-    """
-    Delete a follow record: at://<repo>/app.bsky.graph.follow/<rkey>
-    """
+def _split_record_uri(at_uri):
+    # at://<repo>/<collection>/<rkey>  ->  (collection, rkey)
     if not at_uri or not at_uri.startswith("at://"):
         raise ValueError(f"Unexpected follow URI: {at_uri}")
     parts = at_uri.split("/")
     if len(parts) < 5:
         raise ValueError(f"Malformed follow URI: {at_uri}")
-    collection = f"{parts[3]}"
-    rkey = parts[4]
+    return f"{parts[3]}", parts[4]
+
+def _follow_record(subject_did):
+    return {
+        "subject": subject_did,
+        "createdAt": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+    }
+
+def delete_follow_record(service, access_jwt, my_repo, at_uri):
+    """
+    Delete a follow record: at://<repo>/app.bsky.graph.follow/<rkey>
+    """
+    collection, rkey = _split_record_uri(at_uri)
     url = f"{service}/xrpc/com.atproto.repo.deleteRecord"
     headers = {"Authorization": f"Bearer {access_jwt}"}
     payload = {"repo": my_repo, "collection": collection, "rkey": rkey}
@@ -174,14 +1025,10 @@ def create_follow_record(service, access_jwt, my_repo, subject_did):
     """
     url = f"{service}/xrpc/com.atproto.repo.createRecord"
     headers = {"Authorization": f"Bearer {access_jwt}"}
-    record = {
-        "subject": subject_did,
-        "createdAt": datetime.utcnow().isoformat(timespec="seconds") + "Z",
-    }
     payload = {
         "repo": my_repo,
         "collection": "app.bsky.graph.follow",
-        "record": record,
+        "record": _follow_record(subject_did),
     }
     return run_curl("POST", url, headers=headers, data=payload)
 
@@ -223,19 +1070,21 @@ def create_list_record(service, access_jwt, my_repo, name, purpose="app.bsky.gra
     }
     return run_curl("POST", url, headers=headers, data=payload)
 
-def create_listitem_record(service, access_jwt, my_repo, list_uri, subject_did):
-    # Add `subject_did` to a list by creating an app.bsky.graph.listitem record.
-    url = f"{service}/xrpc/com.atproto.repo.createRecord"
-    headers = {"Authorization": f"Bearer {access_jwt}"}
-    record = {
+def _listitem_record(list_uri, subject_did):
+    return {
         "subject": subject_did,
         "list": list_uri,  # at://<your-did>/app.bsky.graph.list/<rkey>
         "createdAt": datetime.utcnow().isoformat(timespec="seconds") + "Z",
     }
+
+def create_listitem_record(service, access_jwt, my_repo, list_uri, subject_did):
+    # Add `subject_did` to a list by creating an app.bsky.graph.listitem record.
+    url = f"{service}/xrpc/com.atproto.repo.createRecord"
+    headers = {"Authorization": f"Bearer {access_jwt}"}
     payload = {
         "repo": my_repo,
         "collection": "app.bsky.graph.listitem",
-        "record": record,
+        "record": _listitem_record(list_uri, subject_did),
     }
     return run_curl("POST", url, headers=headers, data=payload)
 
@@ -302,6 +1151,29 @@ def get_list_view(service, access_jwt, list_uri, limit=1):
     headers = {"Authorization": f"Bearer {access_jwt}"}
     return run_curl("GET", url, headers=headers)
 
+def iter_list_items(service, access_jwt, list_uri, batch_size=100, max_pages=10000, prefetch=0):
+    """
+    Yield the list's items ({"uri": <listitem at-uri>, "subject": {profile}})
+    page-by-page via app.bsky.graph.getList.
+    """
+    pages = _paginate(access_jwt, f"{service}/xrpc/app.bsky.graph.getList", f"list={quote(list_uri)}",
+                      "items", batch_size, max_pages)
+    return _iter_pages(pages, None, prefetch)
+
+def get_list_members(service, access_jwt, list_uri, prefetch=0):
+    """
+    Current membership of a list as {subject DID: [listitem URI, ...]}.
+    More than one URI means the DID was added repeatedly.
+    """
+    members = {}
+    for items in iter_list_items(service, access_jwt, list_uri, prefetch=prefetch):
+        for it in items:
+            subject = it.get("subject") or {}
+            subject_did = subject.get("did") if isinstance(subject, dict) else subject
+            if subject_did and it.get("uri"):
+                members.setdefault(subject_did, []).append(it["uri"])
+    return members
+
 def wait_until_list_ready(service, access_jwt, actor_did, list_uri, expected_name=None, timeout_sec=30.0, interval_sec=0.75):
     """
     Poll getList and getLists until the list appears stable.
@@ -340,6 +1212,135 @@ def wait_until_list_ready(service, access_jwt, actor_did, list_uri, expected_nam
         interval = min(5.0, interval * 1.5)
     return False
 
+# ------------------------- Batched writes -------------------------
+# Server-side cap on operations per com.atproto.repo.applyWrites call.
+APPLY_WRITES_MAX = 200
+
+def apply_writes(service, access_jwt, my_repo, writes):
+    """
+    Apply create/delete operations atomically via com.atproto.repo.applyWrites.
+    """
+    url = f"{service}/xrpc/com.atproto.repo.applyWrites"
+    headers = {"Authorization": f"Bearer {access_jwt}"}
+    payload = {"repo": my_repo, "writes": list(writes)}
+    return run_curl("POST", url, headers=headers, data=payload)
+
+class WriteBatcher:
+    """
+    Queue record creates/deletes and flush them through applyWrites, up to
+    `max_per_call` operations per request.  applyWrites is all-or-nothing, so
+    a batch the server rejects (a 4xx such as 400 or 403, but not 401/429)
+    is replayed item-by-item with createRecord/deleteRecord to pin down
+    which items failed.  429s are waited out and retried by run_curl (with
+    a RateLimiter installed), and a 401 has already been retried once with
+    a refreshed session there too.  Any other error (a 5xx, a timeout, or a
+    429 that outlasted run_curl's retries) reports every op in the batch as
+    failed without re-sending it, since the batch may or may not have been
+    applied and replaying it could create duplicate records.
+
+    Every queued op carries a caller-defined `tag`; after each flush
+    `on_result(tag, ok, info)` is called per op in queue order, where `info`
+    is the server result dict ({"uri": ...} for creates) or the exception.
+    Use as a context manager to flush whatever is left on exit.
+    """
+
+    def __init__(self, service, access_jwt, my_repo, on_result=None, max_per_call=APPLY_WRITES_MAX):
+        self.service = service
+        self.access_jwt = access_jwt
+        self.my_repo = my_repo
+        self.on_result = on_result
+        self.max_per_call = max(1, min(int(max_per_call), APPLY_WRITES_MAX))
+        self.pending = []
+        self.calls = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+    def __len__(self):
+        return len(self.pending)
+
+    def _queue(self, op, tag):
+        self.pending.append((op, tag))
+        if len(self.pending) >= self.max_per_call:
+            self.flush()
+
+    def create(self, collection, record, tag=None):
+        self._queue({"$type": "com.atproto.repo.applyWrites#create",
+                     "collection": collection, "value": record}, tag)
+
+    def delete(self, collection, rkey, tag=None):
+        self._queue({"$type": "com.atproto.repo.applyWrites#delete",
+                     "collection": collection, "rkey": rkey}, tag)
+
+    def follow(self, subject_did, tag=None):
+        self.create("app.bsky.graph.follow", _follow_record(subject_did), tag)
+
+    def unfollow(self, follow_uri, tag=None):
+        collection, rkey = _split_record_uri(follow_uri)
+        self.delete(collection, rkey, tag)
+
+    def add_to_list(self, list_uri, subject_did, tag=None):
+        self.create("app.bsky.graph.listitem", _listitem_record(list_uri, subject_did), tag)
+
+    def remove_from_list(self, listitem_uri, tag=None):
+        collection, rkey = _split_record_uri(listitem_uri)
+        self.delete(collection, rkey, tag)
+
+    def _report(self, tag, ok, info):
+        if self.on_result:
+            self.on_result(tag, ok, info)
+
+    def _apply_one(self, op):
+        if op["$type"].endswith("#create"):
+            payload = {"repo": self.my_repo, "collection": op["collection"], "record": op["value"]}
+            url = f"{self.service}/xrpc/com.atproto.repo.createRecord"
+        else:
+            payload = {"repo": self.my_repo, "collection": op["collection"], "rkey": op["rkey"]}
+            url = f"{self.service}/xrpc/com.atproto.repo.deleteRecord"
+        self.calls += 1
+        return run_curl("POST", url, headers={"Authorization": f"Bearer {self.access_jwt}"}, data=payload)
+
+    def flush(self):
+        while self.pending:
+            batch = self.pending[:self.max_per_call]
+            self.pending = self.pending[self.max_per_call:]
+            try:
+                res = self._apply_batch(batch)
+            except XrpcError as e:
+                if e.status is not None and 400 <= e.status < 500 and e.status not in (401, 429):
+                    # Some op was rejected; applyWrites applied none of them.
+                    for op, tag in batch:
+                        try:
+                            self._report(tag, True, self._apply_one(op))
+                        except Exception as one_error:
+                            self._report(tag, False, one_error)
+                else:
+                    for _, tag in batch:
+                        self._report(tag, False, e)
+                continue
+            except Exception as e:
+                for _, tag in batch:
+                    self._report(tag, False, e)
+                continue
+            # Older PDS versions return no per-op results; success is all we know.
+            results = (res.get("results") or []) if isinstance(res, dict) else []
+            for i, (op, tag) in enumerate(batch):
+                self._report(tag, True, results[i] if i < len(results) else {})
+
+    def _apply_batch(self, batch):
+        """
+        One applyWrites call for `batch`.  It is never re-sent from here: a
+        5xx may arrive after the batch was committed, and creates carry no
+        rkey, so a replay would duplicate records; 429s are retried by
+        run_curl alone.
+        """
+        self.calls += 1
+        return apply_writes(self.service, self.access_jwt, self.my_repo, [op for op, _ in batch])
+
 
 # ------------------------- text helpers -------------------------
 def combine_bio_desc(obj):
@@ -347,29 +1348,572 @@ def combine_bio_desc(obj):
     bio = (obj.get("bio") or ((obj.get("profile") or {}).get("description") or "")).strip()
     return (" ".join([s for s in (bio, desc) if s])).strip()
 
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over the keyword phrases (as returned by
+    read_keywords).  Built once; find() reports every phrase occurring in a
+    text in a single pass, in keyword-file order.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = []
+        index = {}
+        for kw in keywords or []:
+            kw = normalize_text(kw)
+            if kw and kw not in index:
+                index[kw] = len(self.keywords)
+                self.keywords.append(kw)
+        # State 0 is the root; out[s] holds keyword ids ending at state s
+        # (including those inherited through failure links).
+        goto = [{}]
+        out = [()]
+        for i, kw in enumerate(self.keywords):
+            s = 0
+            for ch in kw:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[s][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                s = nxt
+            out[s] = out[s] + (i,)
+        fail = [0] * len(goto)
+        bfs = deque(goto[0].values())
+        while bfs:
+            s = bfs.popleft()
+            for ch, nxt in goto[s].items():
+                if s:
+                    f = fail[s]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                bfs.append(nxt)
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def find(self, text):
+        """Return the list of keyword phrases found in `text` (keyword order)."""
+        if not text or not self.keywords:
+            return []
+        goto, fail, out = self._goto, self._fail, self._out
+        hit = set()
+        s = 0
+        for ch in normalize_text(text):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                hit.update(out[s])
+        return [self.keywords[i] for i in sorted(hit)]
+
+    def matches(self, text):
+        return bool(self.find(text))
+
+@lru_cache(maxsize=16)
+def _compiled_matcher(keywords):
+    return KeywordMatcher(keywords)
+
+def as_matcher(keywords):
+    """Return `keywords` as a KeywordMatcher, compiling (and memoizing) lists."""
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    return _compiled_matcher(tuple(keywords or ()))
+
+def matching_keywords(text, keywords):
+    """
+    Return the keyword phrases that occur in `text` (see matches_any_keyword).
+    """
+    if not text or not keywords:
+        return []
+    return as_matcher(keywords).find(text)
+
 def matches_any_keyword(text, keywords):
     """
     Case-insensitive *phrase* match: each keyword line is a full phrase.
     Normalize whitespace on both sides so 'Computational   Biologist'
     in the keywords file matches 'computational biologist' in bios.
+    `keywords` may be a list of phrases or a prebuilt KeywordMatcher.
     """
-    if not text or not keywords:
-        return False
-    t = " ".join(text.lower().split())
-    return any(kw in t for kw in keywords)
+    return bool(matching_keywords(text, keywords))
+
+# ------------------------- Wordmap counters -------------------------
+_WORDMAP_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+WORDMAP_STOPWORDS = frozenset({
+    "the","and","for","you","your","with","are","that","this","from","have","has","was","were","but","not","all",
+    "our","about","into","out","over","under","on","in","of","to","a","an","as","by","at","it","we","they","them",
+    "be","is","am","or","if","so","my","me","their","his","her","he","she","i","us","rt"
+})
+
+def wordmap_terms(text, ngram_max=1):
+    """
+    Terms counted by wordmap: lowercase alphanumeric tokens of 3+ characters
+    that are not stopwords, plus n-grams (up to `ngram_max`) of those tokens.
+    """
+    tokens = [t for t in _WORDMAP_TOKEN_RE.findall(text.lower()) if len(t) >= 3 and t not in WORDMAP_STOPWORDS]
+    terms = list(tokens)
+    for n in range(2, ngram_max + 1):
+        terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return terms
+
+class CountMinSketch:
+    """
+    Count-Min sketch: `depth` rows of `width` counters.  Estimates never
+    undercount and overcount by at most epsilon * N with probability
+    1 - delta, where width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)).
+    Hashing is deterministic (blake2b), so equally sized sketches from
+    different runs can be merged by adding them.
+    """
+
+    def __init__(self, width, depth):
+        self.width = max(1, int(width))
+        self.depth = max(1, int(depth))
+        self.table = array("Q", bytes(8 * self.width * self.depth))
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, epsilon=1e-4, delta=0.01, memory_bytes=None):
+        """Size from error bounds; `memory_bytes` (if given) caps the width instead."""
+        depth = max(1, math.ceil(math.log(1.0 / delta)))
+        width = math.ceil(math.e / epsilon)
+        if memory_bytes:
+            width = max(1, int(memory_bytes) // (8 * depth))
+        return cls(width, depth)
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def memory_bytes(self):
+        return self.table.itemsize * len(self.table)
+
+    def _cells(self, term):
+        h = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest(), "little")
+        h1, h2 = h & 0xFFFFFFFFFFFFFFFF, (h >> 64) | 1
+        w = self.width
+        return [row * w + (h1 + row * h2) % w for row in range(self.depth)]
+
+    def add(self, term, n=1):
+        table = self.table
+        for cell in self._cells(term):
+            table[cell] += n
+        self.total += n
+
+    def estimate(self, term):
+        table = self.table
+        return min(table[cell] for cell in self._cells(term))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches must have the same width and depth to merge")
+        table = self.table
+        for i, v in enumerate(other.table):
+            table[i] += v
+        self.total += other.total
+
+class SpaceSaving:
+    """
+    Space-Saving top-K summary (Metwally et al.): at most `k` monitored terms;
+    a new term replaces the current minimum and inherits its count as error.
+    Every term more frequent than N/k is guaranteed to be monitored.
+    """
+
+    def __init__(self, k):
+        self.k = max(1, int(k))
+        self.counts = {}  # term -> [count, error]
+        self._heap = []   # one (count, term) per monitored term; counts may be stale (low)
+
+    def add(self, term, n=1):
+        entry = self.counts.get(term)
+        if entry is not None:
+            entry[0] += n
+            return
+        if len(self.counts) < self.k:
+            self.counts[term] = [n, 0]
+            heapq.heappush(self._heap, (n, term))
+            return
+        floor = self._evict_min()
+        self.counts[term] = [floor + n, floor]
+        heapq.heappush(self._heap, (floor + n, term))
+
+    def _evict_min(self):
+        # Heap entries only ever lag behind the real counts, so an entry that
+        # is up to date when popped is the true minimum.
+        while True:
+            count, term = heapq.heappop(self._heap)
+            actual = self.counts[term][0]
+            if actual == count:
+                del self.counts[term]
+                return count
+            heapq.heappush(self._heap, (actual, term))
+
+    def items(self):
+        """(term, count, error) sorted by count, descending."""
+        return sorted(((t, c, e) for t, (c, e) in self.counts.items()), key=lambda r: (-r[1], r[0]))
+
+class ExactWordCounter:
+    """Exact term counts (unbounded memory); fine for small runs."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    def add_terms(self, terms):
+        self.counts.update(terms)
+        self.total += len(terms)
+
+    def add_counts(self, counts):
+        self.counts.update(counts)
+        self.total += sum(counts.values())
+
+    def top(self, k=None):
+        """(term, count, error) sorted by count desc, then term."""
+        rows = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [(t, c, 0) for t, c in (rows[:k] if k else rows)]
+
+    def describe(self):
+        return f"exact: {len(self.counts)} distinct term(s), {self.total} occurrence(s)"
+
+class SketchWordCounter:
+    """
+    Bounded-memory term counts: a Count-Min sketch for frequencies plus a
+    Space-Saving summary tracking the top `k` terms.  Reported counts are the
+    smaller of both estimates; `error` bounds how far they may overcount.
+    """
+
+    def __init__(self, k=1000, epsilon=1e-4, delta=0.01, memory_bytes=None):
+        self.sketch = CountMinSketch.from_error(epsilon, delta, memory_bytes)
+        self.top_k = SpaceSaving(k)
+        self.total = 0
+
+    def add_terms(self, terms):
+        for t in terms:
+            self.sketch.add(t)
+            self.top_k.add(t)
+        self.total += len(terms)
+
+    def add_counts(self, counts):
+        for t, n in counts.items():
+            self.sketch.add(t, n)
+            self.top_k.add(t, n)
+            self.total += n
+
+    def top(self, k=None):
+        rows = []
+        for t, c, e in self.top_k.items():
+            est = min(c, self.sketch.estimate(t))
+            rows.append((t, est, min(e, math.ceil(self.sketch.epsilon * self.total))))
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return rows[:k] if k else rows
+
+    def describe(self):
+        s = self.sketch
+        return (f"sketch: {s.depth}x{s.width} Count-Min ({s.memory_bytes / 1e6:.1f} MB, "
+                f"overcount <= {s.epsilon:.2g}*N w.p. {1 - math.exp(-s.depth):.3f}) + top-{self.top_k.k} "
+                f"Space-Saving; {self.total} occurrence(s)")
+
+def make_word_counter(args):
+    """ExactWordCounter or SketchWordCounter per the wordmap flags."""
+    if args.wordmap_counter == "sketch":
+        return SketchWordCounter(k=args.top_k or 1000, epsilon=args.sketch_epsilon, delta=args.sketch_delta,
+                                 memory_bytes=int(args.sketch_memory_mb * 1e6) if args.sketch_memory_mb else None)
+    return ExactWordCounter()
+
+def _wordmap_worker(texts, ngram_max):
+    # Process-pool task: term counts for one page of bios.
+    counts = Counter()
+    for text in texts:
+        counts.update(wordmap_terms(text, ngram_max))
+    return counts
+
+# Per-actor count files written by multi-actor wordmap and read by wordmerge:
+#   <actor>.counts.tsv   "# bsky-wordcounts-1" header line (key=value fields),
+#                        then term <TAB> count <TAB> error
+#   <actor>.cms          the raw Count-Min table (sketch counter only)
+WORDCOUNTS_FORMAT = "bsky-wordcounts-1"
+
+def _safe_filename(name):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name.lstrip("@")) or "_"
+
+def write_word_counts(folder: Path, actor, source, accounts, counter, ngrams, top_k=None):
+    """Save `counter` for `actor`; returns the .counts.tsv path."""
+    folder.mkdir(parents=True, exist_ok=True)
+    base = folder / _safe_filename(actor)
+    header = {"actor": actor, "source": source, "accounts": accounts, "occurrences": counter.total,
+              "counter": "sketch" if isinstance(counter, SketchWordCounter) else "exact", "ngrams": ngrams}
+    if isinstance(counter, SketchWordCounter):
+        header.update(width=counter.sketch.width, depth=counter.sketch.depth)
+        tmp = base.with_name(base.name + ".cms.tmp")
+        with tmp.open("wb") as fh:
+            counter.sketch.table.tofile(fh)
+        os.replace(tmp, base.with_name(base.name + ".cms"))
+    rows = counter.top(top_k)
+    path = base.with_name(base.name + ".counts.tsv")
+    _write_text_atomic(path, "# " + WORDCOUNTS_FORMAT + "".join(f"\t{k}={v}" for k, v in header.items()) + "\n"
+                       + "term\tcount\terror\n" + "".join(f"{t}\t{c}\t{e}\n" for t, c, e in rows))
+    return path
+
+def read_word_counts(path: Path):
+    """Return (header, {term: count}, CountMinSketch or None) for a .counts.tsv file."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    if not lines or not lines[0].startswith("# " + WORDCOUNTS_FORMAT):
+        raise ValueError(f"{path} is not a {WORDCOUNTS_FORMAT} file")
+    header = dict(f.split("=", 1) for f in lines[0].split("\t")[1:] if "=" in f)
+    for key in ("accounts", "occurrences", "ngrams", "width", "depth"):
+        if key in header:
+            header[key] = int(header[key])
+    counts = {}
+    for line in lines[2:]:
+        term, count, _ = line.split("\t")
+        counts[term] = int(count)
+    sketch = None
+    cms = Path(str(path)[:-len(".counts.tsv")] + ".cms")
+    if header.get("counter") == "sketch" and cms.exists():
+        sketch = CountMinSketch(header["width"], header["depth"])
+        sketch.table = array("Q")
+        with cms.open("rb") as fh:
+            sketch.table.frombytes(fh.read())
+        sketch.total = header["occurrences"]
+    return header, counts, sketch
+
+def log_odds_ranking(target, target_total, rest, rest_total, prior, prior_total, alpha0=1000.0):
+    """
+    Log-odds ratio with an informative Dirichlet prior (Monroe et al.,
+    "Fightin' Words"): rank terms by the z-score of how much more `target`
+    uses them than `rest`, shrunk toward the `prior` (background) rates.
+    Returns [(term, z, target_count, rest_count)] sorted by z, descending.
+    """
+    out = []
+    for term, bg in prior.items():
+        a = alpha0 * bg / max(1, prior_total)
+        if a <= 0:
+            continue
+        yi, yj = target.get(term, 0), rest.get(term, 0)
+        li = math.log((yi + a) / max(1e-9, target_total + alpha0 - yi - a))
+        lj = math.log((yj + a) / max(1e-9, rest_total + alpha0 - yj - a))
+        z = (li - lj) / math.sqrt(1.0 / (yi + a) + 1.0 / (yj + a))
+        out.append((term, z, yi, yj))
+    out.sort(key=lambda r: (-r[1], r[0]))
+    return out
+
+# ------------------------- Profile cache -------------------------
+class ProfileCache:
+    """
+    SQLite-backed cache of actor profiles keyed by DID.  Full getProfiles
+    results are stored as `detailed`; the shorter profile views on
+    getFollows/getFollowers pages (no follower/post counts) are stored too,
+    but never replace a fresh detailed entry and never satisfy a lookup that
+    needs one.  Entries older than `ttl_sec` are treated as misses; once the
+    table grows past `max_entries`, the oldest fetches are evicted.
+    Thread-safe.
+    """
+
+    def __init__(self, path: Path, ttl_sec=86400.0, max_entries=200000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " did TEXT PRIMARY KEY, handle TEXT, json TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " detailed INTEGER NOT NULL DEFAULT 1)"
+        )
+        if "detailed" not in {row[1] for row in self._db.execute("PRAGMA table_info(profiles)")}:
+            # Caches written before page views were stored hold getProfiles results only
+            self._db.execute("ALTER TABLE profiles ADD COLUMN detailed INTEGER NOT NULL DEFAULT 1")
+        self._db.execute("CREATE INDEX IF NOT EXISTS profiles_handle ON profiles(handle)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS profiles_fetched_at ON profiles(fetched_at)")
+        self._db.commit()
+
+    def get_many(self, actors, detailed=True, count=True):
+        """
+        Return { actor: profile_dict } for the fresh entries among `actors`
+        (DIDs or handles), counting a hit or miss for each actor unless
+        count=False.  With detailed=False, page profile views are returned too.
+        """
+        cutoff = time.time() - self.ttl_sec
+        found = {}
+        with self._lock:
+            for a in actors:
+                col = "did" if str(a).startswith("did:") else "handle"
+                row = self._db.execute(
+                    f"SELECT json FROM profiles WHERE {col} = ? AND fetched_at >= ? AND detailed >= ?",
+                    (a, cutoff, int(bool(detailed)))
+                ).fetchone()
+                if row:
+                    found[a] = json.loads(row[0])
+            if not count:
+                return found
+            self.hits += len(found)
+            self.misses += len(actors) - len(found)
+        get_metrics().inc("bsky_profile_cache_hits_total", len(found))
+        get_metrics().inc("bsky_profile_cache_misses_total", len(actors) - len(found))
+        return found
+
+    def put_many(self, profiles, detailed=True):
+        """Store getProfiles results, or (detailed=False) profile views from list pages."""
+        now = time.time()
+        rows = [
+            (p["did"], p.get("handle"), json.dumps(p, ensure_ascii=False), now)
+            for p in profiles if p.get("did")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            if detailed:
+                self._db.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, 1)", rows)
+            else:
+                self._db.executemany(
+                    "INSERT INTO profiles VALUES (?, ?, ?, ?, 0) ON CONFLICT(did) DO UPDATE SET"
+                    " handle = excluded.handle, json = excluded.json, fetched_at = excluded.fetched_at,"
+                    " detailed = 0 WHERE profiles.detailed = 0 OR profiles.fetched_at < ?",
+                    [row + (now - self.ttl_sec,) for row in rows],
+                )
+            (n,) = self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()
+            if n > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM profiles WHERE did IN "
+                    "(SELECT did FROM profiles ORDER BY fetched_at ASC LIMIT ?)",
+                    (n - self.max_entries,),
+                )
+            self._db.commit()
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"Profile cache: hits={self.hits}, misses={self.misses} ({rate:.1f}% hit rate) [{self.path}]"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+_PROFILE_CACHE = None
+
+def set_profile_cache(cache):
+    """Install (or clear, with None) the process-wide ProfileCache."""
+    global _PROFILE_CACHE
+    _PROFILE_CACHE = cache
+    return cache
+
+def get_profile_cache():
+    return _PROFILE_CACHE
+
+def cache_page_profiles(people):
+    """Remember the profile views of a getFollows/getFollowers page in the ProfileCache, if any."""
+    cache = get_profile_cache()
+    if cache is not None and people:
+        cache.put_many(people, detailed=False)
+
+def with_cached_counts(people):
+    """
+    `people` (page profile views) with followersCount/followsCount/postsCount
+    taken from fresh cached getProfiles results where available.  Makes no
+    requests; without a ProfileCache the list is returned unchanged.
+    """
+    cache = get_profile_cache()
+    if cache is None or not people:
+        return people
+    # Opportunistic: a miss costs no request, so it is not counted as one
+    found = cache.get_many([p.get("did") or p.get("handle") for p in people if p.get("did") or p.get("handle")],
+                           count=False)
+    out = []
+    for p in people:
+        prof = found.get(p.get("did") or p.get("handle"))
+        if prof:
+            p = dict(p, **{k: prof[k] for k in ("followersCount", "followsCount", "postsCount") if k in prof})
+        out.append(p)
+    return out
 
 # ------------------------- Vectorize helpers -------------------------
-def _bsky_build_analyzer():
+# scikit-learn's ENGLISH_STOP_WORDS (318 words), copied so the built-in
+# analyzer produces the same token stream without importing sklearn.
+_ENGLISH_STOP_WORDS = frozenset((
+    "a about above across after afterwards again against all almost alone along "
+    "already also although always am among amongst amoungst amount an and "
+    "another any anyhow anyone anything anyway anywhere are around as at back "
+    "be became because become becomes becoming been before beforehand behind "
+    "being below beside besides between beyond bill both bottom but by call can "
+    "cannot cant co con could couldnt cry de describe detail do done down due "
+    "during each eg eight either eleven else elsewhere empty enough etc even "
+    "ever every everyone everything everywhere except few fifteen fifty fill "
+    "find fire first five for former formerly forty found four from front full "
+    "further get give go had has hasnt have he hence her here hereafter hereby "
+    "herein hereupon hers herself him himself his how however hundred i ie if "
+    "in inc indeed interest into is it its itself keep last latter latterly "
+    "least less ltd made many may me meanwhile might mill mine more moreover "
+    "most mostly move much must my myself name namely neither never "
+    "nevertheless next nine no nobody none noone nor not nothing now nowhere of "
+    "off often on once one only onto or other others otherwise our ours "
+    "ourselves out over own part per perhaps please put rather re same see seem "
+    "seemed seeming seems serious several she should show side since sincere "
+    "six sixty so some somehow someone something sometime sometimes somewhere "
+    "still such system take ten than that the their them themselves then thence "
+    "there thereafter thereby therefore therein thereupon these they thick thin "
+    "third this those though three through throughout thru thus to together too "
+    "top toward towards twelve twenty two un under until up upon us very via "
+    "was we well were what whatever when whence whenever where whereafter "
+    "whereas whereby wherein whereupon wherever whether which while whither who "
+    "whoever whole whom whose why will with within without would yet you your "
+    "yours yourself yourselves "
+).split())
+
+_BSKY_TOKEN_RE = re.compile(r"(?u)\b[A-Za-z][A-Za-z0-9\-]{2,}\b")
+
+ANALYZER_CHOICES = ("builtin", "sklearn")
+
+def _strip_accents_unicode(text):
+    # Same as sklearn's strip_accents_unicode: ASCII passes through untouched,
+    # anything else is NFKD-decomposed with combining marks dropped.
+    if text.isascii():
+        return text
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+def _bsky_builtin_analyzer(text):
     """
-    Build a scikit-learn analyzer that matches pdf_cluster.py's CountVectorizer
+    Pure-Python equivalent of the CountVectorizer analyzer below: lowercase,
+    strip accents, match token_pattern, drop English stop words, then emit
+    the unigrams followed by the bigrams.
+    """
+    tokens = [t for t in _BSKY_TOKEN_RE.findall(_strip_accents_unicode(text.lower()))
+              if t not in _ENGLISH_STOP_WORDS]
+    if len(tokens) > 1:
+        tokens += [a + " " + b for a, b in zip(tokens, tokens[1:])]
+    return tokens
+
+def _bsky_build_analyzer(kind="builtin"):
+    """
+    Return an analyzer that matches pdf_cluster.py's CountVectorizer
     (unigrams/bigrams, English stopwords, token rules). This keeps the vector
-    files compatible with pdf_cluster.py's `build` step.  Requires scikit-learn.
+    files compatible with pdf_cluster.py's `build` step.  The default is the
+    built-in analyzer; kind="sklearn" uses scikit-learn's own.
     """
+    if kind == "builtin":
+        return _bsky_builtin_analyzer
+    if kind != "sklearn":
+        raise ValueError(f"Unknown analyzer {kind!r}; choose one of {', '.join(ANALYZER_CHOICES)}")
     try:
         from sklearn.feature_extraction.text import CountVectorizer
     except Exception as e:
         raise SystemExit(
-            "The 'vectorize' mode requires scikit-learn. "
+            "--analyzer sklearn requires scikit-learn. "
             "Install it with:  pip install scikit-learn"
         )
     cv = CountVectorizer(
@@ -381,55 +1925,1529 @@ def _bsky_build_analyzer():
     )
     return cv.build_analyzer()
 
-def _bsky_text_to_counts(text: str, analyzer):
-    if not text:
-        return {}
-    tokens = analyzer(text)
-    return dict(Counter(tokens))
+def _bsky_text_to_counts(text: str, analyzer):
+    if not text:
+        return {}
+    tokens = analyzer(text)
+    return dict(Counter(tokens))
+
+# Analyzer settings shared by every bsky-vec-1 payload (and stored once per VectorStore).
+VECTOR_FORMAT_META = {
+    "version": "bsky-vec-1",
+    "ngram_range": [1, 2],
+    "stop_words": "english",
+    "strip_accents": "unicode",
+    "token_pattern": r"(?u)\b[A-Za-z][A-Za-z0-9\-]{2,}\b",
+}
+
+def _write_vector_file(path: Path, payload: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as g:
+        json.dump(payload, g, ensure_ascii=False)
+
+def _write_vector_text(path: Path, text):
+    # Same bytes as _write_vector_file for a payload already serialized with
+    # json.dumps(payload, ensure_ascii=False).
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as g:
+        g.write(text)
+
+# Per-process analyzer for the vectorize tokenization stage.
+_WORKER_ANALYZER = None
+
+def _vectorize_worker_init(kind="builtin"):
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = _bsky_build_analyzer(kind)
+
+def _vector_md5(key, text):
+    # "md5" uniquely derived from subject + text
+    return hashlib.md5((key + "\n" + text).encode("utf-8", "ignore")).hexdigest()
+
+def _vectorize_worker(jobs, serialize):
+    """
+    Tokenize, hash and (optionally) serialize a slice of accounts.
+    `jobs` holds (key, combined_text, filename, meta); returns, in order,
+    (md5, payload, payload_json_or_None) per job.
+    """
+    out = []
+    for key, combined, filename, meta in jobs:
+        md5 = _vector_md5(key, combined)
+        payload = {
+            **VECTOR_FORMAT_META,
+            "filename": filename,
+            "md5": md5,
+            "token_counts": _bsky_text_to_counts(combined, _WORKER_ANALYZER),
+            # Extra metadata is harmless for pdf_cluster.py, but helpful downstream
+            "meta": meta,
+        }
+        out.append((md5, payload, json.dumps(payload, ensure_ascii=False) if serialize else None))
+    return out
+
+class _Done:
+    # Future-like wrapper for results computed in-process.
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+class _Gathered:
+    # Concatenate the ordered results of several futures.
+    def __init__(self, futures):
+        self._futures = futures
+
+    def result(self):
+        return [r for f in self._futures for r in f.result()]
+
+def process_pool(workers, **kwargs):
+    """
+    ProcessPoolExecutor whose workers never fork this (threaded) process:
+    read-ahead, profile-fetch and keep-alive threads are usually running by
+    the time a pool starts, and a forked child could inherit a lock one of
+    them held.  forkserver forks from a clean, single-threaded server
+    instead (spawn where it is unavailable).
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, **kwargs)
+
+class VectorizeWorkers:
+    """
+    Process pool for the vectorize tokenization stage.  submit() splits a
+    batch into one slice per worker and returns an object whose result()
+    yields the per-account results in the original order.  With a single
+    worker the work runs in-process (the original serial path).
+    """
+
+    def __init__(self, workers=None, serialize=True, analyzer="builtin"):
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+        self.workers = max(1, int(workers))
+        self.serialize = serialize
+        self._pool = None
+        # Build the analyzer here first so a missing dependency fails fast.
+        _vectorize_worker_init(analyzer)
+        if self.workers > 1:
+            self._pool = process_pool(self.workers, initializer=_vectorize_worker_init, initargs=(analyzer,))
+
+    def submit(self, jobs):
+        if self._pool is None:
+            return _Done(_vectorize_worker(jobs, self.serialize))
+        step = max(1, -(-len(jobs) // self.workers))
+        return _Gathered([self._pool.submit(_vectorize_worker, jobs[i:i + step], self.serialize)
+                          for i in range(0, len(jobs), step)])
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+def _write_text_atomic(path: Path, text):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+def _read_gzip_members(path: Path, offset=0, limit=None):
+    """
+    Yield (offset, decompressed_bytes) for consecutive gzip members of `path`
+    starting at byte `offset`; stops after `limit` members if given.
+    """
+    with path.open("rb") as fh:
+        fh.seek(offset)
+        pending = b""
+        n = 0
+        while limit is None or n < limit:
+            d = zlib.decompressobj(wbits=31)
+            out = []
+            start = offset
+            while not d.eof:
+                chunk = pending or fh.read(1 << 16)
+                pending = b""
+                if not chunk:
+                    # End of file (a truncated trailing block was never indexed).
+                    return
+                out.append(d.decompress(chunk))
+                offset += len(chunk)
+            pending = d.unused_data
+            offset -= len(pending)
+            yield start, b"".join(out)
+            n += 1
+
+class VectorStore:
+    """
+    Single-directory alternative to one *.pdfvec.json.gz per account:
+
+      store.json            format header, shared analyzer metadata, shard list
+      vocab.json            term list; records refer to terms by position
+      index.tsv             did <TAB> shard <TAB> block offset <TAB> line
+      shard-NNNNN.jsonl.gz  records {"filename","md5","counts":[[term_id, n]...],"meta"}
+
+    Shards are written as a series of independent gzip members of
+    `block_size` records, so a valid .gz stream is kept while index.tsv can
+    point at a block offset for random access.  flush() rewrites the small
+    metadata files; a crash afterwards only leaves unindexed trailing blocks.
+    """
+
+    FORMAT = "bsky-vec-store-1"
+
+    def __init__(self, root: Path, shard_size=10000, block_size=256, append=True):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.shard_size = max(1, int(shard_size))
+        self.block_size = max(1, min(int(block_size), self.shard_size))
+        self.vocab = []
+        self.term_ids = {}
+        self.index = {}
+        self.shards = []
+        if append and (self.root / "store.json").exists():
+            reader = VectorStoreReader(self.root)
+            self.vocab = list(reader.vocab)
+            self.term_ids = {t: i for i, t in enumerate(self.vocab)}
+            self.index = dict(reader.index)
+            self.shards = list(reader.shards)
+        else:
+            for stale in self.root.glob("shard-*.jsonl.gz"):
+                stale.unlink()
+        self._fh = None
+        self._in_shard = 0
+        self._block = []
+
+    def __contains__(self, key):
+        return key in self.index or any(k == key for k, _ in self._block)
+
+    def discard(self, key):
+        # Drops the record from the index; its bytes stay in the shard until
+        # the store is rebuilt (vectorize --overwrite).
+        self._block = [(k, line) for k, line in self._block if k != key]
+        self.index.pop(key, None)
+
+    def add(self, payload):
+        counts = []
+        for term, n in payload["token_counts"].items():
+            tid = self.term_ids.get(term)
+            if tid is None:
+                tid = self.term_ids[term] = len(self.vocab)
+                self.vocab.append(term)
+            counts.append([tid, n])
+        rec = {"filename": payload["filename"], "md5": payload["md5"], "counts": counts, "meta": payload["meta"]}
+        self._block.append((payload["meta"]["did"], json.dumps(rec, ensure_ascii=False)))
+        if len(self._block) >= self.block_size:
+            self._write_block()
+
+    def _write_block(self):
+        if not self._block:
+            return
+        if self._fh is None or self._in_shard >= self.shard_size:
+            if self._fh:
+                self._fh.close()
+            name = f"shard-{len(self.shards):05d}.jsonl.gz"
+            self.shards.append(name)
+            self._fh = (self.root / name).open("wb")
+            self._in_shard = 0
+        offset = self._fh.tell()
+        data = "".join(line + "\n" for _, line in self._block).encode("utf-8")
+        self._fh.write(gzip.compress(data, mtime=0))
+        shard_no = len(self.shards) - 1
+        for i, (key, _) in enumerate(self._block):
+            self.index[key] = (shard_no, offset, i)
+        self._in_shard += len(self._block)
+        self._block = []
+
+    def flush(self):
+        self._write_block()
+        if self._fh:
+            self._fh.flush()
+        _write_text_atomic(self.root / "vocab.json", json.dumps(self.vocab, ensure_ascii=False))
+        _write_text_atomic(self.root / "index.tsv", "".join(
+            f"{k}\t{sh}\t{off}\t{ln}\n" for k, (sh, off, ln) in self.index.items()
+        ))
+        _write_text_atomic(self.root / "store.json", json.dumps({
+            "format": self.FORMAT,
+            "vector": VECTOR_FORMAT_META,
+            "shards": self.shards,
+            "records": len(self.index),
+            "vocab_size": len(self.vocab),
+        }, indent=2))
+
+    def close(self):
+        self.flush()
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+class VectorStoreReader:
+    """
+    Read a VectorStore.  get(did) decompresses a single block; iteration
+    streams the shards and yields legacy bsky-vec-1 payloads for the latest
+    record of every indexed DID.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        header = json.loads((self.root / "store.json").read_text(encoding="utf-8"))
+        if header.get("format") != VectorStore.FORMAT:
+            raise ValueError(f"{self.root} is not a {VectorStore.FORMAT} vector store")
+        self.vector_meta = header.get("vector") or VECTOR_FORMAT_META
+        self.shards = header.get("shards") or []
+        self.vocab = json.loads((self.root / "vocab.json").read_text(encoding="utf-8"))
+        self.index = {}
+        for line in (self.root / "index.tsv").read_text(encoding="utf-8").splitlines():
+            k, sh, off, ln = line.split("\t")
+            self.index[k] = (int(sh), int(off), int(ln))
+
+    def __len__(self):
+        return len(self.index)
+
+    def _payload(self, rec):
+        payload = dict(self.vector_meta)
+        payload["filename"] = rec["filename"]
+        payload["md5"] = rec["md5"]
+        payload["token_counts"] = {self.vocab[i]: n for i, n in rec["counts"]}
+        payload["meta"] = rec["meta"]
+        return payload
+
+    def get(self, key):
+        loc = self.index.get(key)
+        if loc is None:
+            return None
+        shard_no, offset, line = loc
+        for _, data in _read_gzip_members(self.root / self.shards[shard_no], offset, limit=1):
+            return self._payload(json.loads(data.splitlines()[line]))
+        return None
+
+    def __iter__(self):
+        live = set(self.index.values())
+        for shard_no, name in enumerate(self.shards):
+            for offset, data in _read_gzip_members(self.root / name):
+                for line, raw in enumerate(data.splitlines()):
+                    if (shard_no, offset, line) in live:
+                        yield self._payload(json.loads(raw))
+
+def export_legacy_vectors(store_root: Path, outdir: Path, overwrite=False):
+    """
+    Emit the per-account *.pdfvec.json.gz layout from a VectorStore.
+    Returns (written, skipped_existing).
+    """
+    written, skipped = 0, 0
+    for payload in VectorStoreReader(store_root):
+        path = outdir / f"{payload['filename']}.pdfvec.json.gz"
+        if path.exists() and not overwrite:
+            skipped += 1
+            continue
+        _write_vector_file(path, payload)
+        written += 1
+    return written, skipped
+
+class VectorManifest:
+    """
+    DID -> (md5, path, timestamp) for every vector vectorize has written, kept
+    as manifest.tsv in --outdir.  A rerun compares the md5 of each account's
+    current text against it, so only new or changed accounts are tokenized
+    and rewritten, and entries for accounts no longer kept can be pruned.
+    """
+
+    NAME = "manifest.tsv"
+
+    def __init__(self, outdir: Path):
+        self.path = Path(outdir) / self.NAME
+        self.entries = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                parts = line.split("\t")
+                if len(parts) == 4:
+                    self.entries[parts[0]] = (parts[1], parts[2], parts[3])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, md5, path):
+        self.entries[key] = (md5, str(path), datetime.now().isoformat(timespec="seconds"))
+
+    def pop(self, key):
+        return self.entries.pop(key, None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _write_text_atomic(self.path, "".join(
+            f"{k}\t{md5}\t{path}\t{ts}\n" for k, (md5, path, ts) in self.entries.items()
+        ))
+
+# Concurrent getProfiles requests per ProfileFetcher, and retries per chunk.
+PROFILE_WORKERS = 4
+PROFILE_RETRIES = 3
+
+class ProfileBatch:
+    """Pending result of ProfileFetcher.submit(): result() -> { did_or_handle: profile }."""
+
+    def __init__(self, cached, futures):
+        self._index = dict(cached)
+        self._futures = futures
+
+    def done(self):
+        return all(f.done() for f in self._futures)
+
+    def result(self):
+        for f in self._futures:
+            for p in f.result():
+                key = p.get("did") or p.get("handle")
+                if key:
+                    self._index[key] = p
+        self._futures = []
+        return self._index
+
+class ProfileFetcher:
+    """
+    Enriches actors through app.bsky.actor.getProfiles (`chunk` actors per
+    request) with at most `workers` requests in flight on a thread pool:
+
+      iter_profiles(actors) yields lists of profiles as chunks complete;
+      submit(actors) starts all chunks and returns a ProfileBatch, so a
+      caller can work on the previous page while this one is fetched.
+
+    A chunk that fails with a 5xx or a network error is retried with
+    exponential backoff.  A chunk the server rejects as invalid (400) is
+    split in half and each half tried again, so one bad actor does not cost
+    its 24 neighbours; other 4xx answers (403, a 401 that survived a session
+    refresh, or a 429 that outlasted run_curl's own rate-limit retries)
+    fail at once.  Actors that still have no
+    profile are counted in `failed` and reported on stderr.
+    With a ProfileCache installed, only missing or stale actors are requested.
+    """
+
+    def __init__(self, service, access_jwt, workers=PROFILE_WORKERS, chunk=25, retries=PROFILE_RETRIES):
+        self.service = service
+        self.access_jwt = access_jwt
+        self.workers = max(1, int(workers or 1))
+        self.chunk = max(1, int(chunk))
+        self.retries = max(0, int(retries))
+        self.failed = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _submit(self, actors):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="getProfiles")
+        return self._pool.submit(self.fetch_chunk, actors)
+
+    def _plan(self, actors):
+        # De-dup (order kept), take fresh entries from the cache, chunk the rest.
+        uniq = list(dict.fromkeys(a for a in actors if a))
+        cached = {}
+        cache = get_profile_cache()
+        if cache is not None:
+            cached = cache.get_many(uniq)
+            uniq = [a for a in uniq if a not in cached]
+        return cached, [uniq[i:i + self.chunk] for i in range(0, len(uniq), self.chunk)]
+
+    def fetch_chunk(self, actors):
+        """Profiles for one chunk of actors (retrying / splitting as described above)."""
+        metrics = get_metrics()
+        url = f"{self.service}/xrpc/app.bsky.actor.getProfiles?" + "&".join(f"actors={quote(str(a))}" for a in actors)
+        error = None
+        for attempt in range(self.retries + 1):
+            try:
+                res = run_curl("GET", url, headers={"Authorization": f"Bearer {self.access_jwt}"})
+            except XrpcError as e:
+                error = e
+                if e.status == 400 and e.error in (None, "InvalidRequest"):
+                    # The request itself is invalid: isolate the offending actor(s)
+                    if len(actors) > 1:
+                        mid = len(actors) // 2
+                        return self.fetch_chunk(actors[:mid]) + self.fetch_chunk(actors[mid:])
+                    break
+                if e.status is not None and 400 <= e.status < 500:
+                    # 403 and friends will not change on retry; a 401 was
+                    # already retried with a refreshed session, and a 429
+                    # waited out, by run_curl.
+                    break
+                # 5xx: transient, retry the whole chunk
+            except Exception as e:
+                error = e
+            else:
+                profs = (res.get("profiles") or []) if isinstance(res, dict) else []
+                cache = get_profile_cache()
+                if cache is not None:
+                    cache.put_many(profs)
+                return profs
+            if attempt < self.retries:
+                metrics.inc("bsky_profile_chunk_retries_total")
+                time.sleep(min(8.0, 0.5 * 2 ** attempt))
+        with self._lock:
+            self.failed += len(actors)
+        metrics.inc("bsky_profile_fetch_failures_total", len(actors))
+        sys.stderr.write(f"\n[getProfiles] no profiles for {len(actors)} actor(s) ({actors[0]}...): {error}\n")
+        return []
+
+    def submit(self, actors):
+        cached, chunks = self._plan(actors)
+        return ProfileBatch(cached, [self._submit(c) for c in chunks])
+
+    def iter_profiles(self, actors):
+        """Yield lists of profiles as they arrive (cached ones first), in completion order."""
+        cached, chunks = self._plan(actors)
+        if cached:
+            yield list(cached.values())
+        pending = set()
+        chunks = iter(chunks)
+        while True:
+            # Keep at most `workers` chunks queued beyond those running
+            for c in chunks:
+                pending.add(self._submit(c))
+                if len(pending) >= 2 * self.workers:
+                    break
+            if not pending:
+                return
+            done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                profs = f.result()
+                if profs:
+                    yield profs
+
+def iter_profiles(service, access_jwt, actors, chunk=25, workers=PROFILE_WORKERS):
+    """Streaming form of get_profiles_bulk: yields lists of profiles as their requests complete."""
+    with ProfileFetcher(service, access_jwt, workers=workers, chunk=chunk) as fetcher:
+        yield from fetcher.iter_profiles(actors)
+
+def get_profiles_bulk(service, access_jwt, actors, chunk=25, workers=PROFILE_WORKERS):
+    """
+    Fetch richer actor metadata in batches using app.bsky.actor.getProfiles.
+    `actors` may be DIDs or handles. Returns { did_or_handle: profile_dict }.
+    Profile dicts typically include: followersCount, followsCount, postsCount,
+    plus avatar/banner and identity fields.
+    Chunks are requested concurrently and retried on failure (see ProfileFetcher).
+    """
+    with ProfileFetcher(service, access_jwt, workers=workers, chunk=chunk) as fetcher:
+        return fetcher.submit(actors).result()
+
+def get_profile(service, access_jwt, actor):
+    """
+    Profile of one DID or handle, or None.  get_profiles_bulk keys fetched
+    profiles by DID, so a handle is matched against the returned profiles.
+    """
+    actor = actor.lstrip("@")
+    found = get_profiles_bulk(service, access_jwt, [actor])
+    if actor in found:
+        return found[actor]
+    return next((p for p in found.values() if (p.get("handle") or "").lower() == actor.lower()), None)
+
+def expected_count(service, access_jwt, actor, field):
+    """
+    followsCount/followersCount (`field`) of `actor`, used as the progress
+    total for ETAs; None when the profile or the count is unavailable.
+    """
+    return expected_counts(service, access_jwt, actor, field)[0]
+
+def expected_counts(service, access_jwt, actor, *fields):
+    """expected_count for several `fields`, read from a single profile fetch."""
+    prof = get_profile(service, access_jwt, actor) or {}
+    return [n if isinstance(n, int) and n > 0 else None for n in (prof.get(f) for f in fields)]
+
+# ------------------------- Metadata export -------------------------
+# One row per vectorized account: (column, Arrow type).  The CSV export uses
+# the same columns, stringified.
+META_COLUMNS = (
+    ("did", "string"), ("handle", "string"), ("displayName", "string"),
+    ("avatar", "string"), ("banner", "string"),
+    ("followersCount", "int64"), ("followsCount", "int64"), ("postsCount", "int64"),
+    ("viewer_following", "bool"), ("viewer_followedBy", "bool"),
+    ("viewer_muted", "bool"), ("viewer_blocking", "bool"),
+    ("bio_len", "int32"), ("text_len", "int32"),
+    ("vector_md5", "string"), ("vector_path", "string"),
+)
+META_FORMATS = ("auto", "parquet", "arrow")
+_META_SUFFIXES = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+def _import_pyarrow(fmt):
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        if fmt == "parquet":
+            import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise SystemExit(
+            f"--meta-out ({fmt}) requires pyarrow. "
+            "Install it with:  pip install pyarrow"
+        )
+    return pyarrow
+
+class MetaTableWriter:
+    """
+    Streams per-account metadata (META_COLUMNS, typed) to Parquet or an
+    Arrow IPC file.  Rows are buffered column-wise and written as one row
+    group / record batch every `row_group_size` rows, so memory stays
+    bounded however many accounts are exported.  The file is built under
+    '<path>.partial' and renamed on close(): a readable file at `path` is
+    always complete.  `fmt` 'auto' picks the format from the suffix
+    (.parquet/.pq, else Arrow IPC).
+    """
+
+    def __init__(self, path, fmt="auto", row_group_size=10000, compression="zstd"):
+        self.path = Path(path)
+        if fmt == "auto":
+            fmt = _META_SUFFIXES.get(self.path.suffix.lower(), "arrow")
+        self.fmt = fmt
+        self.row_group_size = max(1, int(row_group_size))
+        pa = self._pa = _import_pyarrow(fmt)
+        self.schema = pa.schema([(name, pa.type_for_alias(kind)) for name, kind in META_COLUMNS])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._partial = self.path.with_name(self.path.name + ".partial")
+        if fmt == "parquet":
+            self._writer = pa.parquet.ParquetWriter(str(self._partial), self.schema, compression=compression)
+        else:
+            self._sink = pa.OSFile(str(self._partial), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema,
+                                           options=pa.ipc.IpcWriteOptions(compression=compression))
+        self._columns = {name: [] for name, _ in META_COLUMNS}
+        self.rows = 0
+        self.row_groups = 0
+
+    def write(self, row):
+        for name, col in self._columns.items():
+            col.append(row.get(name))
+        if len(self._columns["did"]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._columns["did"]:
+            return
+        batch = self._pa.record_batch([self._pa.array(self._columns[f.name], type=f.type) for f in self.schema],
+                                      schema=self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        self.row_groups += 1
+        for col in self._columns.values():
+            col.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        if self.fmt != "parquet":
+            self._sink.close()
+        os.replace(self._partial, self.path)
+
+# ------------------------- Decision policy -------------------------
+DECISIONS = ("follow", "skip", "ask")
+
+class DecisionPolicy:
+    """
+    Rules for deciding follow/skip/ask on a candidate without prompting,
+    loaded from a JSON file (--policy).  Recognized keys (all optional):
+
+      allow, deny              lists of DIDs/handles (always follow / never follow)
+      allow_file, deny_file    files with one DID/handle per line, same meaning
+      empty_bio                decision for candidates without a bio (default "skip")
+      min_keyword_matches      fewer matched phrases -> skip (default 1)
+      follow_keyword_matches   at least this many -> follow, otherwise ask (default 1)
+      min_posts, max_posts     postsCount bounds -> skip when outside
+      min_follower_ratio,      followersCount / max(1, followsCount) bounds
+      max_follower_ratio         -> skip when outside
+      missing_stats            decision when a stats rule needs a profile we lack
+                               (default "ask")
+
+    Rules are applied in the order listed; the first one that fires decides.
+    allow/deny and empty_bio are checked before keyword matching, so an
+    allow-listed or bio-less account is decided on even without a keyword hit.
+    """
+
+    STAT_KEYS = ("min_posts", "max_posts", "min_follower_ratio", "max_follower_ratio")
+
+    def __init__(self, rules):
+        base = Path(rules.get("_path", ".")).parent
+        self.allow = {str(a).strip() for a in rules.get("allow") or [] if str(a).strip()}
+        self.deny = {str(a).strip() for a in rules.get("deny") or [] if str(a).strip()}
+        for key, target in (("allow_file", self.allow), ("deny_file", self.deny)):
+            if rules.get(key):
+                path = (base / Path(rules[key]).expanduser())
+                target.update(l.strip() for l in path.read_text(encoding="utf-8").splitlines() if l.strip())
+        self.empty_bio = self._decision(rules, "empty_bio", "skip")
+        self.missing_stats = self._decision(rules, "missing_stats", "ask")
+        self.min_matches = int(rules.get("min_keyword_matches", 1))
+        self.follow_matches = int(rules.get("follow_keyword_matches", 1))
+        self.stat_rules = {k: float(rules[k]) for k in self.STAT_KEYS if rules.get(k) is not None}
+
+    @staticmethod
+    def _decision(rules, key, default):
+        value = rules.get(key, default)
+        if value not in DECISIONS:
+            raise ValueError(f"Policy '{key}' must be one of {', '.join(DECISIONS)}; got {value!r}")
+        return value
+
+    @classmethod
+    def load(cls, path: Path):
+        rules = json.loads(Path(path).read_text(encoding="utf-8"))
+        rules["_path"] = str(path)
+        return cls(rules)
+
+    @property
+    def needs_stats(self):
+        return bool(self.stat_rules)
+
+    def pre_decide(self, actor):
+        """(decision, reason) from the allow/deny/empty_bio rules, or None."""
+        ids = {actor.get("did"), actor.get("handle")} - {None, ""}
+        if ids & self.deny:
+            return "skip", "deny list"
+        if ids & self.allow:
+            return "follow", "allow list"
+        if not combine_bio_desc(actor):
+            return self.empty_bio, "empty bio"
+        return None
+
+    def decide(self, actor, hits, profile=None):
+        """Return (decision, reason) for `actor` given its matched phrases."""
+        pre = self.pre_decide(actor)
+        if pre is not None:
+            return pre
+        if len(hits) < self.min_matches:
+            return "skip", f"{len(hits)} keyword match(es) < {self.min_matches}"
+        if self.stat_rules:
+            if not profile:
+                return self.missing_stats, "no profile stats"
+            posts = profile.get("postsCount") or 0
+            ratio = (profile.get("followersCount") or 0) / max(1, profile.get("followsCount") or 0)
+            r = self.stat_rules
+            if "min_posts" in r and posts < r["min_posts"]:
+                return "skip", f"postsCount {posts} < {r['min_posts']:g}"
+            if "max_posts" in r and posts > r["max_posts"]:
+                return "skip", f"postsCount {posts} > {r['max_posts']:g}"
+            if "min_follower_ratio" in r and ratio < r["min_follower_ratio"]:
+                return "skip", f"follower ratio {ratio:.2f} < {r['min_follower_ratio']:g}"
+            if "max_follower_ratio" in r and ratio > r["max_follower_ratio"]:
+                return "skip", f"follower ratio {ratio:.2f} > {r['max_follower_ratio']:g}"
+        if len(hits) < self.follow_matches:
+            return "ask", f"{len(hits)} keyword match(es) < {self.follow_matches} for auto-follow"
+        return "follow", "all rules passed"
+
+class PolicyRunner:
+    """
+    Applies a DecisionPolicy inside a mode: enriches candidates with
+    getProfiles stats when the rules need them, appends every decision to the
+    JSONL audit file (--audit), and collects the 'ask' bucket for a batch
+    review at the end of the run (or for `--mode review` via --review-file).
+    """
+
+    def __init__(self, args, service, access, mode):
+        self.service = service
+        self.access = access
+        self.mode = mode
+        self.policy = DecisionPolicy.load(Path(args.policy).expanduser())
+        self.audit_path = Path(args.audit).expanduser() if getattr(args, "audit", None) else None
+        self.review_path = Path(args.review_file).expanduser() if getattr(args, "review_file", None) else None
+        self.deferred = []
+        self.counts = Counter()
+
+    def admits(self, actor):
+        """True when the policy wants `actor` considered despite no keyword match."""
+        pre = self.policy.pre_decide(actor)
+        return pre is not None and pre[0] != "skip"
+
+    def profiles_for(self, actors):
+        if not self.policy.needs_stats:
+            return {}
+        return get_profiles_bulk(self.service, self.access, [a.get("did") or a.get("handle") for a in actors])
+
+    def decide(self, actor, hits, profile=None, **context):
+        decision, reason = self.policy.decide(actor, hits, profile)
+        self.counts[decision] += 1
+        rec = {
+            "ts": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": self.mode,
+            "did": actor.get("did"),
+            "handle": actor.get("handle"),
+            "decision": decision,
+            "reason": reason,
+            "matched": list(hits),
+        }
+        if profile:
+            rec.update({k: profile.get(k) for k in ("followersCount", "followsCount", "postsCount")})
+        rec.update(context)
+        if self.audit_path:
+            self.audit_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.audit_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        if decision == "ask":
+            self.deferred.append({"actor": actor, "matched": list(hits), "reason": reason})
+        return decision, reason
+
+    def state(self):
+        """Checkpoint state: the 'ask' bucket (not yet reviewed) and decision counts."""
+        return {"deferred": list(self.deferred), "counts": dict(self.counts)}
+
+    def restore(self, state):
+        if state:
+            self.deferred.extend(state.get("deferred") or [])
+            self.counts.update(state.get("counts") or {})
+
+    def summary(self):
+        return (f"Policy decisions: follow={self.counts['follow']}, skip={self.counts['skip']}, "
+                f"ask={self.counts['ask']}")
+
+    def finish(self, args, did):
+        """Hand the 'ask' bucket to --review-file, or review it now in one batch."""
+        print(self.summary())
+        if not self.deferred:
+            return
+        if self.review_path:
+            self.review_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.review_path.open("a", encoding="utf-8") as fh:
+                for item in self.deferred:
+                    fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+            print(f"Queued {len(self.deferred)} candidate(s) for review in {self.review_path} "
+                  f"(run with --mode review --review-file {self.review_path}).")
+        else:
+            review_candidates(args, self.service, self.access, did, self.deferred)
+        self.deferred = []
+
+def review_candidates(args, service, access, did, items):
+    """
+    Prompt through deferred candidates back-to-back and apply the accepted
+    follows in one applyWrites batch.  Returns (followed, skipped, failed),
+    `failed` being the items whose follow could not be created.
+    """
+    followed, skipped = 0, 0
+    failed = []
+
+    def on_follow(item, ok, info):
+        nonlocal followed
+        if ok:
+            followed += 1
+        else:
+            failed.append(item)
+            a = item.get("actor") or {}
+            print(f"Failed to follow @{a.get('handle') or a.get('did')}: {info}")
+
+    print(f"\n=== Batch review: {len(items)} candidate(s) ===")
+    with WriteBatcher(service, access, did, on_result=on_follow) as writes:
+        for item in items:
+            a = item.get("actor") or {}
+            handle_or_did = a.get("handle") or a.get("did") or "<unknown>"
+            text = combine_bio_desc(a)
+            print("=" * 72)
+            print(f"{a.get('displayName') or handle_or_did}  (@{handle_or_did})")
+            print(f"Bio/Description: {text if text else '(no description)'}")
+            print(f"Matched keywords: {', '.join(item.get('matched') or []) or '(none)'}  [{item.get('reason')}]")
+            print("Follow this account? [y/N]: ", end="", flush=True)
+            choice = sys.stdin.readline().strip().lower()
+            if choice != "y" or not a.get("did"):
+                skipped += 1
+                print("Skipped.")
+            elif args.dry_run:
+                followed += 1
+                print("[dry-run] Would follow (create record).")
+            else:
+                writes.follow(a["did"], tag=item)
+    print(f"Review done. Followed: {followed}, skipped: {skipped}, failed: {len(failed)}")
+    return followed, skipped, failed
+
+# ------------------------- Checkpoints -------------------------
+class Checkpoint:
+    """
+    JSON progress file behind --checkpoint/--resume.  save() is throttled to
+    one write per `interval_sec` unless forced, and replaces the file
+    atomically so a crash mid-write never leaves a torn checkpoint.
+    """
+
+    def __init__(self, path: Path, mode, actor, interval_sec=30.0):
+        self.path = Path(path)
+        self.mode = mode
+        self.actor = actor
+        self.interval_sec = max(0.0, float(interval_sec))
+        self._last = 0.0
+
+    def load(self):
+        if not self.path.exists():
+            return None
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("mode") != self.mode or data.get("actor") != self.actor:
+            raise SystemExit(
+                f"Checkpoint {self.path} belongs to mode '{data.get('mode')}' for "
+                f"'{data.get('actor')}', not '{self.mode}' for '{self.actor}'."
+            )
+        return data.get("state") or {}
+
+    def save(self, snapshot, force=False):
+        """Persist `snapshot()` (a callable returning the state dict) if due."""
+        now = time.monotonic()
+        if not force and self._last and now - self._last < self.interval_sec:
+            return False
+        data = {
+            "mode": self.mode,
+            "actor": self.actor,
+            "saved_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "state": snapshot(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._last = now
+        return True
+
+def open_checkpoint(args, mode, actor):
+    """
+    Return (checkpoint, resumed_state) for --checkpoint/--resume; both are None
+    when checkpointing is off, and the state is None when starting fresh.
+    """
+    path = getattr(args, "checkpoint", None)
+    resume = bool(getattr(args, "resume", False))
+    if not path:
+        if resume:
+            raise SystemExit("--resume requires --checkpoint FILE")
+        return None, None
+    ckpt = Checkpoint(Path(path).expanduser(), mode, actor,
+                      interval_sec=getattr(args, "checkpoint_interval", 30.0))
+    state = ckpt.load() if resume else None
+    if resume and state is None:
+        print(f"No checkpoint at {ckpt.path}; starting fresh.")
+    elif state is not None:
+        print(f"Resuming from checkpoint: {ckpt.path}")
+    return ckpt, state
+
+# ------------------------- Follow graph snapshot -------------------------
+# `crawl` stores the follow graph on disk so graph questions can be answered
+# offline (`--mode graph`): DIDs are interned to dense integer IDs and edges
+# kept in CSR form (offsets + targets) in raw array files that are mmapped
+# on load, so queries run at memory speed without parsing.
+
+def _build_csr(n, keys, vals):
+    """Counting-sort (keys[i] -> vals[i]) edges into CSR offsets/targets, each row sorted."""
+    offsets = array("Q", bytes(8 * (n + 1)))
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    pos = offsets[:-1]
+    targets = array("I", bytes(4 * len(keys)))
+    for k, v in zip(keys, vals):
+        targets[pos[k]] = v
+        pos[k] += 1
+    for i in range(n):
+        s, e = offsets[i], offsets[i + 1]
+        if e - s > 1:
+            targets[s:e] = array("I", sorted(targets[s:e]))
+    return offsets, targets
+
+class GraphBuilder:
+    """
+    Accumulates the graph while crawling: interned DIDs (with handle and bio
+    for offline keyword queries) and edges as two parallel array('I') columns.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.dids = []
+        self.handles = []
+        self.bios = []
+        self.expanded = set()
+        self.src = array("I")
+        self.dst = array("I")
+
+    def __len__(self):
+        return len(self.dids)
+
+    def intern(self, did, handle="", bio=""):
+        i = self.ids.get(did)
+        if i is None:
+            i = self.ids[did] = len(self.dids)
+            self.dids.append(did)
+            self.handles.append(handle or "")
+            self.bios.append(bio or "")
+        elif handle and not self.handles[i]:
+            self.handles[i] = handle
+            self.bios[i] = bio or self.bios[i]
+        return i
+
+    def add_follows(self, a, people):
+        """Record the complete follow list of node `a` (profile views)."""
+        seen = set()
+        for p in people:
+            if not p.get("did"):
+                continue
+            b = self.intern(p["did"], p.get("handle"), combine_bio_desc(p))
+            if b not in seen:
+                seen.add(b)
+                self.src.append(a)
+                self.dst.append(b)
+        self.expanded.add(a)
+
+    def save(self, path: Path, **header):
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        n = len(self.dids)
+        for prefix, keys, vals in (("out", self.src, self.dst), ("in", self.dst, self.src)):
+            offsets, targets = _build_csr(n, keys, vals)
+            for name, arr in ((f"{prefix}_offsets.bin", offsets), (f"{prefix}_targets.bin", targets)):
+                tmp = root / (name + ".tmp")
+                with tmp.open("wb") as fh:
+                    arr.tofile(fh)
+                os.replace(tmp, root / name)
+        clean = lambda s: " ".join(s.split())
+        _write_text_atomic(root / "nodes.tsv", "".join(
+            f"{d}\t{h}\t{int(i in self.expanded)}\t{clean(b)}\n"
+            for i, (d, h, b) in enumerate(zip(self.dids, self.handles, self.bios))
+        ))
+        _write_text_atomic(root / "graph.json", json.dumps({
+            "format": FollowGraph.FORMAT,
+            "byteorder": sys.byteorder,
+            "nodes": n,
+            "edges": len(self.src),
+            "expanded": len(self.expanded),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            **header,
+        }, indent=2))
+
+class FollowGraph:
+    """
+    Read-only view of a crawl snapshot.  Node IDs index nodes.tsv; following(i)
+    and followers(i) return slices of the mmapped CSR arrays.  Only expanded
+    nodes (those whose follow lists were crawled) have complete out-edges, so
+    in-degrees count followers among the expanded nodes.
+    """
+
+    FORMAT = "bsky-graph-1"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.header = json.loads((self.root / "graph.json").read_text(encoding="utf-8"))
+        if self.header.get("format") != self.FORMAT:
+            raise ValueError(f"{self.root} is not a {self.FORMAT} graph snapshot")
+        self.dids, self.handles, self.bios = [], [], []
+        expanded = []
+        for line in (self.root / "nodes.tsv").read_text(encoding="utf-8").splitlines():
+            d, h, x, b = line.split("\t", 3)
+            self.dids.append(d)
+            self.handles.append(h)
+            self.bios.append(b)
+            expanded.append(x == "1")
+        self.expanded = expanded
+        self.ids = {d: i for i, d in enumerate(self.dids)}
+        self._by_handle = None
+        self._maps = []
+        self.out_offsets = self._load("out_offsets.bin", "Q")
+        self.out_targets = self._load("out_targets.bin", "I")
+        self.in_offsets = self._load("in_offsets.bin", "Q")
+        self.in_targets = self._load("in_targets.bin", "I")
+
+    def _load(self, name, code):
+        path = self.root / name
+        if self.header.get("byteorder") != sys.byteorder or path.stat().st_size == 0:
+            arr = array(code)
+            with path.open("rb") as fh:
+                arr.frombytes(fh.read())
+            if self.header.get("byteorder") != sys.byteorder:
+                arr.byteswap()
+            return arr
+        with path.open("rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mm)
+        return memoryview(mm).cast(code)
+
+    def __len__(self):
+        return len(self.dids)
+
+    @property
+    def edges(self):
+        return len(self.out_targets)
+
+    def node(self, key):
+        """ID for a DID or handle (None if not in the snapshot)."""
+        if key in self.ids:
+            return self.ids[key]
+        if self._by_handle is None:
+            self._by_handle = {h: i for i, h in enumerate(self.handles) if h}
+        return self._by_handle.get(key.lstrip("@"))
+
+    def following(self, i):
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def followers(self, i):
+        return self.in_targets[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def out_degree(self, i):
+        return self.out_offsets[i + 1] - self.out_offsets[i]
+
+    def in_degree(self, i):
+        return self.in_offsets[i + 1] - self.in_offsets[i]
+
+    def khop(self, start, k, direction="out"):
+        """
+        Breadth-first expansion from node ID(s) `start` up to `k` hops along
+        follows ("out"), followers ("in") or both.  Returns {id: hops}.
+        """
+        starts = [start] if isinstance(start, int) else list(start)
+        dist = {i: 0 for i in starts}
+        frontier = starts
+        for hop in range(1, max(0, int(k)) + 1):
+            nxt = []
+            for i in frontier:
+                if direction in ("out", "both"):
+                    nxt.extend(self.following(i))
+                if direction in ("in", "both"):
+                    nxt.extend(self.followers(i))
+            frontier = []
+            for j in nxt:
+                if j not in dist:
+                    dist[j] = hop
+                    frontier.append(j)
+            if not frontier:
+                break
+        return dist
+
+    def close(self):
+        for attr in ("out_offsets", "out_targets", "in_offsets", "in_targets"):
+            view = getattr(self, attr)
+            if isinstance(view, memoryview):
+                view.release()
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                # Slices handed out by following()/followers() are still
+                # alive; the mapping is released once they are dropped.
+                pass
+        self._maps = []
+
+# ------------------------- Compact seen-sets -------------------------
+SEEN_SET_CHOICES = ("exact", "bloom")
+
+class DidInterner:
+    """
+    Maps DIDs (or handles) to dense integer IDs 0, 1, 2, ... without keeping
+    a Python str per key: keys are stored back to back in one bytearray, with
+    an array('Q') of end offsets and an open-addressing hash table
+    (array('i'), linear probing, load <= 2/3) of IDs next to each key's hash.
+    did:plc identifiers (24 base32 characters) are packed into 16 bytes, so a
+    DID costs about 40 bytes instead of ~110 for a str in a set.
+    """
+
+    _PLC = "did:plc:"
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._ends = array("Q")
+        self._hashes = array("q")
+        self._table = array("i", [-1]) * 1024
+        self._mask = 1023
+
+    def __len__(self):
+        return len(self._ends)
+
+    @classmethod
+    def _pack(cls, key):
+        if len(key) == 32 and key.startswith(cls._PLC):
+            try:
+                return b"\x00" + base64.b32decode(key[8:].upper())
+            except ValueError:
+                pass
+        return key.encode("utf-8")
+
+    @classmethod
+    def _unpack(cls, raw):
+        if raw[:1] == b"\x00":
+            return cls._PLC + base64.b32encode(raw[1:]).decode("ascii").lower()
+        return raw.decode("utf-8")
+
+    def _raw(self, i):
+        start = self._ends[i - 1] if i else 0
+        return bytes(self._blob[start:self._ends[i]])
+
+    def _slot(self, raw, h):
+        # Slot holding `raw`'s ID, or the empty slot where it would go.
+        table, mask, hashes = self._table, self._mask, self._hashes
+        pos = h & mask
+        while True:
+            i = table[pos]
+            if i < 0 or (hashes[i] == h and self._raw(i) == raw):
+                return pos
+            pos = (pos + 1) & mask
+
+    def get(self, key):
+        """ID of `key`, or None if it was never interned."""
+        raw = self._pack(key)
+        i = self._table[self._slot(raw, hash(raw))]
+        return i if i >= 0 else None
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def intern(self, key):
+        raw = self._pack(key)
+        h = hash(raw)
+        pos = self._slot(raw, h)
+        i = self._table[pos]
+        if i >= 0:
+            return i
+        i = len(self._ends)
+        self._blob += raw
+        self._ends.append(len(self._blob))
+        self._hashes.append(h)
+        self._table[pos] = i
+        if 3 * len(self._ends) > 2 * len(self._table):
+            self._grow()
+        return i
+
+    def _grow(self):
+        table = self._table = array("i", [-1]) * (2 * len(self._table))
+        mask = self._mask = len(table) - 1
+        for i, h in enumerate(self._hashes):
+            pos = h & mask
+            while table[pos] >= 0:
+                pos = (pos + 1) & mask
+            table[pos] = i
+
+    def key(self, i):
+        return self._unpack(self._raw(i))
+
+    def nbytes(self):
+        return (len(self._blob) + self._ends.itemsize * len(self._ends)
+                + self._hashes.itemsize * len(self._hashes) + self._table.itemsize * len(self._table))
+
+class IdSet:
+    """Exact set of keys, stored as a bitmap over a shared DidInterner's IDs."""
+
+    kind = "exact"
+
+    def __init__(self, interner):
+        self.interner = interner
+        self._bits = bytearray()
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        i = self.interner.get(key)
+        return i is not None and (i >> 3) < len(self._bits) and bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def add(self, key):
+        i = self.interner.intern(key)
+        byte, bit = i >> 3, 1 << (i & 7)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        if not self._bits[byte] & bit:
+            self._bits[byte] |= bit
+            self._count += 1
+
+    def update(self, keys):
+        for k in keys:
+            self.add(k)
+
+    def __iter__(self):
+        for byte, v in enumerate(self._bits):
+            if v:
+                for bit in range(8):
+                    if v & (1 << bit):
+                        yield self.interner.key(byte * 8 + bit)
+
+    def nbytes(self):
+        return len(self._bits)
+
+    def state(self):
+        return sorted(self)
+
+class BloomSet:
+    """
+    Probabilistic set: membership can be wrong (a never-added key reported as
+    seen) with probability about `fp_rate`, never the other way round, and no
+    keys are stored.  Scalable Bloom filter: when a layer reaches its capacity
+    a new one twice the size with half the error rate is added, so the total
+    rate stays below `fp_rate` however many keys arrive.  Positions come from
+    blake2b double hashing, as in CountMinSketch.
+    """
+
+    kind = "bloom"
+
+    def __init__(self, fp_rate=0.001, capacity=100_000):
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        self.fp_rate = float(fp_rate)
+        self.capacity = max(1000, int(capacity))
+        self.layers = []  # [m_bits, k, count, capacity, bytearray]
+        self._count = 0
+        self._add_layer()
+
+    def _add_layer(self):
+        n = self.capacity << len(self.layers)
+        p = self.fp_rate / 2 ** (len(self.layers) + 1)
+        m = max(64, int(math.ceil(-n * math.log(p) / (math.log(2) ** 2))))
+        k = max(1, int(round(m / n * math.log(2))))
+        self.layers.append([m, k, 0, n, bytearray((m + 7) // 8)])
+
+    @staticmethod
+    def _hashes(key):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        h1, h2 = self._hashes(key)
+        for m, k, _, _, bits in self.layers:
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in ((h1 + j * h2) % m for j in range(k))):
+                return True
+        return False
+
+    def add(self, key):
+        if key in self:
+            return
+        layer = self.layers[-1]
+        if layer[2] >= layer[3]:
+            self._add_layer()
+            layer = self.layers[-1]
+        m, k, _, _, bits = layer
+        h1, h2 = self._hashes(key)
+        for j in range(k):
+            p = (h1 + j * h2) % m
+            bits[p >> 3] |= 1 << (p & 7)
+        layer[2] += 1
+        self._count += 1
+
+    def update(self, keys):
+        for k in keys:
+            self.add(k)
+
+    def nbytes(self):
+        return sum(len(layer[4]) for layer in self.layers)
+
+    def state(self):
+        return {
+            "bloom": 1, "fp_rate": self.fp_rate, "capacity": self.capacity, "count": self._count,
+            "layers": [[m, k, c, n, base64.b64encode(zlib.compress(bytes(bits))).decode("ascii")]
+                       for m, k, c, n, bits in self.layers],
+        }
+
+    def restore(self, state):
+        self.fp_rate = float(state["fp_rate"])
+        self.capacity = int(state["capacity"])
+        self._count = int(state["count"])
+        self.layers = [[m, k, c, n, bytearray(zlib.decompress(base64.b64decode(b)))]
+                       for m, k, c, n, b in state["layers"]]
+
+def make_seen_set(args, interner=None):
+    """A set for keys already handled: IdSet over `interner`, or a BloomSet with --seen-set bloom."""
+    if getattr(args, "seen_set", "exact") == "bloom":
+        return BloomSet(args.bloom_fp_rate, args.bloom_capacity)
+    return IdSet(interner if interner is not None else DidInterner())
+
+def restore_seen_set(seen, saved):
+    """Load a checkpointed seen-set: a list of keys (exact runs) or a Bloom state."""
+    if isinstance(saved, dict):
+        if not isinstance(seen, BloomSet):
+            raise SystemExit("This checkpoint was written with --seen-set bloom; resume with the same option.")
+        seen.restore(saved)
+    else:
+        seen.update(saved or [])
+
+def seen_sets_summary(interner, sets):
+    """One line for the stats output: entries and memory of the seen-sets (and interner)."""
+    total = sum(s.nbytes() for s in sets.values()) + (interner.nbytes() if interner is not None else 0)
+    kind = next(iter(sets.values())).kind if sets else "exact"
+    parts = ", ".join(f"{name}={len(s)}" for name, s in sets.items())
+    ids = f"; {len(interner)} ids interned" if interner is not None and kind == "exact" else ""
+    return f"Seen-sets ({kind}): {parts}{ids}; {total / (1024 * 1024):.2f} MB"
 
-def _write_vector_file(path: Path, payload: dict):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(path, "wt", encoding="utf-8") as g:
-        json.dump(payload, g, ensure_ascii=False)
+class StringColumn:
+    """Append-only list of short strings kept in one bytearray (end offsets in array('Q'))."""
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._ends = array("Q")
+
+    def __len__(self):
+        return len(self._ends)
 
-def get_profiles_bulk(service, access_jwt, actors, chunk=25):
+    def append(self, value):
+        self._blob += (value or "").encode("utf-8")
+        self._ends.append(len(self._blob))
+
+    def __getitem__(self, i):
+        start = self._ends[i - 1] if i else 0
+        return self._blob[start:self._ends[i]].decode("utf-8")
+
+    def nbytes(self):
+        return len(self._blob) + self._ends.itemsize * len(self._ends)
+
+def sorted_merge(a, b):
     """
-    Fetch richer actor metadata in batches using app.bsky.actor.getProfiles.
-    `actors` may be DIDs or handles. Returns { did_or_handle: profile_dict }.
-    Profile dicts typically include: followersCount, followsCount, postsCount,
-    plus avatar/banner and identity fields.
+    One linear pass over two ascending, duplicate-free ID arrays:
+    returns (in both, only in a, only in b) as array('I').
     """
-    base = f"{service}/xrpc/app.bsky.actor.getProfiles"
-    headers = {"Authorization": f"Bearer {access_jwt}"}
-    # de-dup while preserving order (compact)
-    seen = set()
-    uniq = []
-    for a in actors:
-        if not a:
-            continue
-        if a in seen:
-            continue
-        seen.add(a)
-        uniq.append(a)
-    out_index = {}
-    step = max(1, int(chunk))
-    for i in range(0, len(uniq), step):
-        chunk_actors = uniq[i:i+step]
-        if not chunk_actors:
-            continue
-        # Build query string with repeated ?actors= entries
-        qs = "?" + "&".join(f"actors={quote(str(a))}" for a in chunk_actors)
-        try:
-            res = run_curl("GET", base + qs, headers=headers)
-        except Exception:
-            continue
-        profs = (res.get("profiles") or []) if isinstance(res, dict) else []
-        for p in profs:
-            key = p.get("did") or p.get("handle")
-            if key:
-                out_index[key] = p
-    return out_index
+    both, only_a, only_b = array("I"), array("I"), array("I")
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            both.append(x)
+            i += 1
+            j += 1
+        elif x < y:
+            only_a.append(x)
+            i += 1
+        else:
+            only_b.append(y)
+            j += 1
+    only_a.extend(a[i:])
+    only_b.extend(b[j:])
+    return both, only_a, only_b
+
+def slim_profile(p):
+    """Only the profile fields seeds and checkpoints need, instead of the full view."""
+    out = {"did": p.get("did"), "handle": p.get("handle"), "displayName": p.get("displayName"),
+           "description": combine_bio_desc(p)}
+    if isinstance(p.get("followersCount"), int):
+        out["followersCount"] = p["followersCount"]
+    return out
+
+# ------------------------- Seed frontier (degreesearch) -------------------------
+FRONTIER_CHOICES = ("priority", "fifo")
+
+class SeedFrontier:
+    """
+    Follower pages waiting to be fetched in degreesearch, one entry per
+    (seed, cursor).  With strategy 'priority' the next page is the one with
+    the most expected keyword-matching candidates per request:
+
+        expected = page capacity * match rate
+        rate     = (matched + W * prior) / (reviewed + W)
+        prior    = global match rate * (1 + 0.5 * (keyword hits in the seed bio - 1))
+
+    so a seed starts from the run-wide hit rate scaled by how strongly its own
+    bio matches, and the observed yield of its pages takes over as they come
+    in; deeper pages of productive seeds outrank fresh low-yield seeds.
+    Page capacity is capped by the seed's followersCount when the profile
+    carries it.  Scores drift as the global rate changes, so they are
+    re-checked lazily when popped.  'fifo' keeps plain insertion order.
+
+    `seeds` holds the per-seed yield (pages, reviewed, matched, followed).
+    """
+
+    PRIOR_WEIGHT = 20.0  # followers' worth of evidence the prior is worth
+
+    def __init__(self, page_size, strategy="priority", strength=None):
+        self.page_size = max(1, int(page_size))
+        self.strategy = strategy
+        self.strength = strength or (lambda seed: 1)
+        self.seeds = {}
+        self.reviewed = 0
+        self.matched = 0
+        self.fresh = 0  # entries for seeds not expanded yet (cursor None)
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _record(self, key, seed, depth):
+        rec = self.seeds.get(key)
+        if rec is None:
+            followers = seed.get("followersCount")
+            rec = self.seeds[key] = {
+                "actor": seed.get("handle") or seed.get("did") or key,
+                "depth": depth,
+                "strength": max(1, int(self.strength(seed) or 1)),
+                "followers": followers if isinstance(followers, int) else None,
+                "pages": 0, "reviewed": 0, "matched": 0, "followed": 0,
+            }
+        return rec
+
+    def score(self, key):
+        """Expected keyword-matching candidates from the seed's next page."""
+        rec = self.seeds[key]
+        prior = (self.matched + 1.0) / (self.reviewed + 10.0) * (1.0 + 0.5 * (rec["strength"] - 1))
+        rate = (rec["matched"] + self.PRIOR_WEIGHT * prior) / (rec["reviewed"] + self.PRIOR_WEIGHT)
+        capacity = self.page_size
+        if rec["followers"] is not None:
+            capacity = max(1, min(capacity, rec["followers"] - rec["reviewed"]))
+        return capacity * rate
+
+    def _priority(self, key):
+        return -self.score(key) if self.strategy == "priority" else 0.0
+
+    def push(self, key, seed, depth, cursor=None, seq=None, priority=None):
+        self._record(key, seed, depth)
+        if seq is None:
+            seq = self._seq
+        self._seq = max(self._seq, seq + 1)
+        if priority is None:
+            priority = self._priority(key)
+        heapq.heappush(self._heap, (priority, seq, key, cursor, depth, seed))
+        if cursor is None:
+            self.fresh += 1
+
+    def pop(self):
+        """Best (seed, depth, cursor), or None when empty."""
+        while self._heap:
+            prio, seq, key, cursor, depth, seed = heapq.heappop(self._heap)
+            if self.strategy == "priority" and self._heap:
+                current = self._priority(key)
+                if current > self._heap[0][0] + 1e-12:
+                    heapq.heappush(self._heap, (current, seq, key, cursor, depth, seed))
+                    continue
+            if cursor is None:
+                self.fresh -= 1
+            return seed, depth, cursor
+        return None
+
+    def peek(self, n):
+        """The next `n` entries as (seed, depth, cursor), best first (scores as last computed)."""
+        return [(e[5], e[4], e[3]) for e in heapq.nsmallest(n, self._heap)]
 
+    def page_done(self, key, reviewed, matched):
+        rec = self.seeds[key]
+        rec["pages"] += 1
+        rec["reviewed"] += reviewed
+        rec["matched"] += matched
+        self.reviewed += reviewed
+        self.matched += matched
+
+    def followed(self, key):
+        if key in self.seeds:
+            self.seeds[key]["followed"] += 1
+
+    def top(self, n=10):
+        """Expanded seeds ranked by matched candidates per page."""
+        done = [r for r in self.seeds.values() if r["pages"]]
+        return sorted(done, key=lambda r: (r["matched"] / r["pages"], r["matched"]), reverse=True)[:n]
+
+    def state(self):
+        # Entries keep their heap priority and order: scores are only
+        # re-checked lazily, so recomputing them all on resume would change
+        # which page comes next.
+        return {
+            "entries": [[seed, depth, cursor, prio, seq]
+                        for prio, seq, _, cursor, depth, seed in sorted(self._heap, key=lambda e: e[1])],
+            "seeds": self.seeds,
+            "reviewed": self.reviewed,
+            "matched": self.matched,
+        }
+
+    def restore(self, state, key_of):
+        self.seeds.update(state.get("seeds") or {})
+        self.reviewed = int(state.get("reviewed", 0))
+        self.matched = int(state.get("matched", 0))
+        for seed, depth, cursor, *heap_pos in state.get("entries") or []:
+            # Checkpoints from before entries kept [priority, seq] get fresh ones
+            prio, seq = heap_pos if len(heap_pos) == 2 else (None, None)
+            self.push(key_of(seed), seed, depth, cursor, seq=seq, priority=prio)
 
 # ------------------------- Modes (batched) -------------------------
 def mode_following(args, service, access, did, handle, keywords):
@@ -442,10 +3460,23 @@ def mode_following(args, service, access, did, handle, keywords):
     """
     print("Streaming your follows in batches ...")
     batch_size = max(1, args.limit)
+    matcher = KeywordMatcher(keywords)
     kept, reviewed_no_match, empties = 0, 0, 0
     batches = 0
 
-    for follows in iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000):
+    def on_unfollow(actor, ok, info):
+        if ok:
+            print(f"Unfollowed (empty description): @{actor}")
+        else:
+            print(f"Failed to unfollow @{actor}: {info}")
+
+    # Empty-bio unfollows are queued and applied via applyWrites before the
+    # first prompt of each batch (empties are sorted first).
+    unfollows = WriteBatcher(service, access, did, on_result=on_unfollow)
+    progress = Progress("following", total=expected_count(service, access, did, "followsCount"))
+
+    for follows in iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000,
+                                prefetch=args.prefetch):
         batches += 1
         print(f"\n--- Batch {batches} (size={len(follows)}) ---")
 
@@ -454,6 +3485,7 @@ def mode_following(args, service, access, did, handle, keywords):
             follows.sort(key=lambda f: 0 if not combine_bio_desc(f) else 1)
 
         for f in follows:
+            progress.advance()
             display = f.get("displayName") or f.get("handle") or f.get("did") or "<unknown>"
             actor = f.get("handle") or f.get("did") or "<unknown>"
             text = combine_bio_desc(f)
@@ -471,18 +3503,19 @@ def mode_following(args, service, access, did, handle, keywords):
                         print(f"[dry-run] Would unfollow (empty description) via record {follow_uri}")
                     else:
                         try:
-                            delete_follow_record(service, access, did, follow_uri)
-                            print("Unfollowed (empty description).")
+                            unfollows.unfollow(follow_uri, tag=actor)
+                            print("Queued unfollow (empty description).")
                         except Exception as e:
                             print(f"Failed to unfollow: {e}")
                 empties += 1
                 continue
 
             # If keywords were provided and there's a match, keep without prompting
-            if keywords and matches_any_keyword(text, keywords):
+            if keywords and matcher.matches(text):
                 kept += 1
                 continue
 
+            unfollows.flush()
             reviewed_no_match += 1
             print("=" * 72)
             print(f"{display}  (@{actor})")
@@ -510,6 +3543,9 @@ def mode_following(args, service, access, did, handle, keywords):
             else:
                 print("Left untouched.")
 
+        unfollows.flush()
+    progress.finish()
+
     print("\nDone.")
     print(f"Kept (keyword matched): {kept}")
     print(f"Reviewed without match: {reviewed_no_match}")
@@ -524,25 +3560,44 @@ def mode_searching(args, service, access, did, handle, keywords):
         return
 
     print(f"Searching for users by {len(keywords)} keyword(s) in batches of {args.limit} ...")
-    seen = set()
-    session_followed = set()
+    interner = DidInterner() if getattr(args, "seen_set", "exact") == "exact" else None
+    seen = make_seen_set(args, interner)
+    session_followed = make_seen_set(args, interner)
     added, skipped = 0, 0
     batch_size = max(1, args.limit)
+    matcher = KeywordMatcher(keywords)
+    runner = PolicyRunner(args, service, access, "searching") if getattr(args, "policy", None) else None
+    progress = Progress("searching")
+
+    def on_follow(actor, ok, info):
+        nonlocal added, skipped
+        if ok:
+            print(f"Followed @{actor}.")
+            added += 1
+        else:
+            print(f"Failed to follow @{actor}: {info}")
+            skipped += 1
+
+    # Accepted follows are written via applyWrites at the end of each page.
+    follows_out = WriteBatcher(service, access, did, on_result=on_follow)
 
     for kw in keywords:
         pages = 0
         for page in iter_search_actors(service, access, kw, batch_size=min(50, batch_size),
-                                       max_pages=max(1, (batch_size + 49)//50)):
+                                       max_pages=max(1, (batch_size + 49)//50), prefetch=args.prefetch):
             pages += 1
             print(f"\n--- Keyword '{kw}' — page {pages}, {len(page)} results ---")
+            prof_index = runner.profiles_for(page) if runner else {}
             for a in page:
                 key = a.get("did") or a.get("handle")
                 if not key or key in seen:
                     continue
                 seen.add(key)
+                progress.advance()
 
                 text = combine_bio_desc(a)
-                if kw not in (text.lower() if text else ""):
+                kw_hit = kw in (text.lower() if text else "")
+                if not kw_hit and not (runner and runner.admits(a)):
                     continue
 
                 if (a.get("viewer") or {}).get("following") or key in session_followed:
@@ -554,9 +3609,17 @@ def mode_searching(args, service, access, did, handle, keywords):
                 print("=" * 72)
                 print(f"{display}  (@{handle_or_did})")
                 print(f"Bio/Description: {text if text else '(no description)'}")
-                print(f"Matched keyword: {kw}")
-                print("Follow this account? [y/N]: ", end="", flush=True)
-                choice = sys.stdin.readline().strip().lower()
+                print(f"Matched keyword: {kw if kw_hit else '(none)'}")
+                if runner:
+                    hits = (matcher.find(text) or [kw]) if kw_hit else []
+                    decision, reason = runner.decide(a, hits, prof_index.get(key), keyword=kw)
+                    print(f"Policy: {decision} ({reason})")
+                    if decision == "ask":
+                        continue
+                    choice = "y" if decision == "follow" else "n"
+                else:
+                    print("Follow this account? [y/N]: ", end="", flush=True)
+                    choice = sys.stdin.readline().strip().lower()
                 if choice == "y":
                     subject_did = a.get("did")
                     if not subject_did:
@@ -568,20 +3631,20 @@ def mode_searching(args, service, access, did, handle, keywords):
                         print("[dry-run] Would follow (create record).")
                         added += 1
                     else:
-                        try:
-                            create_follow_record(service, access, did, subject_did)
-                            print("Followed.")
-                            added += 1
-                        except Exception as e:
-                            print(f"Failed to follow: {e}")
-                            skipped += 1
+                        follows_out.follow(subject_did, tag=handle_or_did)
+                        print("Queued follow.")
                 else:
                     skipped += 1
                     print("Skipped.")
+            follows_out.flush()
+    progress.finish()
 
+    if runner:
+        runner.finish(args, did)
     print("\nDone.")
     print(f"Followed new accounts: {added}")
     print(f"Skipped: {skipped}")
+    print(seen_sets_summary(interner, {"seen": seen, "followed": session_followed}))
     if args.dry_run:
         print("NOTE: dry-run mode; no changes were made.")
 
@@ -590,9 +3653,13 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
     Depth-based exploration (batched, streaming):
       - Seeds streamed from your 'follows' in batches of --limit.
       - Only seeds whose bio/description matches any keyword are expanded.
-      - For each matching seed, stream ONE page of its followers (size --limit) and prompt to follow.
+      - Follower pages (size --limit) of matching seeds are fetched best-first
+        from a SeedFrontier (--frontier): fresh seeds compete with deeper
+        pages (up to --seed-pages) of seeds whose earlier pages yielded
+        matches; each reviewed page prompts to follow its matching candidates.
       - If you follow someone and depth < --degreelimit, enqueue that account as a new seed.
-    Prints per-100-account stats to STDERR.
+      - --page-budget stops after that many follower pages.
+    Prints per-100-account stats, including per-seed yield, to STDERR.
     """
     if not keywords:
         print("No keywords provided; nothing to match.", file=sys.stderr)
@@ -600,8 +3667,16 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
 
     max_depth = max(1, int(args.degreelimit))
     batch_size = max(1, args.limit)
+    seed_pages = max(1, int(getattr(args, "seed_pages", 1) or 1))
+    page_budget = max(0, int(getattr(args, "page_budget", 0) or 0))
 
     print(f"Exploring up to depth (--degreelimit) = {max_depth}. Batch size (--limit) = {batch_size}.")
+    print(f"Frontier: {args.frontier}, up to {seed_pages} follower page(s) per seed"
+          + (f", budget {page_budget} pages." if page_budget else "."))
+
+    matcher = KeywordMatcher(keywords)
+    frontier = SeedFrontier(batch_size, strategy=args.frontier,
+                            strength=lambda seed: len(matcher.find(combine_bio_desc(seed))))
 
     # Stats that report every 100 follower-accounts processed
     STATS_BATCH_N = 100
@@ -611,12 +3686,15 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
             self.n = n
             self.cum = Counter()
             self.block = Counter()
+            self.progress = Progress("degreesearch", unit="followers")
 
         def _b(self, k, inc=1):
             self.block[k] = self.block.get(k, 0) + inc
             self.cum[k] = self.cum.get(k, 0) + inc
+            get_metrics().inc("bsky_degreesearch_events_total", inc, event=k)
 
         def account_seen(self):
+            self.progress.advance()
             self._b("followers_iterated", 1)
             if self.block.get("followers_iterated", 0) >= self.n:
                 self.report_block()
@@ -632,11 +3710,13 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
         def keyword_miss(self): self._b("keyword_miss", 1)
 
         def candidate(self): self._b("candidates_considered", 1); self._b("prompted", 1)
+        def deferred(self): self._b("deferred_ask", 1)
         def followed(self): self._b("followed_added", 1)
         def declined(self): self._b("user_declined", 1)
         def no_did_skip(self): self._b("no_did_skip", 1)
         def api_error(self): self._b("api_error", 1)
         def enqueued(self): self._b("enqueued_new_seeds", 1)
+        def page_fetched(self): self._b("pages_fetched", 1)
 
         def _format(self, d):
             skipped = d.get("keyword_miss",0)+d.get("already_following_skip",0)+d.get("dedup_skip",0)+d.get("self_skip",0)+d.get("no_key_skip",0)
@@ -644,36 +3724,132 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
                 f"  Followers processed: {d.get('followers_iterated',0)}  (skipped: {skipped})",
                 f"    - keyword_miss={d.get('keyword_miss',0)}, already_following={d.get('already_following_skip',0)}, dedup={d.get('dedup_skip',0)}, self={d.get('self_skip',0)}, no_key={d.get('no_key_skip',0)}",
                 f"  Candidates prompted: {d.get('prompted',0)}",
-                f"    - followed={d.get('followed_added',0)}, declined={d.get('user_declined',0)}, no_did={d.get('no_did_skip',0)}, api_error={d.get('api_error',0)}, enqueued_new_seeds={d.get('enqueued_new_seeds',0)}",
+                f"    - followed={d.get('followed_added',0)}, declined={d.get('user_declined',0)}, no_did={d.get('no_did_skip',0)}, api_error={d.get('api_error',0)}, enqueued_new_seeds={d.get('enqueued_new_seeds',0)}, deferred_ask={d.get('deferred_ask',0)}",
                 f"  Seeds: seen={d.get('seeds_seen',0)}, matched={d.get('seeds_matched',0)}",
             ]
             return '\n'.join(lines)
 
+        def restore(self, cum):
+            self.cum = Counter(cum or {})
+            self.progress.done = self.progress.start = self.cum.get("followers_iterated", 0)
+
+        def _format_seeds(self, n):
+            lines = []
+            for r in frontier.top(n):
+                lines.append(f"    - @{r['actor']} (depth {r['depth']}): pages={r['pages']}, reviewed={r['reviewed']}, "
+                             f"matched={r['matched']} ({r['matched'] / r['pages']:.1f}/page), followed={r['followed']}")
+            return '\n'.join(lines)
+
         def report_block(self):
             sys.stderr.write('\n[degreesearch] Stats for last %d accounts:\n' % self.n)
             sys.stderr.write(self._format(self.block) + '\n')
             sys.stderr.write('[degreesearch] Cumulative so far:\n')
             sys.stderr.write(self._format(self.cum) + '\n')
+            if frontier.seeds:
+                sys.stderr.write(f"  Follower pages: {self.cum.get('pages_fetched', 0)}; "
+                                 f"candidates/page: {self.cum.get('candidates_considered', 0) / max(1, self.cum.get('pages_fetched', 0)):.2f}\n")
+                sys.stderr.write('  Top seeds by yield:\n' + self._format_seeds(5) + '\n')
+            sys.stderr.write('  ' + self.memory() + '\n')
+            sys.stderr.flush()
+
+        def memory(self):
+            sets = {"visited": visited_seeds, "candidates": seen_candidates, "followed": session_followed}
+            get_metrics().set("bsky_seen_set_bytes", sum(x.nbytes() for x in sets.values())
+                              + (interner.nbytes() if interner is not None else 0), mode="degreesearch")
+            return seen_sets_summary(interner, sets)
+
+        def report_seeds(self, n=10):
+            sys.stderr.write(f"\n[degreesearch] Per-seed yield ({self.cum.get('pages_fetched', 0)} follower pages, "
+                             f"{self.cum.get('candidates_considered', 0)} candidates):\n")
+            sys.stderr.write((self._format_seeds(n) or '    (no seeds expanded)') + '\n')
+            sys.stderr.write('  ' + self.memory() + '\n')
             sys.stderr.flush()
 
     stats = Stats()
 
+    runner = PolicyRunner(args, service, access, "degreesearch") if getattr(args, "policy", None) else None
+
     def seed_matches(obj):
-        return matches_any_keyword(combine_bio_desc(obj), keywords)
+        return matcher.matches(combine_bio_desc(obj))
+
+    def key_of(obj):
+        return obj.get("did") or obj.get("handle")
 
-    # Stream seeds from your follows
-    seed_source = iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000)
     seed_buffer = deque()
-    queue = deque()
-    visited_seeds = set()
-    seen_candidates = set()
-    session_followed = set()
+    interner = DidInterner() if getattr(args, "seen_set", "exact") == "exact" else None
+    visited_seeds = make_seen_set(args, interner)
+    seen_candidates = make_seen_set(args, interner)
+    session_followed = make_seen_set(args, interner)
     added, skipped = 0, 0
     source_exhausted = False
     current_seed_batch_idx = 0
+    seed_cursor = None
 
-    def key_of(obj):
-        return obj.get("did") or obj.get("handle")
+    ckpt, state = open_checkpoint(args, "degreesearch", handle)
+    if state:
+        seed_cursor = state.get("seed_cursor")
+        source_exhausted = bool(state.get("source_exhausted"))
+        seed_buffer.extend(state.get("seed_buffer") or [])
+        if "frontier" in state:
+            frontier.restore(state["frontier"], key_of)
+        else:
+            # Checkpoints from before the frontier: a FIFO queue of (seed, depth)
+            for s, d in state.get("queue") or []:
+                frontier.push(key_of(s), s, d)
+        restore_seen_set(visited_seeds, state.get("visited_seeds"))
+        restore_seen_set(seen_candidates, state.get("seen_candidates"))
+        restore_seen_set(session_followed, state.get("session_followed"))
+        added = int(state.get("added", 0))
+        skipped = int(state.get("skipped", 0))
+        current_seed_batch_idx = int(state.get("seed_batches", 0))
+        stats.restore(state.get("stats"))
+        if runner:
+            runner.restore(state.get("policy"))
+
+    def set_seed_cursor(c):
+        nonlocal seed_cursor, source_exhausted
+        seed_cursor = c
+        if c is None:
+            # Last page is being handed out; nothing to resume from afterwards.
+            source_exhausted = True
+
+    def snapshot():
+        return {
+            "seed_cursor": seed_cursor,
+            "source_exhausted": source_exhausted,
+            "seed_buffer": list(seed_buffer),
+            "frontier": frontier.state(),
+            "visited_seeds": visited_seeds.state(),
+            "seen_candidates": seen_candidates.state(),
+            "session_followed": session_followed.state(),
+            "added": added,
+            "skipped": skipped,
+            "seed_batches": current_seed_batch_idx,
+            "stats": dict(stats.cum),
+            "policy": runner.state() if runner else None,
+        }
+
+    # Stream seeds from your follows
+    seed_source = iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000,
+                               cursor=seed_cursor, on_cursor=set_seed_cursor, prefetch=args.prefetch)
+
+    def on_follow(tag, ok, info):
+        nonlocal added, skipped
+        f, f_depth, seed_key = tag
+        handle_or_did = f.get("handle") or f.get("did") or "<unknown>"
+        if ok:
+            print(f"Followed @{handle_or_did}.")
+            stats.followed(); added += 1
+            frontier.followed(seed_key)
+            if f_depth <= max_depth - 1:
+                frontier.push(key_of(f), slim_profile(with_cached_counts([f])[0]), f_depth); stats.enqueued()
+        else:
+            print(f"Failed to follow @{handle_or_did}: {info}")
+            stats.api_error(); skipped += 1
+
+    # Accepted follows are written via applyWrites after each follower page;
+    # successful ones are enqueued as new seeds in acceptance order.
+    follows_out = WriteBatcher(service, access, did, on_result=on_follow)
 
     def refill_seeds():
         nonlocal source_exhausted, current_seed_batch_idx
@@ -686,108 +3862,190 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
             return False
         current_seed_batch_idx += 1
         print(f"\n--- Seed batch {current_seed_batch_idx} (size={len(follows_batch)}) ---")
-        for s in follows_batch:
-            seed_buffer.append(s)
+        # Cached getProfiles counts size the seeds' follower pages in the frontier
+        for s in with_cached_counts(follows_batch):
+            seed_buffer.append(slim_profile(s))
         return True
 
-    if not refill_seeds() and not seed_buffer:
-        print("You do not follow anyone (or no data returned).")
+    # A resumed run continues with its restored seeds before reading more.
+    if not seed_buffer and not len(frontier) and not refill_seeds():
+        if state:
+            print("The checkpointed run already finished; nothing left to explore.")
+        else:
+            print("You do not follow anyone (or no data returned).")
         return
 
-    while True:
-        while seed_buffer and len(queue) < batch_size:
-            seed = seed_buffer.popleft()
-            k = key_of(seed)
-            if not k or k in visited_seeds:
+    # Follower pages are fetched ahead of time for the next few frontier
+    # entries, so network latency overlaps with review.  Pages are still
+    # consumed one at a time in frontier order, keeping dedup deterministic.
+    concurrency = max(1, int(getattr(args, "concurrency", 1) or 1))
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    inflight = {}
+    pages_fetched = stats.cum.get("pages_fetched", 0)
+
+    def fetch_follower_page(actor, cursor):
+        pages = _paginate(access, f"{service}/xrpc/app.bsky.graph.getFollowers", f"actor={actor}",
+                          "followers", batch_size, 1, cursor)
+        followers, next_cursor = next(pages, ([], None))
+        cache_page_profiles(followers)
+        return followers, next_cursor
+
+    def prefetch(obj, cursor):
+        fk = (key_of(obj), cursor)
+        if fk[0] and fk not in inflight:
+            actor = obj.get("handle") or obj.get("did")
+            inflight[fk] = pool.submit(fetch_follower_page, actor, cursor)
+
+    def drop_prefetch(key, cursor):
+        # A skipped frontier entry must not keep holding a prefetch slot.
+        future = inflight.pop((key, cursor), None)
+        if future is not None:
+            future.cancel()
+
+    def schedule_prefetch():
+        for s, d, c in frontier.peek(concurrency * 2):
+            if len(inflight) >= concurrency:
+                break
+            sk = key_of(s)
+            if not sk or (c is None and sk in visited_seeds) or (sk, c) in inflight or d >= max_depth:
                 continue
-            stats.seed_seen()
-            if not seed_matches(seed):
+            if seed_matches(s):
+                prefetch(s, c)
+
+    try:
+        while True:
+            if ckpt:
+                ckpt.save(snapshot)
+            while seed_buffer and frontier.fresh < batch_size:
+                seed = seed_buffer.popleft()
+                k = key_of(seed)
+                if not k or k in visited_seeds:
+                    continue
+                stats.seed_seen()
+                if not seed_matches(seed):
+                    continue
+                stats.seed_matched()
+                frontier.push(k, seed, 0)
+
+            if page_budget and pages_fetched >= page_budget:
+                print(f"\nReached --page-budget ({page_budget} follower pages); stopping.")
+                break
+
+            if not len(frontier):
+                if refill_seeds():
+                    continue
+                break
+
+            seed, depth, cursor = frontier.pop()
+            k = key_of(seed)
+            if not k:
                 continue
-            stats.seed_matched()
-            queue.append((seed, 0))
+            if cursor is None:
+                if k in visited_seeds:
+                    drop_prefetch(k, cursor)
+                    continue
+                visited_seeds.add(k)
 
-        if not queue:
-            if refill_seeds():
+            # Enforce keyword match at all depths before expanding this seed
+            if not seed_matches(seed):
+                # Not a keyword match anymore (or never was) — skip expanding
+                drop_prefetch(k, cursor)
                 continue
-            break
 
-        seed, depth = queue.popleft()
-        k = key_of(seed)
-        if not k or k in visited_seeds:
-            continue
-        visited_seeds.add(k)
+            seed_handle_or_did = seed.get("handle") or seed.get("did") or "<unknown>"
+            seed_text = combine_bio_desc(seed)
+            page_no = frontier.seeds[k]["pages"] + 1
+            print("=" * 72)
+            print(f"Seed (depth {depth}): {seed.get('displayName') or seed_handle_or_did} (@{seed_handle_or_did})"
+                  + (f"  — follower page {page_no}" if cursor else ""))
+            print(f"Bio/Description: {seed_text if seed_text else '(no description)'}")
 
-        # Enforce keyword match at all depths before expanding this seed
-        if not seed_matches(seed):
-            # Not a keyword match anymore (or never was) — skip expanding
-            continue
+            if depth >= max_depth:
+                print("(Reached max depth for this branch; not expanding followers.)")
+                drop_prefetch(k, cursor)
+                continue
 
-        seed_handle_or_did = seed.get("handle") or seed.get("did") or "<unknown>"
-        seed_text = combine_bio_desc(seed)
-        print("=" * 72)
-        print(f"Seed (depth {depth}): {seed.get('displayName') or seed_handle_or_did} (@{seed_handle_or_did})")
-        print(f"Bio/Description: {seed_text if seed_text else '(no description)'}")
+            # Fetch the next follower page of this seed (prefetched when possible)
+            prefetch(seed, cursor)
+            schedule_prefetch()
+            followers, next_cursor = inflight.pop((k, cursor)).result()
+            pages_fetched += 1
+            stats.page_fetched()
+            page_matches = 0
+            if followers:
+                print(f"  Followers page — {len(followers)} accounts to review at depth {depth+1}.")
+                prof_index = runner.profiles_for([f for f in followers if matcher.matches(combine_bio_desc(f))]) if runner else {}
+                for f in followers:
+                    stats.account_seen()
+                    f_key = key_of(f)
+                    if not f_key:
+                        stats.no_key_skip(); continue
+                    if f_key in seen_candidates:
+                        stats.dedup_skip(); continue
+                    if f_key == did:
+                        stats.self_skip(); continue
+                    if (f.get('viewer') or {}).get('following') or f_key in session_followed:
+                        stats.already_following_skip(); continue
 
-        if depth >= max_depth:
-            print("(Reached max depth for this branch; not expanding followers.)")
-            continue
+                    f_text = combine_bio_desc(f)
+                    f_hits = matcher.find(f_text)
+                    if not f_hits and not (runner and runner.admits(f)):
+                        stats.keyword_miss(); continue
 
-        # Fetch one page of followers for this seed
-        follower_pages = iter_followers(service, access, seed_handle_or_did, batch_size=batch_size, max_pages=1)
-        for followers in follower_pages:
-            print(f"  Followers page — {len(followers)} accounts to review at depth {depth+1}.")
-            for f in followers:
-                stats.account_seen()
-                f_key = key_of(f)
-                if not f_key:
-                    stats.no_key_skip(); continue
-                if f_key in seen_candidates:
-                    stats.dedup_skip(); continue
-                if f_key == did:
-                    stats.self_skip(); continue
-                if (f.get('viewer') or {}).get('following') or f_key in session_followed:
-                    stats.already_following_skip(); continue
-
-                f_text = combine_bio_desc(f)
-                if not matches_any_keyword(f_text, keywords):
-                    stats.keyword_miss(); continue
-
-                seen_candidates.add(f_key)
-                display = f.get("displayName") or f.get("handle") or f.get("did") or "<unknown>"
-                handle_or_did = f.get("handle") or f.get("did") or "<unknown>"
-                print("-" * 72)
-                print(f"Candidate (depth {depth+1}): {display}  (@{handle_or_did})  — follower of seed above")
-                print(f"Bio/Description: {f_text if f_text else '(no description)'}")
-                print("Follow this account? [Y/n]: ", end="", flush=True)
-                stats.candidate()
-                choice = sys.stdin.readline().strip().lower()
-
-                if choice in ("", "y", "yes"):
-                    subject_did = f.get("did")
-                    if not subject_did:
-                        print("No DID for actor; cannot follow.")
-                        stats.no_did_skip(); skipped += 1
+                    seen_candidates.add(f_key)
+                    display = f.get("displayName") or f.get("handle") or f.get("did") or "<unknown>"
+                    handle_or_did = f.get("handle") or f.get("did") or "<unknown>"
+                    print("-" * 72)
+                    print(f"Candidate (depth {depth+1}): {display}  (@{handle_or_did})  — follower of seed above")
+                    print(f"Bio/Description: {f_text if f_text else '(no description)'}")
+                    print(f"Matched keywords: {', '.join(f_hits) or '(none)'}")
+                    stats.candidate(); page_matches += 1
+                    if runner:
+                        decision, reason = runner.decide(f, f_hits, prof_index.get(f_key), depth=depth + 1, seed=k)
+                        print(f"Policy: {decision} ({reason})")
+                        if decision == "ask":
+                            stats.deferred(); continue
+                        choice = "y" if decision == "follow" else "n"
                     else:
-                        session_followed.add(subject_did)
-                        if args.dry_run:
-                            print("[dry-run] Would follow (create record).")
-                            stats.followed(); added += 1
-                            if depth + 1 <= max_depth - 1 and seed_matches(f):
-                                queue.append((f, depth + 1)); stats.enqueued()
+                        print("Follow this account? [Y/n]: ", end="", flush=True)
+                        choice = sys.stdin.readline().strip().lower()
+
+                    if choice in ("", "y", "yes"):
+                        subject_did = f.get("did")
+                        if not subject_did:
+                            print("No DID for actor; cannot follow.")
+                            stats.no_did_skip(); skipped += 1
                         else:
-                            try:
-                                create_follow_record(service, access, did, subject_did)
-                                print("Followed.")
+                            session_followed.add(subject_did)
+                            if args.dry_run:
+                                print("[dry-run] Would follow (create record).")
                                 stats.followed(); added += 1
-                                if depth + 1 <= max_depth - 1 and seed_matches(f):
-                                    queue.append((f, depth + 1)); stats.enqueued()
-                            except Exception as e:
-                                print(f"Failed to follow: {e}")
-                                stats.api_error(); skipped += 1
-                else:
-                    stats.declined(); skipped += 1
-                    print("Skipped.")
+                                frontier.followed(k)
+                                if depth + 1 <= max_depth - 1:
+                                    frontier.push(key_of(f), slim_profile(with_cached_counts([f])[0]), depth + 1); stats.enqueued()
+                            else:
+                                follows_out.follow(subject_did, tag=(f, depth + 1, k))
+                                print("Queued follow.")
+                    else:
+                        stats.declined(); skipped += 1
+                        print("Skipped.")
+                follows_out.flush()
+            frontier.page_done(k, len(followers), page_matches)
+            if next_cursor and frontier.seeds[k]["pages"] < seed_pages:
+                frontier.push(k, seed, depth, next_cursor)
 
+    finally:
+        # Abandon queued prefetches on any exit (budget, error, Ctrl-C).
+        pool.shutdown(wait=False, cancel_futures=True)
+    stats.progress.finish()
+    stats.report_seeds()
+    if ckpt:
+        ckpt.save(snapshot, force=True)
+    if runner:
+        runner.finish(args, did)
+        if ckpt:
+            # The 'ask' bucket has been handed off; a later --resume must not repeat it.
+            ckpt.save(snapshot, force=True)
     print("\nDone.")
     print(f"New follows added this session: {added}")
     print(f"Skipped: {skipped}")
@@ -795,56 +4053,187 @@ def mode_degreesearch(args, service, access, did, handle, keywords):
         print("NOTE: dry-run mode; no changes were made.")
 
 def mode_wordmap(args, service, access, did, handle):
+    """
+    Term frequencies over the bios of your followers (--followers) or follows
+    (--following).  --wordmap-counter exact keeps every term (default);
+    'sketch' bounds memory with a Count-Min sketch + Space-Saving top-K.
+    --ngrams adds bigrams/trigrams; --wordmap-out writes the ranking as TSV.
+    With --actors, runs for every listed account instead (see wordmap_actors).
+    """
     use_following = bool(getattr(args, "wordmap_following", False))
     use_followers = bool(getattr(args, "wordmap_followers", False))
     if use_following == use_followers:
         print("Please specify exactly one of --following or --followers for wordmap mode.", file=sys.stderr)
         return
 
-    batch_size = max(1, args.limit)
-    token_re = re.compile(r"[A-Za-z0-9]+")
-    stopwords = {
-        "the","and","for","you","your","with","are","that","this","from","have","has","was","were","but","not","all",
-        "our","about","into","out","over","under","on","in","of","to","a","an","as","by","at","it","we","they","them",
-        "be","is","am","or","if","so","my","me","their","his","her","he","she","i","us","rt"
-    }
+    if getattr(args, "actors", None):
+        return wordmap_actors(args, service, access, "followers" if use_followers else "follows")
 
-    counts = Counter()
-    processed = 0
+    batch_size = max(1, args.limit)
+    ngram_max = min(3, max(1, args.ngrams))
+    counter = make_word_counter(args)
+    progress = Progress("wordmap", total=expected_count(service, access, did,
+                                                        "followersCount" if use_followers else "followsCount"))
 
     if use_followers:
         print("Streaming your followers for wordmap ...")
-        iterator = iter_followers(service, access, handle, batch_size=batch_size, max_pages=10000)
+        iterator = iter_followers(service, access, handle, batch_size=batch_size, max_pages=10000,
+                                  prefetch=args.prefetch)
     else:
         print("Streaming your follows for wordmap ...")
-        iterator = iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000)
+        iterator = iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000,
+                                prefetch=args.prefetch)
 
     batch_idx = 0
     for people in iterator:
         batch_idx += 1
         print(f"  Batch {batch_idx} (size={len(people)})")
         for p in people:
+            progress.advance()
             text = combine_bio_desc(p)
             if not text:
                 continue
-            for tok in token_re.findall(text.lower()):
-                if len(tok) < 3: continue
-                if tok in stopwords: continue
-                counts[tok] += 1
-            processed += 1
-            if processed % 500 == 0:
-                sys.stderr.write("."); sys.stderr.flush()
-
-    if processed >= 500:
-        sys.stderr.write("\n"); sys.stderr.flush()
-
-    if not counts:
+            counter.add_terms(wordmap_terms(text, ngram_max))
+    progress.finish()
+
+    rows = counter.top(args.top_k)
+    if not rows:
         print("No words found in bios/descriptions.")
         return
 
-    print("\nWord frequency (descending):")
-    for word, cnt in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
-        print(f"{word}\t{cnt}")
+    if isinstance(counter, SketchWordCounter):
+        # Exact runs keep their pre-sketch output byte for byte.
+        print(f"\nCounter: {counter.describe()}")
+    if args.wordmap_out:
+        out = Path(args.wordmap_out).expanduser()
+        out.parent.mkdir(parents=True, exist_ok=True)
+        _write_text_atomic(out, "term\tcount\terror\n" + "".join(f"{t}\t{c}\t{e}\n" for t, c, e in rows))
+        print(f"Wrote {len(rows)} term(s) to {out}")
+    else:
+        print("\nWord frequency (descending):")
+        for word, cnt, _ in rows:
+            print(f"{word}\t{cnt}")
+
+def wordmap_actors(args, service, access, source):
+    """
+    Multi-actor wordmap: fetch the follows/followers of every account in
+    --actors concurrently (--concurrency threads), tokenize pages on a
+    process pool (--workers), and save one mergeable count file per actor
+    in --wordmap-dir for '--mode wordmerge'.
+    """
+    actors = [a.lstrip("@") for a in read_keywords(Path(args.actors))]
+    if not actors:
+        print(f"No actors listed in {args.actors}.", file=sys.stderr)
+        return
+    folder = Path(args.wordmap_dir or "./bsky_wordmaps").expanduser().resolve()
+    batch_size = max(1, args.limit)
+    ngram_max = min(3, max(1, args.ngrams))
+    field = "followersCount" if source == "followers" else "followsCount"
+    workers = args.workers if args.workers is not None else max(1, (os.cpu_count() or 2) - 1)
+    tokenizers = process_pool(workers) if workers > 1 else None
+    print(f"Wordmap of the {source} of {len(actors)} account(s) -> {folder}")
+
+    def run(actor):
+        counter = make_word_counter(args)
+        progress = Progress(f"wordmap:{actor}", total=expected_count(service, access, actor, field))
+        fetch = iter_followers if source == "followers" else iter_follows
+        accounts = 0
+        pending = deque()
+        for people in fetch(service, access, actor, batch_size=batch_size, max_pages=10000, prefetch=args.prefetch):
+            texts = [t for t in (combine_bio_desc(p) for p in people) if t]
+            accounts += len(people)
+            progress.advance(len(people))
+            if tokenizers is None:
+                counter.add_counts(_wordmap_worker(texts, ngram_max))
+                continue
+            pending.append(tokenizers.submit(_wordmap_worker, texts, ngram_max))
+            # Keep a few pages in flight; fold finished ones in order.
+            while pending and (pending[0].done() or len(pending) > 2 * workers):
+                counter.add_counts(pending.popleft().result())
+        while pending:
+            counter.add_counts(pending.popleft().result())
+        progress.finish()
+        path = write_word_counts(folder, actor, source, accounts, counter, ngram_max, top_k=args.top_k)
+        # The counts are on disk now; return only the summary so a finished
+        # actor's counter is freed while slower actors are still running.
+        return accounts, counter.total, path
+
+    failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            futures = {actor: pool.submit(run, actor) for actor in actors}
+            for actor, fut in futures.items():
+                try:
+                    accounts, occurrences, path = fut.result()
+                except RuntimeError as e:
+                    failed += 1
+                    print(f"  ! {actor}: {e}", file=sys.stderr)
+                    continue
+                print(f"  {actor}: {accounts} account(s), {occurrences} term occurrence(s) -> {path.name}")
+    finally:
+        if tokenizers is not None:
+            tokenizers.shutdown(cancel_futures=True)
+    print(f"\nDone. {len(actors) - failed} count file(s) in {folder}"
+          + (f" ({failed} failed)" if failed else "") + "; combine/compare them with --mode wordmerge.")
+
+def mode_wordmerge(args):
+    """
+    Offline: merge the per-actor count files in --wordmap-dir (all, or the
+    --actors subset) into a combined ranking, and rank each actor's
+    distinctive terms against the others by log-odds (z-scores).
+    """
+    folder = Path(args.wordmap_dir or "./bsky_wordmaps").expanduser().resolve()
+    files = sorted(folder.glob("*.counts.tsv"))
+    if getattr(args, "actors", None):
+        wanted = {_safe_filename(a) for a in read_keywords(Path(args.actors))}
+        files = [f for f in files if f.name[:-len(".counts.tsv")] in wanted]
+    if not files:
+        print(f"No *.counts.tsv files in {folder}; run wordmap with --actors first.", file=sys.stderr)
+        return
+    loaded = [read_word_counts(f) for f in files]
+    top = args.top_k or 50
+
+    combined = Counter()
+    for _, counts, _ in loaded:
+        combined.update(counts)
+    sketches = [sk for _, _, sk in loaded]
+    if all(sk is not None for sk in sketches):
+        # Sketch files: re-estimate every surviving term from the merged sketch.
+        try:
+            merged = CountMinSketch(sketches[0].width, sketches[0].depth)
+            for sk in sketches:
+                merged.merge(sk)
+            combined = Counter({t: merged.estimate(t) for t in combined})
+        except ValueError as e:
+            print(f"Note: {e}; summing the saved top-K counts instead.", file=sys.stderr)
+    totals = {h["actor"]: h["occurrences"] for h, _, _ in loaded}
+    grand_total = sum(totals.values())
+
+    out_dir = Path(args.wordmap_out).expanduser() if args.wordmap_out else folder
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ranked = sorted(combined.items(), key=lambda kv: (-kv[1], kv[0]))
+    _write_text_atomic(out_dir / "merged.tsv", "term\tcount\n" + "".join(f"{t}\t{c}\n" for t, c in ranked))
+    print(f"Merged {len(loaded)} actor(s), {grand_total} term occurrence(s), {len(ranked)} distinct term(s).")
+    print(f"\nCombined top {min(top, len(ranked))}:")
+    for t, c in ranked[:top]:
+        print(f"{t}\t{c}")
+
+    if len(loaded) < 2:
+        print("\n(Only one actor; nothing to compare.)")
+        return
+    lines = ["actor\tterm\tz\tcount\trest_count\n"]
+    for header, counts, _ in loaded:
+        actor = header["actor"]
+        rest = Counter(combined)
+        rest.subtract(counts)
+        ranking = log_odds_ranking(counts, totals[actor], rest, grand_total - totals[actor],
+                                   combined, grand_total)
+        lines.extend(f"{actor}\t{t}\t{z:.3f}\t{yi}\t{yj}\n" for t, z, yi, yj in ranking[:top])
+        print(f"\nMost distinctive for {actor} (log-odds z vs the other {len(loaded) - 1}):")
+        for t, z, yi, yj in ranking[:min(top, 15)]:
+            print(f"  {t}\tz={z:.2f}\t({yi} vs {yj})")
+    _write_text_atomic(out_dir / "logodds.tsv", "".join(lines))
+    print(f"\nWrote {out_dir / 'merged.tsv'} and {out_dir / 'logodds.tsv'}")
 
 def mode_vectorize(args, service, access, did, handle, keywords):
     """
@@ -852,44 +4241,95 @@ def mode_vectorize(args, service, access, did, handle, keywords):
       - Optionally filter by full-phrase, case-insensitive --keywords.
       - For each kept account, build token counts from: displayName + handle + bio/description.
       - Write per-account vector files (*.pdfvec.json.gz) that pdf_cluster.py `build` can read.
+      - A manifest in --outdir records each account's text md5: reruns only rewrite
+        added/changed accounts and prune those no longer followed (or kept).
+      - Metadata of the written accounts goes to --meta-csv and/or, typed and
+        columnar, to --meta-out (Parquet or Arrow IPC, see MetaTableWriter).
     """
     outdir = Path(args.outdir or "./bsky_vectors").expanduser().resolve()
-    analyzer = _bsky_build_analyzer()
     batch_size = max(1, args.limit)
+    matcher = KeywordMatcher(keywords)
     meta_csv_path = Path(args.meta_csv).expanduser().resolve() if getattr(args, "meta_csv", None) else None
     csv_writer = None
     csv_file = None
+    ckpt, state = open_checkpoint(args, "vectorize", handle)
+    state = state or {}
+    resuming_csv = False
+    table_writer = None
+    if getattr(args, "meta_out", None):
+        table_writer = MetaTableWriter(Path(args.meta_out).expanduser().resolve(), fmt=args.meta_format,
+                                       row_group_size=args.meta_row_group)
+        if state:
+            print(f"Note: {table_writer.path} will only hold the accounts written after this resume.")
     if meta_csv_path:
         meta_csv_path.parent.mkdir(parents=True, exist_ok=True)
-        csv_file = meta_csv_path.open("w", encoding="utf-8", newline="")
+        resuming_csv = bool(state) and meta_csv_path.exists()
+        if resuming_csv and state.get("csv_bytes") is not None:
+            # Rows written after the last checkpoint belong to pages that are
+            # fetched and written again now: drop them instead of duplicating.
+            if meta_csv_path.stat().st_size > state["csv_bytes"]:
+                os.truncate(meta_csv_path, state["csv_bytes"])
+        csv_file = meta_csv_path.open("a" if resuming_csv else "w", encoding="utf-8", newline="")
         csv_writer = csv.writer(csv_file)
-        csv_writer.writerow([
-            "did","handle","displayName","avatar","banner",
-            "followersCount","followsCount","postsCount",
-            "viewer_following","viewer_followedBy","viewer_muted","viewer_blocking",
-            "bio_len","text_len","vector_md5","vector_path"
-        ])
+    if csv_writer and not resuming_csv:
+        csv_writer.writerow([name for name, _ in META_COLUMNS])
 
+    store = None
+    if getattr(args, "vector_format", "files") == "shards":
+        # --overwrite starts a fresh store unless resuming; otherwise append.
+        store = VectorStore(outdir, shard_size=args.shard_size, append=bool(state) or not args.overwrite)
+    manifest = VectorManifest(outdir)
     print(f"Streaming your follows and writing vectors to: {outdir}")
     if keywords:
         print(f"Keyword filter active: {len(keywords)} phrase(s)")
 
-    seen = set()
-    written = 0
-    filtered_out = 0
-    batches = 0
+    interner = DidInterner() if getattr(args, "seen_set", "exact") == "exact" else None
+    seen = make_seen_set(args, interner)
+    restore_seen_set(seen, state.get("seen"))
+    written = int(state.get("written", 0))
+    filtered_out = int(state.get("filtered_out", 0))
+    # Accounts kept this run, for pruning.  A Bloom seen-set can skip an account
+    # that was never seen (false positive), so its vector must not be pruned:
+    # with --seen-set bloom nothing is tracked and pruning is skipped.
+    kept = IdSet(interner) if interner is not None else None
+    if kept is not None:
+        kept.update(state.get("kept") or [])
+    changes = Counter(state.get("changes") or {})
+    batches = int(state.get("batches", 0))
+    cursor = state.get("cursor")
+    exhausted = bool(state.get("exhausted"))
+    done_cursor = cursor
+    csv_bytes = state.get("csv_bytes")
 
-    for follows in iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000):
-        batches += 1
-        print(f"\n--- Batch {batches} (size={len(follows)}) ---")
-        # Bulk-fetch enriched profile data for this batch
-        batch_keys = [(it.get("did") or it.get("handle")) for it in follows if (it.get("did") or it.get("handle"))]
-        prof_index = get_profiles_bulk(service, access, batch_keys)
+    def set_cursor(c):
+        nonlocal cursor
+        cursor = c
+
+    def snapshot():
+        return {
+            "cursor": done_cursor,
+            "exhausted": exhausted,
+            "seen": seen.state(),
+            "written": written,
+            "filtered_out": filtered_out,
+            "kept": kept.state() if kept is not None else [],
+            "changes": dict(changes),
+            "batches": batches,
+            "csv_bytes": csv_bytes,
+        }
+
+    progress = Progress("vectorize", total=expected_count(service, access, did, "followsCount"), start=len(seen))
+
+    def prepare(follows, prof_index):
+        # Stage 1 (main thread): dedup, keyword gating and metadata.
+        nonlocal filtered_out
+        jobs = []
         for p in follows:
             key = p.get("did") or p.get("handle")
             if not key or key in seen:
                 continue
             seen.add(key)
+            progress.advance()
 
             display = p.get("displayName") or ""
             handle_str = p.get("handle") or ""
@@ -897,80 +4337,466 @@ def mode_vectorize(args, service, access, did, handle, keywords):
             combined = " ".join([display, handle_str, bio]).strip()
 
             # Optional keyword gating (full-phrase, case-insensitive)
-            if keywords and not matches_any_keyword(combined, keywords):
+            if keywords and not matcher.matches(combined):
                 filtered_out += 1
                 continue
 
             # Profile & viewer metadata
             prof = prof_index.get(key, {}) if isinstance(prof_index, dict) else {}
-            avatar = prof.get("avatar") or p.get("avatar") or ""
-            banner = prof.get("banner") or p.get("banner") or ""
-            followersCount = prof.get("followersCount")
-            followsCount   = prof.get("followsCount")
-            postsCount     = prof.get("postsCount")
             viewer = p.get("viewer") or {}
-            v_following  = bool(viewer.get("following"))
-            v_followedBy = bool(viewer.get("followedBy"))
-            v_muted      = bool(viewer.get("muted"))
-            v_blocking   = bool(viewer.get("blocking"))
-            bio_len  = len(bio)
-            text_len = len(combined)
-
-            counts = _bsky_text_to_counts(combined, analyzer)
-            # Stable "filename" for pdf_cluster build; "md5" uniquely derived from subject + text
-            filename = f"{handle_str or key}.bsky"
-            md5 = hashlib.md5((key + "\n" + combined).encode("utf-8", "ignore")).hexdigest()
-
-            payload = {
-                "version": "bsky-vec-1",
-                "ngram_range": [1, 2],
-                "stop_words": "english",
-                "strip_accents": "unicode",
-                "token_pattern": r"(?u)\b[A-Za-z][A-Za-z0-9\-]{2,}\b",
-                "filename": filename,
-                "md5": md5,
-                "token_counts": counts,
-                # Extra metadata is harmless for pdf_cluster.py, but helpful downstream
-                "meta": {
-                    "did": p.get("did", "") or key,
-                    "handle": handle_str,
-                    "displayName": display,
-                    "avatar": avatar,
-                    "banner": banner,
-                    "followersCount": followersCount,
-                    "followsCount": followsCount,
-                    "postsCount": postsCount,
-                    "viewer_following": v_following,
-                    "viewer_followedBy": v_followedBy,
-                    "viewer_muted": v_muted,
-                    "viewer_blocking": v_blocking,
-                    "bio_len": bio_len,
-                    "text_len": text_len,
-                },
+            meta = {
+                "did": p.get("did", "") or key,
+                "handle": handle_str,
+                "displayName": display,
+                "avatar": prof.get("avatar") or p.get("avatar") or "",
+                "banner": prof.get("banner") or p.get("banner") or "",
+                "followersCount": prof.get("followersCount"),
+                "followsCount": prof.get("followsCount"),
+                "postsCount": prof.get("postsCount"),
+                "viewer_following": bool(viewer.get("following")),
+                "viewer_followedBy": bool(viewer.get("followedBy")),
+                "viewer_muted": bool(viewer.get("muted")),
+                "viewer_blocking": bool(viewer.get("blocking")),
+                "bio_len": len(bio),
+                "text_len": len(combined),
             }
-
-            vec_path = outdir / f"{filename}.pdfvec.json.gz"
-            if vec_path.exists() and not args.overwrite:
-                # Respect existing file unless --overwrite
+            # Stable "filename" for pdf_cluster build
+            filename = f"{handle_str or key}.bsky"
+            if kept is not None:
+                kept.add(meta["did"])
+            if store is not None:
+                vec_path = outdir
+                present = meta["did"] in store
+            else:
+                vec_path = outdir / f"{filename}.pdfvec.json.gz"
+                present = vec_path.exists()
+            # Only re-tokenize when the text changed (or --overwrite)
+            entry = manifest.get(meta["did"])
+            md5 = _vector_md5(key, combined)
+            if entry and present and entry[0] == md5 and entry[1] == str(vec_path) and not args.overwrite:
+                changes["unchanged"] += 1
                 continue
-            _write_vector_file(vec_path, payload)
+            changes["changed" if entry else "added"] += 1
+            jobs.append((key, combined, filename, meta, vec_path))
+        return jobs
+
+    def drain(pending):
+        # Stage 3 (main thread): write tokenized results in batch order.
+        nonlocal written, done_cursor, exhausted, csv_bytes
+        jobs, results, page_cursor = pending
+        for (key, combined, filename, meta, vec_path), (md5, payload, text) in zip(jobs, results.result()):
+            if store is not None:
+                store.add(payload)
+            else:
+                _write_vector_text(vec_path, text)
+                old = manifest.get(meta["did"])
+                if old and old[1] != str(vec_path):
+                    # Renamed handle: drop the vector written under the old name
+                    Path(old[1]).unlink(missing_ok=True)
+            manifest.set(meta["did"], md5, vec_path)
+            row = dict(meta, vector_md5=md5, vector_path=str(vec_path))
             if csv_writer:
-                csv_writer.writerow([
-                    (p.get("did") or key), handle_str, display, avatar, banner,
-                    followersCount, followsCount, postsCount,
-                    int(v_following), int(v_followedBy), int(v_muted), int(v_blocking),
-                    bio_len, text_len, md5, str(vec_path)
-                ])
+                csv_writer.writerow([int(v) if isinstance(v, bool) else v
+                                     for v in (row[name] for name, _ in META_COLUMNS)])
+            if table_writer:
+                table_writer.write(row)
             written += 1
-            if written % 50 == 0:
-                sys.stderr.write("."); sys.stderr.flush()
+            get_metrics().inc("bsky_vectors_written_total")
+
+        if ckpt:
+            # The page is fully written: `page_cursor` points past it.
+            done_cursor = page_cursor
+            exhausted = page_cursor is None
+            if csv_file:
+                csv_file.flush()
+                csv_bytes = csv_file.buffer.tell()
+            if store is not None:
+                store.flush()
+            manifest.save()
+            ckpt.save(snapshot)
+
+    # Stage 0 (getProfiles enrichment) runs on a thread pool, several chunk
+    # requests at once: page N's profiles are fetched while page N-1 is
+    # prepared and drained.  Stage 2 (tokenize, hash, serialize) runs on a
+    # process pool; while it works on page N-1 the main thread already
+    # fetches page N+1.  workers=1 keeps tokenizing in-process.
+    tokenizer = VectorizeWorkers(getattr(args, "workers", None), serialize=store is None,
+                                 analyzer=getattr(args, "analyzer", "builtin"))
+    profiles = ProfileFetcher(service, access, workers=getattr(args, "profile_workers", PROFILE_WORKERS))
+    pending = None
+    enriching = None
+    pages = iter(()) if exhausted else iter_follows(service, access, handle, batch_size=batch_size,
+                                                    max_pages=10000, cursor=cursor, on_cursor=set_cursor,
+                                                    prefetch=args.prefetch)
+
+    def advance(page):
+        # Page whose profiles were requested one step earlier: prepare it and
+        # hand it to the tokenizer, after writing out the page before it.
+        nonlocal pending
+        follows, prof_batch, page_cursor = page
+        prof_index = prof_batch.result()
+        if pending:
+            drain(pending)
+        jobs = prepare(follows, prof_index)
+        pending = (jobs, tokenizer.submit([(key, combined, filename, meta)
+                                           for key, combined, filename, meta, _ in jobs]), page_cursor)
+
+    try:
+        for follows in pages:
+            page_cursor = cursor
+            batches += 1
+            print(f"\n--- Batch {batches} (size={len(follows)}) ---")
+            # Start the bulk profile fetch for this batch, then finish the previous one
+            batch_keys = [(it.get("did") or it.get("handle")) for it in follows if (it.get("did") or it.get("handle"))]
+            page = (follows, profiles.submit(batch_keys), page_cursor)
+            if enriching:
+                advance(enriching)
+            enriching = page
+        if enriching:
+            advance(enriching)
+        if pending:
+            drain(pending)
+    finally:
+        profiles.close()
+        tokenizer.close()
+    if profiles.failed:
+        print(f"Warning: no profile metadata for {profiles.failed} account(s) after retries; "
+              "their counts are left empty.")
 
-    if written >= 50:
-        sys.stderr.write("\n"); sys.stderr.flush()
+    # If every follow has been listed, prune vectors of accounts no longer
+    # kept (unfollowed, or now filtered out by --keywords).
+    if cursor is not None:
+        print("Note: the follow listing stopped before its end; not pruning old vectors.")
+    elif kept is None:
+        print("Note: --seen-set bloom may skip accounts it never saw; not pruning old vectors.")
+    else:
+        for key in [k for k in manifest.entries if k not in kept]:
+            _, path, _ = manifest.pop(key)
+            if store is not None:
+                store.discard(key)
+            else:
+                Path(path).unlink(missing_ok=True)
+            changes["removed"] += 1
+    manifest.save()
+    if store is not None:
+        store.close()
+    if ckpt:
+        exhausted = cursor is None
+        done_cursor = cursor
+        ckpt.save(snapshot, force=True)
+    progress.finish()
+    for kind, n in changes.items():
+        get_metrics().set("bsky_vectorize_changes", n, change=kind)
     if csv_file:
         csv_file.close()
         print(f"Metadata CSV written to: {meta_csv_path}")
-    print(f"\nVectorization complete. Wrote {written} file(s) to {outdir} (filtered out: {filtered_out}).")
+    if table_writer:
+        table_writer.close()
+        print(f"Metadata {table_writer.fmt} written to: {table_writer.path} "
+              f"({table_writer.rows} rows in {table_writer.row_groups} row group(s))")
+    what = "record(s) to the vector store in" if store is not None else "file(s) to"
+    print(f"\nVectorization complete. Wrote {written} {what} {outdir} (filtered out: {filtered_out}).")
+    print(f"Changes: added={changes['added']}, changed={changes['changed']}, "
+          f"removed={changes['removed']}, unchanged={changes['unchanged']}")
+    print(seen_sets_summary(interner, {"seen": seen, "kept": kept} if kept is not None else {"seen": seen}))
+
+def mode_vecexport(args):
+    """
+    Offline: expand a sharded vector store (--outdir) into the legacy
+    per-account *.pdfvec.json.gz layout under --export-dir.
+    """
+    store_dir = Path(args.outdir or "./bsky_vectors").expanduser().resolve()
+    if not getattr(args, "export_dir", None):
+        print("vecexport requires --export-dir <folder> for the per-account files.", file=sys.stderr)
+        return
+    export_dir = Path(args.export_dir).expanduser().resolve()
+    written, skipped = export_legacy_vectors(store_dir, export_dir, overwrite=args.overwrite)
+    print(f"Exported {written} vector file(s) to {export_dir} (kept existing: {skipped}).")
+
+def mode_crawl(args, service, access, did, handle):
+    """
+    Crawl the follow graph breadth-first from --actor (default: you) up to
+    --degreelimit levels and save a compact snapshot to --graph-dir for
+    offline queries with '--mode graph'.
+    """
+    root = args.actor or handle
+    depth = max(1, args.degreelimit)
+    max_nodes = max(1, args.crawl_max_nodes)
+    graph_dir = Path(args.graph_dir or "./bsky_graph").expanduser().resolve()
+    batch_size = max(1, args.limit)
+
+    builder = GraphBuilder()
+    start = root if root.startswith("did:") else (did if root == handle else None)
+    if start is None:
+        prof = get_profile(service, access, root)
+        if not prof or not prof.get("did"):
+            print(f"Could not resolve {root}.", file=sys.stderr)
+            return
+        start = prof["did"]
+    level = [builder.intern(start, root.lstrip("@") if not root.startswith("did:") else "")]
+
+    def fetch(actor):
+        people = []
+        for batch in iter_follows(service, access, actor, batch_size=batch_size, max_pages=10000):
+            people.extend(batch)
+        return people
+
+    print(f"Crawling follows of {root} to depth {depth} (max {max_nodes} expanded accounts) ...")
+    expanded = failed = 0
+    workers = max(1, args.concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for hop in range(1, depth + 1):
+            level = level[:max_nodes - expanded]
+            if not level:
+                break
+            known = len(builder)
+            done = expanded
+            progress = Progress("crawl", total=len(level), unit=f"level-{hop} accounts")
+            # At most 2 x --concurrency follow lists are fetched or waiting at
+            # once; each is folded into the builder as soon as it completes.
+            todo = iter(level)
+            inflight = {}
+            while True:
+                for i in todo:
+                    inflight[pool.submit(fetch, builder.dids[i])] = i
+                    if len(inflight) >= 2 * workers:
+                        break
+                if not inflight:
+                    break
+                finished, _ = wait_futures(inflight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    i = inflight.pop(fut)
+                    try:
+                        builder.add_follows(i, fut.result())
+                    except RuntimeError as e:
+                        # Not expanded: leaves the --crawl-max-nodes budget to later accounts
+                        failed += 1
+                        print(f"  ! {builder.handles[i] or builder.dids[i]}: {e}", file=sys.stderr)
+                    else:
+                        expanded += 1
+                    progress.advance()
+                get_metrics().set("bsky_crawl_graph_size", len(builder), item="nodes")
+                get_metrics().set("bsky_crawl_graph_size", len(builder.src), item="edges")
+            progress.finish()
+            print(f"  Level {hop}: expanded {expanded - done} of {len(level)} account(s); graph now {len(builder)} nodes, {len(builder.src)} edges")
+            # Next level: accounts first discovered at this level (in discovery order)
+            level = list(range(known, len(builder)))
+
+    builder.save(graph_dir, root=start, depth=depth, service=service)
+    print(f"\nCrawl complete. Saved {len(builder)} nodes / {len(builder.src)} edges "
+          f"({expanded} expanded, {failed} failed) to {graph_dir}")
+
+# Elements sorted per run by _sorted_words before the runs are merged.
+SORT_RUN = 1 << 16
+
+def _sorted_words(words):
+    """
+    Ascending iterator over array('Q') `words` without boxing the whole
+    array at once: sorted in place by numpy when it is installed, otherwise
+    as SORT_RUN-sized runs (each boxed only while it is sorted) merged lazily.
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    if numpy is not None:
+        numpy.frombuffer(words, dtype=numpy.uint64).sort()
+        return iter(words)
+    runs = [array("Q", sorted(words[k:k + SORT_RUN])) for k in range(0, len(words), SORT_RUN)]
+    del words[:]
+    return iter(runs[0]) if len(runs) == 1 else heapq.merge(*runs)
+
+def _sorted_unique(ids, positions=True):
+    """
+    Ascending unique IDs of array('I') `ids`, plus (if `positions`) the
+    position of each in `ids` (first occurrence).  Each (id << 32 | pos) is
+    packed into one array('Q'), so a single sort orders by ID, then
+    position, and duplicates are dropped in one linear pass.
+    """
+    if positions:
+        packed = array("Q", ((i << 32) | k for k, i in enumerate(ids)))
+    else:
+        packed = array("Q", ids)
+    out = array("I")
+    pos = array("I") if positions else None
+    last = -1
+    for v in _sorted_words(packed):
+        i = v >> 32 if positions else v
+        if i != last:
+            out.append(i)
+            if positions:
+                pos.append(v & 0xFFFFFFFF)
+            last = i
+    return out, pos
+
+def mode_mutuals(args, service, access, did, handle):
+    """
+    Diff your follows against your followers in bulk:
+      - both lists are streamed concurrently; DIDs are interned (DidInterner)
+        into two ID arrays, sorted once and compared in one linear merge;
+      - writes mutuals.tsv, not_following_back.tsv (you follow them, they do not
+        follow you) and fans.tsv (they follow you, you do not follow them) to
+        --mutuals-dir;
+      - --unfollow-nonmutuals unfollows the not_following_back accounts in
+        applyWrites batches after a confirmation prompt (--dry-run only counts them).
+    """
+    batch_size = max(1, args.limit)
+    outdir = Path(args.mutuals_dir or f"mutuals-{_safe_filename(handle)}").expanduser()
+    interner = DidInterner()
+    handles = StringColumn()  # indexed by interned ID
+    lock = threading.Lock()
+    totals = expected_counts(service, access, did, "followsCount", "followersCount")
+    progress = Progress("mutuals", total=sum(t or 0 for t in totals))
+
+    def collect(pages, with_rkeys):
+        ids = array("I")
+        rkeys = StringColumn() if with_rkeys else None
+        for people in pages:
+            with lock:
+                for p in people:
+                    if not p.get("did"):
+                        continue
+                    i = interner.intern(p["did"])
+                    if i == len(handles):
+                        handles.append(p.get("handle"))
+                    ids.append(i)
+                    if rkeys is not None:
+                        uri = (p.get("viewer") or {}).get("following") or ""
+                        rkeys.append(uri.rsplit("/", 1)[-1] if uri else "")
+                progress.advance(len(people))
+        return ids, rkeys
+
+    print("Streaming your follows and followers concurrently ...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        follows_job = pool.submit(collect, iter_follows(service, access, handle, batch_size=batch_size,
+                                                        max_pages=100000, prefetch=args.prefetch), True)
+        followers_job = pool.submit(collect, iter_followers(service, access, handle, batch_size=batch_size,
+                                                            max_pages=100000, prefetch=args.prefetch), False)
+        follow_ids, rkeys = follows_job.result()
+        follower_ids, _ = followers_job.result()
+    progress.finish()
+
+    follow_ids, follow_pos = _sorted_unique(follow_ids)
+    follower_ids, _ = _sorted_unique(follower_ids, positions=False)
+    mutual, not_back, fans = sorted_merge(follow_ids, follower_ids)
+
+    # Follow record URIs of the not_following_back accounts (both arrays ascending)
+    not_back_uris = []
+    j = 0
+    for x in not_back:
+        while follow_ids[j] != x:
+            j += 1
+        rkey = rkeys[follow_pos[j]]
+        not_back_uris.append(f"at://{did}/app.bsky.graph.follow/{rkey}" if rkey else "")
+
+    outdir.mkdir(parents=True, exist_ok=True)
+    categories = (("mutuals", mutual, None), ("not_following_back", not_back, not_back_uris), ("fans", fans, None))
+    for name, ids, uris in categories:
+        with (outdir / f"{name}.tsv").open("w", encoding="utf-8") as fh:
+            fh.write("did\thandle" + ("\tfollow_uri" if uris is not None else "") + "\n")
+            for n, i in enumerate(ids):
+                fh.write(f"{interner.key(i)}\t{handles[i]}" + (f"\t{uris[n]}" if uris is not None else "") + "\n")
+        get_metrics().set("bsky_mutuals_accounts", len(ids), category=name)
+
+    used = (interner.nbytes() + handles.nbytes() + rkeys.nbytes()
+            + sum(a.itemsize * len(a) for a in (follow_ids, follow_pos, follower_ids, mutual, not_back, fans)))
+    print("=" * 72)
+    print(f"Follows: {len(follow_ids)}  Followers: {len(follower_ids)}")
+    print(f"Mutuals: {len(mutual)}")
+    print(f"Not following back (you follow them): {len(not_back)}")
+    print(f"Fans (you do not follow them back): {len(fans)}")
+    print(f"Written to: {outdir}/{{mutuals,not_following_back,fans}}.tsv")
+    print(f"Memory: {len(interner)} ids interned, {used / (1024 * 1024):.2f} MB")
+
+    if not getattr(args, "unfollow_nonmutuals", False) or not not_back:
+        return
+    targets = [(handles[i] or interner.key(i), uri) for i, uri in zip(not_back, not_back_uris) if uri]
+    if len(targets) < len(not_back):
+        print(f"{len(not_back) - len(targets)} account(s) have no follow record URI and are left alone.")
+    if args.dry_run:
+        print(f"[dry-run] Would unfollow {len(targets)} account(s) that do not follow you back "
+              f"(listed in {outdir / 'not_following_back.tsv'}).")
+        return
+    print(f"Unfollow {len(targets)} account(s) that do not follow you back? [y/N]: ", end="", flush=True)
+    if sys.stdin.readline().strip().lower() not in ("y", "yes"):
+        print("Skipped.")
+        return
+
+    removed, failed = 0, 0
+    unfollowing = Progress("mutuals", total=len(targets), unit="unfollows")
+
+    def on_unfollow(actor, ok, info):
+        nonlocal removed, failed
+        if ok:
+            removed += 1
+        else:
+            failed += 1
+            print(f"\nFailed to unfollow @{actor}: {info}")
+        unfollowing.advance()
+
+    with WriteBatcher(service, access, did, on_result=on_unfollow) as writes:
+        for actor, uri in targets:
+            writes.unfollow(uri, tag=actor)
+    unfollowing.finish()
+    print(f"Unfollowed: {removed}")
+    print(f"Failed: {failed}")
+
+def mode_graph(args):
+    """
+    Offline: query a crawl snapshot in --graph-dir.  Prints the snapshot
+    stats and, for --actor (default: the crawl root), its degrees and its
+    --hops neighbourhood along --direction, optionally filtered by --keywords.
+    """
+    graph_dir = Path(args.graph_dir or "./bsky_graph").expanduser().resolve()
+    if not (graph_dir / "graph.json").exists():
+        print(f"No graph snapshot in {graph_dir}; run '--mode crawl' first.", file=sys.stderr)
+        return
+    g = FollowGraph(graph_dir)
+    try:
+        print(f"Snapshot {graph_dir}: {len(g)} nodes, {g.edges} edges, "
+              f"{g.header.get('expanded')} expanded (crawled {g.header.get('created')})")
+        key = args.actor or g.header.get("root")
+        start = g.node(key) if key else None
+        if start is None:
+            print(f"{key} is not in the snapshot.", file=sys.stderr)
+            return
+        name = lambda i: g.handles[i] or g.dids[i]
+        print(f"{name(start)}: following={g.out_degree(start)}, followers={g.in_degree(start)} (among crawled)")
+
+        matcher = KeywordMatcher(read_keywords(Path(args.keywords))) if args.keywords else None
+        dist = g.khop(start, args.hops, direction=args.direction)
+        rows = [i for i in dist if i != start and (matcher is None or matcher.matches(g.bios[i]))]
+        # Closest first; within a hop, most-followed within the snapshot first
+        rows.sort(key=lambda i: (dist[i], -g.in_degree(i), name(i)))
+        print(f"\n{len(rows)} account(s) within {args.hops} hop(s) ({args.direction})"
+              + (" matching keywords" if matcher else "") + ":")
+        print("hops\thandle\tdid\tfollowing\tfollowers")
+        for i in rows:
+            print(f"{dist[i]}\t{name(i)}\t{g.dids[i]}\t{g.out_degree(i)}\t{g.in_degree(i)}")
+    finally:
+        g.close()
+
+def mode_review(args, service, access, did, handle):
+    """
+    Batch-review the 'ask' candidates that a --policy run queued in --review-file.
+    The file is consumed: reviewed entries are removed once the review finishes,
+    except those whose follow failed, which stay queued for the next review.
+    """
+    path = Path(args.review_file).expanduser() if getattr(args, "review_file", None) else None
+    if not path or not path.exists():
+        print("review mode requires --review-file <queue.jsonl> written by a --policy run.", file=sys.stderr)
+        return
+    items = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not items:
+        print(f"No candidates queued in {path}.")
+        return
+    _, _, failed = review_candidates(args, service, access, did, items)
+    if not args.dry_run:
+        path.write_text("".join(json.dumps(item, ensure_ascii=False) + "\n" for item in failed), encoding="utf-8")
+        if failed:
+            print(f"{len(failed)} candidate(s) whose follow failed were kept in {path}.")
+    else:
+        print("NOTE: dry-run mode; no changes were made and the review queue was kept.")
 
 def mode_listify(args, service, access, did, handle, keywords):
     """
@@ -978,15 +4804,17 @@ def mode_listify(args, service, access, did, handle, keywords):
     contains any keyword from --keywords. The list name is the sorted, de-duplicated
     keywords joined with '/', trimmed to 64 characters (with '/+N' overflow marker).
     In this batched version, --limit controls the API *batch size*; we scan all follows.
+    If the list already exists, its members are read back and only the missing
+    ones are added; --prune also removes members that no longer match.
     """
     if not keywords:
         print("listify requires --keywords <file.txt> with one keyword per line.", file=sys.stderr)
         return
 
-    kwset = {kw.lower() for kw in keywords if kw}
+    matcher = KeywordMatcher(keywords)
     list_name = _build_list_name_from_keywords(keywords, max_len=64)
     purpose = "app.bsky.graph.defs#modlist" if getattr(args, "modlist", False) else "app.bsky.graph.defs#curatelist"
-    desc = f"Auto-curated list from keywords: {', '.join(sorted(kwset))}"
+    desc = f"Auto-curated list from keywords: {', '.join(sorted(matcher.keywords))}"
 
     # Pass 1: stream your follows and collect matches (we need counts before creating the list in dry-run)
     print("Scanning your follows for keyword matches (streaming in batches) ...")
@@ -994,59 +4822,81 @@ def mode_listify(args, service, access, did, handle, keywords):
     matches = []
     total_seen = 0
     batch_idx = 0
-    for follows in iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000):
+    progress = Progress("listify", total=expected_count(service, access, did, "followsCount"))
+    for follows in iter_follows(service, access, handle, batch_size=batch_size, max_pages=10000,
+                                prefetch=args.prefetch):
         batch_idx += 1
         print(f"  Batch {batch_idx} (size={len(follows)})")
         for p in follows:
             total_seen += 1
-            text = (combine_bio_desc(p) or "").lower()
-            if any(k in text for k in kwset):
+            progress.advance()
+            if matcher.matches(combine_bio_desc(p)):
                 matches.append(p)
+    progress.finish()
 
-            if total_seen % 500 == 0:
-                sys.stderr.write("."); sys.stderr.flush()
-    if total_seen >= 500:
-        sys.stderr.write("\n"); sys.stderr.flush()
+    # Pass 2: diff against the current membership of the list (if it already exists),
+    # so reruns only write what changed.
+    try:
+        list_uri = find_existing_list_by_name(service, access, did, list_name)
+        members = get_list_members(service, access, list_uri, prefetch=args.prefetch) if list_uri else {}
+    except Exception as e:
+        print(f"Failed to read existing list: {e}")
+        return
+    prune = getattr(args, "prune", False)
+    wanted = {}
+    for p in matches:
+        if p.get("did"):
+            wanted.setdefault(p["did"], p)
+    to_add = [p for d, p in wanted.items() if d not in members]
+    duplicates = [(d, uri) for d, uris in members.items() for uri in uris[1:]]
+    to_remove = [(d, uris[0]) for d, uris in members.items() if d not in wanted] + duplicates if prune else []
+    stale = sum(1 for d in members if d not in wanted)
 
     print("=" * 72)
     print(f"List name: {list_name}")
     print(f"Purpose: {'moderation (modlist)' if getattr(args, 'modlist', False) else 'curation (curatelist)'}")
-    print(f"Matches to add: {len(matches)} (from {total_seen} follows reviewed)")
+    print(f"Matches: {len(matches)} (from {total_seen} follows reviewed)")
+    if list_uri:
+        print(f"Existing list: {list_uri} ({len(members)} members)")
+        print(f"Already listed: {len(wanted) - len(to_add)}; no longer matching: {stale}"
+              + (f"; duplicate items: {len(duplicates)}" if duplicates else ""))
+    print(f"To add: {len(to_add)}")
+    if prune:
+        print(f"To remove: {len(to_remove)}")
+    elif stale or duplicates:
+        print("(use --prune to remove members that no longer match, and duplicate items)")
 
     if args.dry_run:
-        print("[dry-run] Would create list and add these handles/DIDs:")
-        for p in matches:
-            print(" -", p.get("handle") or p.get("did"))
+        print(f"[dry-run] Would {'update the list' if list_uri else 'create the list'}; + add, - remove:")
+        for p in to_add:
+            print(" +", p.get("handle") or p.get("did"))
+        for subject_did, _ in to_remove:
+            print(" -", subject_did)
         print("[dry-run] No changes were made.")
         return
 
     # Ensure the list exists (create if missing), then wait until it's queryable
-    try:
-        existing_uri = find_existing_list_by_name(service, access, did, list_name)
-        if existing_uri:
-            list_uri = existing_uri
-            print(f"Found existing list: {list_uri}")
-        else:
+    if not list_uri:
+        try:
             res = create_list_record(service, access, did, name=list_name, purpose=purpose, description=desc)
             list_uri = res.get("uri")
             if not list_uri:
                 raise RuntimeError("List creation did not return a URI.")
             print(f"Created list: {list_uri}")
+        except Exception as e:
+            print(f"Failed to ensure list exists: {e}")
+            return
 
-    except Exception as e:
-        print(f"Failed to ensure list exists: {e}")
-        return
-
-    # Wait until the list is fully functional before adding members
-    print("Waiting for the list to become queryable ...")
-    ready = wait_until_list_ready(service, access, did, list_uri, expected_name=list_name, timeout_sec=45.0, interval_sec=0.75)
-    if not ready:
-        print("Warning: Timed out waiting for list readiness; proceeding to add members anyway.")
+        # Wait until the list is fully functional before adding members
+        print("Waiting for the list to become queryable ...")
+        ready = wait_until_list_ready(service, access, did, list_uri, expected_name=list_name, timeout_sec=45.0, interval_sec=0.75)
+        if not ready:
+            print("Warning: Timed out waiting for list readiness; proceeding to add members anyway.")
 
     # Optional: create a Starter Pack pointing to the list (after readiness)
     if getattr(args, "starterpack", False):
         sp_name = getattr(args, "sp_name", None) or f"Starter: {list_name}"
-        sp_desc = getattr(args, "sp_desc", None) or f"Starter pack for {list_name} — curated from keywords; {len(matches)} members."
+        sp_desc = getattr(args, "sp_desc", None) or f"Starter pack for {list_name} — curated from keywords; {len(wanted)} members."
         try:
             sp = create_starterpack_record(service, access, did,
                                            name=sp_name,
@@ -1062,50 +4912,101 @@ def mode_listify(args, service, access, did, handle, keywords):
             print(f"Failed to create starter pack: {e}")
 
 
-    # Add members
-    added, failed = 0, 0
-    for p in matches:
-        subject_did = p.get("did")
-        if not subject_did:
+    # Apply only the delta (batched through applyWrites, up to APPLY_WRITES_MAX per call)
+    added, removed, failed = 0, 0, 0
+    adding = Progress("listify", total=len(to_add) + len(to_remove), unit="list items")
+
+    def on_listitem(tag, ok, res_item):
+        nonlocal added, removed, failed
+        op, label = tag
+        if not ok:
             failed += 1
-            print(f"Skip (no DID): {p.get('handle') or '<unknown>'}")
-            continue
-        try:
-            res_item = create_listitem_record(service, access, did, list_uri, subject_did)
-            if isinstance(res_item, dict) and res_item.get("uri"):
-                added += 1
-            else:
-                failed += 1
-                print(f"\nServer did not return a URI for {p.get('handle') or subject_did}; treating as failed.")
-            if added % 50 == 0:
-                sys.stderr.write("."); sys.stderr.flush()
-        except Exception as e:
+            print(f"\nFailed to {op} {label}: {res_item}")
+            adding.advance()
+            return
+        if op == "remove":
+            removed += 1
+        # An empty result means the PDS did not echo per-op results (older versions).
+        elif isinstance(res_item, dict) and (res_item.get("uri") or not res_item):
+            added += 1
+        else:
             failed += 1
-            print(f"\nFailed to add {p.get('handle') or subject_did}: {e}")
+            print(f"\nServer did not return a URI for {label}; treating as failed.")
+        adding.advance()
+
+    with WriteBatcher(service, access, did, on_result=on_listitem) as writes:
+        for subject_did, listitem_uri in to_remove:
+            writes.remove_from_list(listitem_uri, tag=("remove", subject_did))
+        for p in to_add:
+            writes.add_to_list(list_uri, p["did"], tag=("add", p.get("handle") or p["did"]))
 
-    if added >= 50:
-        sys.stderr.write("\n"); sys.stderr.flush()
+    adding.finish()
 
     print("\nDone.")
     print(f"List: {list_name}")
     print(f"Added: {added}")
+    if prune:
+        print(f"Removed: {removed}")
+    print(f"Unchanged: {len(wanted) - len(to_add)}")
     print(f"Failed: {failed}")
 
 
 # ------------------------- main -------------------------
+MODE_CHOICES = ["following", "searching", "degreesearch", "wordmap", "listify", "vectorize", "review",
+                "vecexport", "crawl", "graph", "wordmerge", "mutuals"]
+
+# Modes that work purely on local files and skip the login.
+OFFLINE_MODES = {
+    "vecexport": mode_vecexport,
+    "graph": mode_graph,
+    "wordmerge": mode_wordmerge,
+}
+
 def main():
     ap = argparse.ArgumentParser(description="Audit / discover follows on Bluesky (batched).")
-    ap.add_argument("-m", "--mode", choices=["following","searching","degreesearch","wordmap","listify","vectorize"], default="following",
-                    help="Mode: 'following', 'searching', 'degreesearch', or 'wordmap'.")
-    ap.add_argument("--creds", required=True, help="Path to file: line1=<handle>, line2=<app_password>")
+    ap.add_argument("-m", "--mode", choices=MODE_CHOICES, default="following",
+                    help="Mode: " + ", ".join(f"'{m}'" for m in MODE_CHOICES[:-1])
+                         + f", or '{MODE_CHOICES[-1]}' (default: following).")
+    ap.add_argument("--creds", required=False, help="Path to file: line1=<handle>, line2=<app_password>")
     ap.add_argument("--keywords", required=False, help="(Optional) Path to newline-separated keywords (case-insensitive). Not used in 'wordmap' mode.")
     ap.add_argument("--service", default="https://bsky.social", help="PDS base URL (default: https://bsky.social)")
+    ap.add_argument("--transport", choices=TRANSPORT_CHOICES, default="auto",
+                    help="HTTP backend: 'auto' (HTTP/2 if httpx[http2] is installed, else pooled), 'http2', 'pooled' (stdlib keep-alive), or 'curl' (one subprocess per call).")
+    ap.add_argument("--session-cache", default="~/.cache/bluesky/sessions.json",
+                    help="Reuse login tokens across runs from this file (readable only by you; default: ~/.cache/bluesky/sessions.json).")
+    ap.add_argument("--no-session-cache", action="store_true",
+                    help="Always log in with the password and keep tokens in memory only.")
+    ap.add_argument("--no-ratelimit", action="store_true",
+                    help="Disable client-side pacing from the server's RateLimit headers (429s then raise immediately).")
     ap.add_argument("--limit", type=int, default=100, help="*Batch size* for API pagination in all modes.")
     ap.add_argument("--degreelimit", type=int, default=1,
-                    help="For degreesearch: maximum DEPTH (levels) to explore from your seeds (min 1).")
+                    help="For degreesearch: maximum DEPTH (levels) to explore from your seeds (min 1). For crawl: levels of follows to crawl.")
+    ap.add_argument("--prefetch", type=int, default=PREFETCH_PAGES,
+                    help=f"Pages fetched ahead in the background while the current batch is processed (0 disables; default: {PREFETCH_PAGES}).")
+    ap.add_argument("--seen-set", choices=SEEN_SET_CHOICES, default="exact",
+                    help="(degreesearch, searching, vectorize) How already-seen accounts are remembered: 'exact' = DIDs interned "
+                         "into compact integer IDs; 'bloom' = Bloom filter, far smaller but with --bloom-fp-rate false "
+                         "positives (an unseen account occasionally skipped; vectorize then keeps old vectors instead of pruning) "
+                         "(default: exact).")
+    ap.add_argument("--bloom-fp-rate", type=float, default=0.001,
+                    help="(--seen-set bloom) Target false-positive rate (default: 0.001).")
+    ap.add_argument("--bloom-capacity", type=int, default=100_000,
+                    help="(--seen-set bloom) Accounts the first filter layer is sized for; it grows beyond that (default: 100000).")
+    ap.add_argument("--frontier", choices=FRONTIER_CHOICES, default="priority",
+                    help="(degreesearch) Order in which follower pages are fetched: 'priority' = most expected keyword "
+                         "matches per request first (seed bio match strength, observed page yield, follower counts); "
+                         "'fifo' = seeds in discovery order (default: priority).")
+    ap.add_argument("--seed-pages", type=int, default=5,
+                    help="(degreesearch) Maximum follower pages fetched per seed; later pages compete with fresh seeds (default: 5).")
+    ap.add_argument("--page-budget", type=int, default=0,
+                    help="(degreesearch) Stop after fetching this many follower pages (0 = no limit).")
+    ap.add_argument("--concurrency", type=int, default=4,
+                    help="(degreesearch) Number of seeds whose follower pages are fetched concurrently; (crawl, wordmap --actors) accounts fetched concurrently (default: 4).")
     ap.add_argument("--dry-run", action="store_true", help="Don’t actually change follows; just show what would happen")
     ap.add_argument("--nodesc", action="store_true", help="(following mode) Auto-review empty descriptions within each batch.")
     ap.add_argument("--modlist", action="store_true", help="(listify) Create a moderation list (purpose=app.bsky.graph.defs#modlist) instead of a curated list (curatelist).")
+    ap.add_argument("--prune", action="store_true",
+                    help="(listify) Remove list members that no longer match the keywords (and duplicate items).")
     ap.add_argument("--starterpack", action="store_true",
                     help="(listify) After creating the list, also create a starter pack that points to it.")
     ap.add_argument("--sp-name", default=None,
@@ -1117,9 +5018,92 @@ def main():
     ap.add_argument("--outdir", default=None,
                     help="(vectorize) Output folder for vector files (*.pdfvec.json.gz). Default: ./bsky_vectors")
     ap.add_argument("--overwrite", action="store_true",
-                    help="(vectorize) Overwrite existing vector files if present.")
+                    help="(vectorize, vecexport) Overwrite existing vector files (or store records) even when the manifest shows the text is unchanged.")
+    ap.add_argument("--vector-format", choices=["files", "shards"], default="files",
+                    help="(vectorize) 'files': one *.pdfvec.json.gz per account; 'shards': a single vector store in --outdir (shared vocabulary, sharded gzip JSONL, DID index).")
+    ap.add_argument("--shard-size", type=int, default=10000,
+                    help="(vectorize --vector-format shards) Records per shard file (default: 10000).")
+    ap.add_argument("--export-dir", default=None,
+                    help="(vecexport) Write the legacy per-account *.pdfvec.json.gz files from the store in --outdir here.")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="(vectorize, wordmap --actors) Tokenizer processes (default: CPU count - 1; 1 = tokenize in-process).")
+    ap.add_argument("--analyzer", choices=ANALYZER_CHOICES, default="builtin",
+                    help="(vectorize) Tokenizer: 'builtin' (pure Python, default) or 'sklearn' (scikit-learn's CountVectorizer; same tokens, slower startup).")
+    ap.add_argument("--profile-workers", type=int, default=PROFILE_WORKERS,
+                    help=f"(vectorize) getProfiles requests in flight at once while enriching each page (default: {PROFILE_WORKERS}).")
     ap.add_argument("--meta-csv", default=None,
                     help="(vectorize) Optional: write one-row-per-account metadata CSV to this path.")
+    ap.add_argument("--meta-out", default=None,
+                    help="(vectorize) Optional: write the same metadata with typed columns (ints, bools) to a Parquet "
+                         "(.parquet) or Arrow IPC (.arrow/.feather) file, streamed in row groups. Requires pyarrow.")
+    ap.add_argument("--meta-format", choices=META_FORMATS, default="auto",
+                    help="(--meta-out) File format; 'auto' picks it from the file suffix (default: auto).")
+    ap.add_argument("--meta-row-group", type=int, default=10000,
+                    help="(--meta-out) Rows per row group / record batch (default: 10000).")
+
+    ap.add_argument("--profile-cache", default=None,
+                    help="Optional SQLite file caching getProfiles results by DID across runs (e.g. ~/.cache/bluesky/profiles.sqlite).")
+    ap.add_argument("--cache-ttl", type=float, default=86400.0,
+                    help="(--profile-cache) Seconds before a cached profile is considered stale (default: 86400).")
+    ap.add_argument("--cache-max-entries", type=int, default=200000,
+                    help="(--profile-cache) Evict the oldest profiles beyond this many entries (default: 200000).")
+
+    ap.add_argument("--policy", default=None,
+                    help="(searching, degreesearch) JSON rules file; decide follow/skip/ask per candidate instead of prompting.")
+    ap.add_argument("--audit", default=None,
+                    help="(with --policy) Append every policy decision to this JSONL file.")
+    ap.add_argument("--review-file", default=None,
+                    help="(with --policy) Queue 'ask' candidates here for a later '--mode review' instead of reviewing them at the end of the run. (review) The queue to review.")
+
+    ap.add_argument("--checkpoint", default=None,
+                    help="(degreesearch, vectorize) Periodically save cursors, frontier, dedup sets and counters to this JSON file.")
+    ap.add_argument("--resume", action="store_true",
+                    help="(with --checkpoint) Continue from the saved checkpoint instead of starting over.")
+    ap.add_argument("--checkpoint-interval", type=float, default=30.0,
+                    help="(with --checkpoint) Minimum seconds between checkpoint writes (default: 30).")
+
+    ap.add_argument("--graph-dir", default=None,
+                    help="(crawl, graph) Folder for the follow-graph snapshot. Default: ./bsky_graph")
+    ap.add_argument("--actor", default=None,
+                    help="(crawl) Account to crawl from; (graph) account to query. Default: you / the crawl root.")
+    ap.add_argument("--crawl-max-nodes", type=int, default=5000,
+                    help="(crawl) Stop after listing the follows of this many accounts (default: 5000).")
+    ap.add_argument("--hops", type=int, default=1,
+                    help="(graph) Neighbourhood radius around --actor (default: 1).")
+    ap.add_argument("--mutuals-dir", default=None,
+                    help="(mutuals) Folder for mutuals.tsv, not_following_back.tsv and fans.tsv (default: ./mutuals-<handle>).")
+    ap.add_argument("--unfollow-nonmutuals", action="store_true",
+                    help="(mutuals) After the diff, unfollow the accounts that do not follow you back (asks first; batched).")
+    ap.add_argument("--direction", choices=["out", "in", "both"], default="out",
+                    help="(graph) Expand along follows ('out'), followers ('in') or both (default: out).")
+
+    ap.add_argument("--metrics-json", default=None,
+                    help="Write a JSON metrics summary (request counts, latency histograms, bytes, retries, cache hits, progress) here.")
+    ap.add_argument("--metrics-prom", default=None,
+                    help="Write the metrics in Prometheus text format here (e.g. for node_exporter's textfile collector).")
+    ap.add_argument("--metrics-interval", type=float, default=60.0,
+                    help="(with --metrics-json/--metrics-prom) Also rewrite the files every N seconds during the run (default: 60).")
+    ap.add_argument("--progress-interval", type=float, default=10.0,
+                    help="Seconds between progress/throughput/ETA lines on stderr (0 disables; default: 10).")
+
+    ap.add_argument("--wordmap-counter", choices=["exact", "sketch"], default="exact",
+                    help="(wordmap) 'exact' counts every term; 'sketch' uses bounded memory (Count-Min sketch + Space-Saving top-K).")
+    ap.add_argument("--top-k", type=int, default=None,
+                    help="(wordmap) Keep/print only the K most frequent terms (sketch default: 1000; exact default: all).")
+    ap.add_argument("--ngrams", type=int, default=1, choices=[1, 2, 3],
+                    help="(wordmap) Also count n-grams up to this length (default: 1 = words only).")
+    ap.add_argument("--sketch-epsilon", type=float, default=1e-4,
+                    help="(wordmap sketch) Overcount bound as a fraction of all term occurrences (default: 1e-4).")
+    ap.add_argument("--sketch-delta", type=float, default=0.01,
+                    help="(wordmap sketch) Probability the epsilon bound is exceeded (default: 0.01).")
+    ap.add_argument("--sketch-memory-mb", type=float, default=None,
+                    help="(wordmap sketch) Size the Count-Min sketch to this many MB instead of from --sketch-epsilon.")
+    ap.add_argument("--wordmap-out", default=None,
+                    help="(wordmap) Write the ranking as TSV (term, count, error) here instead of printing it. (wordmerge) Folder for merged.tsv/logodds.tsv (default: --wordmap-dir).")
+    ap.add_argument("--actors", default=None,
+                    help="(wordmap, wordmerge) File with one handle/DID per line: count each account's followers/follows into --wordmap-dir (wordmerge: restrict to these).")
+    ap.add_argument("--wordmap-dir", default=None,
+                    help="(wordmap --actors, wordmerge) Folder of per-actor *.counts.tsv files. Default: ./bsky_wordmaps")
 
     ap.add_argument("--following", dest="wordmap_following", action="store_true", default=False,
                     help="(wordmap mode) Analyze accounts you follow.")
@@ -1128,29 +5112,68 @@ def main():
 
     args = ap.parse_args()
 
+    metrics = get_metrics()
+    metrics.json_path = Path(args.metrics_json).expanduser() if args.metrics_json else None
+    metrics.prom_path = Path(args.metrics_prom).expanduser() if args.metrics_prom else None
+    metrics.export_interval = max(1.0, args.metrics_interval)
+    metrics.progress_interval = max(0.0, args.progress_interval)
+
+    if args.mode in OFFLINE_MODES:
+        OFFLINE_MODES[args.mode](args)
+        return
+    if not args.creds:
+        ap.error(f"--creds is required for mode '{args.mode}'")
+    if args.seen_set == "bloom" and not 0 < args.bloom_fp_rate < 1:
+        ap.error("--bloom-fp-rate must be between 0 and 1")
+
     handle, app_password = read_creds(Path(args.creds))
+    set_transport(args.transport)
+    limiter = None if args.no_ratelimit else set_rate_limiter(RateLimiter())
+    cache = None
+    if args.profile_cache:
+        cache = set_profile_cache(ProfileCache(Path(args.profile_cache).expanduser(),
+                                               ttl_sec=args.cache_ttl, max_entries=args.cache_max_entries))
     keywords = []
     if args.keywords and args.mode != "wordmap":
         keywords = read_keywords(Path(args.keywords))
         if not keywords:
             print("No keywords provided; nothing to match.", file=sys.stderr)
 
-    print(f"Logging in as {handle} @ {args.service} ...")
-    access, did, confirmed_handle = get_session(args.service, handle, app_password)
-    print(f"OK. DID: {did}  Handle: {confirmed_handle}")
-
-    if args.mode == "following":
-        mode_following(args, args.service, access, did, confirmed_handle, keywords)
-    elif args.mode == "searching":
-        mode_searching(args, args.service, access, did, confirmed_handle, keywords)
-    elif args.mode == "listify":
-        mode_listify(args, args.service, access, did, confirmed_handle, keywords)
-    elif args.mode == "vectorize":
-        mode_vectorize(args, args.service, access, did, confirmed_handle, keywords)
-    elif args.mode == "wordmap":
-        mode_wordmap(args, args.service, access, did, confirmed_handle)
-    else:
-        mode_degreesearch(args, args.service, access, did, confirmed_handle, keywords)
+    try:
+        session_cache = None if args.no_session_cache else Path(args.session_cache).expanduser()
+        print(f"Logging in as {handle} @ {args.service} ...")
+        session = set_active_session(Session(args.service, handle, app_password, cache_path=session_cache).open())
+        access, did, confirmed_handle = session.access, session.did, session.handle or handle
+        print(f"OK. DID: {did}  Handle: {confirmed_handle}" + ("  (cached session)" if session.reused else ""))
+
+        if args.mode == "following":
+            mode_following(args, args.service, access, did, confirmed_handle, keywords)
+        elif args.mode == "searching":
+            mode_searching(args, args.service, access, did, confirmed_handle, keywords)
+        elif args.mode == "listify":
+            mode_listify(args, args.service, access, did, confirmed_handle, keywords)
+        elif args.mode == "vectorize":
+            mode_vectorize(args, args.service, access, did, confirmed_handle, keywords)
+        elif args.mode == "wordmap":
+            mode_wordmap(args, args.service, access, did, confirmed_handle)
+        elif args.mode == "review":
+            mode_review(args, args.service, access, did, confirmed_handle)
+        elif args.mode == "crawl":
+            mode_crawl(args, args.service, access, did, confirmed_handle)
+        elif args.mode == "mutuals":
+            mode_mutuals(args, args.service, access, did, confirmed_handle)
+        else:
+            mode_degreesearch(args, args.service, access, did, confirmed_handle, keywords)
+    finally:
+        # Also on errors/Ctrl-C, so an interrupted long run still leaves its metrics
+        metrics.export()
+
+    if cache is not None:
+        print(cache.summary())
+        cache.close()
+    if limiter is not None:
+        print(limiter.summary())
+    print(metrics.summary())
 
 if __name__ == "__main__":
     main()
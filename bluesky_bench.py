@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark bluesky.py modes against the local mock PDS (bluesky_mockpds.py).
+
+Each mode runs in a fresh subprocess against a fresh mock server process
+(so the synthetic graph does not count toward the client's peak RSS),
+non-interactively (stdin is empty, so prompts take their default;
+degreesearch/searching run with a --policy).  Reported per mode:
+requests, wall time, requests/sec, peak RSS and exit status.
+
+Usage:
+  python bluesky_bench.py --accounts 5000 --follows-per 150 --latency 0.005
+  python bluesky_bench.py --modes vectorize wordmap --json bench.json -- --transport curl
+Arguments after `--` are passed to every bluesky.py run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+HERE = Path(__file__).resolve().parent
+KEYWORDS = ["genomics", "python", "climate"]
+
+# mode name -> bluesky.py arguments ({work} is the per-mode scratch folder)
+SCENARIOS = {
+    "following": ["-m", "following", "--nodesc", "--keywords", "{work}/keywords.txt"],
+    "vectorize": ["-m", "vectorize", "--outdir", "{work}/vectors", "--meta-csv", "{work}/meta.csv"],
+    "wordmap": ["-m", "wordmap", "--following"],
+    "listify": ["-m", "listify", "--keywords", "{work}/keywords.txt"],
+    "searching": ["-m", "searching", "--keywords", "{work}/keywords.txt", "--policy", "{work}/policy.json"],
+    "mutuals": ["-m", "mutuals", "--mutuals-dir", "{work}/mutuals"],
+    "degreesearch": ["-m", "degreesearch", "--keywords", "{work}/keywords.txt", "--policy", "{work}/policy.json",
+                     "--review-file", "{work}/ask.jsonl"],
+}
+
+def _peak_rss_mb(ru_maxrss):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else ru_maxrss / 1024
+
+def _drain(stream, path: Path):
+    # Copy the mock's stderr to a file so a full pipe never blocks the server.
+    with stream, path.open("w", encoding="utf-8") as fh:
+        for line in stream:
+            fh.write(line)
+
+def start_mock(server_args, log, err_path: Path):
+    """
+    Launch bluesky_mockpds.py on a free port; returns (process, base_url).
+    After the URL line, the rest of its stderr is drained into `err_path`
+    by a background thread (process.drain).
+    """
+    proc = subprocess.Popen([sys.executable, str(HERE / "bluesky_mockpds.py"), "--port", "0", *server_args],
+                            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.PIPE, text=True)
+    first = proc.stderr.readline()
+    if "http://" not in first:
+        proc.kill()
+        raise SystemExit(f"Mock PDS failed to start: {first.strip() or proc.stderr.read().strip()}")
+    proc.drain = threading.Thread(target=_drain, args=(proc.stderr, err_path), daemon=True)
+    proc.drain.start()
+    return proc, first.split()[3]
+
+def run_mode(name, server_args, work: Path, extra):
+    """Run one scenario; returns a result dict."""
+    work.mkdir(parents=True, exist_ok=True)
+    (work / "creds.txt").write_text("user0.bench\nbench-password\n", encoding="utf-8")
+    (work / "keywords.txt").write_text("\n".join(KEYWORDS) + "\n", encoding="utf-8")
+    (work / "policy.json").write_text("{}\n", encoding="utf-8")
+
+    with (work / "mockpds.log").open("w", encoding="utf-8") as mock_log:
+        server, url = start_mock(server_args, mock_log, work / "mockpds.err.log")
+    # Each run logs in afresh (and keeps the mock's tokens out of ~/.cache)
+    cmd = [sys.executable, str(HERE / "bluesky.py"), "--service", url, "--creds", str(work / "creds.txt"),
+           "--no-session-cache"]
+    cmd += [a.format(work=work) for a in SCENARIOS[name]] + list(extra)
+    try:
+        with (work / "output.log").open("w", encoding="utf-8") as log:
+            t0 = time.perf_counter()
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+            _, status, usage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - t0
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        with urlopen(f"{url}/_mock/stats") as resp:
+            stats = json.load(resp)
+    finally:
+        server.kill()
+        server.wait()
+        server.drain.join(timeout=5)
+    return {
+        "mode": name,
+        "exit": proc.returncode,
+        "wall_sec": round(wall, 3),
+        "requests": stats["requests"],
+        "req_per_sec": round(stats["requests"] / wall, 1) if wall > 0 else None,
+        "peak_rss_mb": round(_peak_rss_mb(usage.ru_maxrss), 1),
+        "cpu_sec": round(usage.ru_utime + usage.ru_stime, 3),
+        "bytes_received": stats["bytes_sent"],
+        "errors_injected": stats["errors_injected"],
+        "throttled": stats["throttled"],
+        "by_endpoint": stats["by_endpoint"],
+        "log": str(work / "output.log"),
+    }
+
+def main():
+    argv = sys.argv[1:]
+    extra = []
+    if "--" in argv:
+        cut = argv.index("--")
+        argv, extra = argv[:cut], argv[cut + 1:]
+    ap = argparse.ArgumentParser(description="Benchmark bluesky.py modes against a local mock PDS.")
+    ap.add_argument("--modes", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+                    help="Modes to run (default: all).")
+    ap.add_argument("--accounts", type=int, default=2000, help="Synthetic accounts (default: 2000).")
+    ap.add_argument("--follows-per", type=int, default=100, help="Follows per account (default: 100).")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds added to every mock request.")
+    ap.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random seconds per request.")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock requests failing with HTTP 500.")
+    ap.add_argument("--rate-limit", type=int, default=0, help="Mock requests per window before 429s (0 = off).")
+    ap.add_argument("--rate-window", type=int, default=300)
+    ap.add_argument("--workdir", default=None, help="Keep per-mode outputs/logs here (default: a temp folder).")
+    ap.add_argument("--json", default=None, help="Also write the results as JSON to this path.")
+    args = ap.parse_args(argv)
+
+    server_args = [f"--{k.replace('_', '-')}={v}" for k, v in (
+        ("accounts", args.accounts), ("follows_per", args.follows_per), ("seed", args.seed),
+        ("latency", args.latency), ("jitter", args.jitter), ("error_rate", args.error_rate),
+        ("rate_limit", args.rate_limit), ("rate_window", args.rate_window),
+    )]
+
+    tmp = None
+    if args.workdir:
+        root = Path(args.workdir).expanduser().resolve()
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="bsky-bench-")
+        root = Path(tmp.name)
+
+    print(f"Synthetic graph: {args.accounts} accounts x {args.follows_per} follows; "
+          f"latency={args.latency}s jitter={args.jitter}s error_rate={args.error_rate}")
+    print(f"{'mode':<14}{'exit':>5}{'requests':>10}{'wall s':>10}{'req/s':>10}{'peak MB':>10}{'cpu s':>9}")
+    results = []
+    try:
+        for name in args.modes:
+            r = run_mode(name, server_args, root / name, extra)
+            results.append(r)
+            print(f"{name:<14}{r['exit']:>5}{r['requests']:>10}{r['wall_sec']:>10.2f}"
+                  f"{(r['req_per_sec'] or 0):>10.1f}{r['peak_rss_mb']:>10.1f}{r['cpu_sec']:>9.2f}", flush=True)
+            if r["exit"] != 0:
+                print(f"  (non-zero exit; see {r['log']})" if tmp is None else "  (non-zero exit; rerun with --workdir to keep the log)")
+    finally:
+        if args.json:
+            Path(args.json).write_text(json.dumps({
+                "server_args": server_args, "extra_args": extra, "results": results,
+            }, indent=2), encoding="utf-8")
+            print(f"Results written to {args.json}")
+        if tmp is not None:
+            tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
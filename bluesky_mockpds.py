@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bluesky XRPC endpoints used by bluesky.py, serving a
+synthetic follow graph so modes can be exercised and benchmarked offline.
+
+Implemented:
+  com.atproto.server.createSession / refreshSession
+  com.atproto.repo.createRecord / deleteRecord / applyWrites
+  app.bsky.graph.getFollows / getFollowers / getList / getLists
+  app.bsky.actor.getProfiles / searchActors
+
+Usage:
+  python bluesky_mockpds.py --port 8765 --accounts 5000 --follows-per 150
+  python bluesky.py --service http://127.0.0.1:8765 --creds creds.txt ...
+    (creds: line1=user0.bench, line2=any password)
+
+Latency (--latency/--jitter) and failures (--error-rate: HTTP 500s,
+--rate-limit: per-window 429s with RateLimit headers) can be injected.
+With --token-ttl, sessions get JWT-shaped tokens carrying an `exp` claim and
+requests with an expired or unknown accessJwt fail with ExpiredToken /
+InvalidToken, as a real PDS does.
+GET /_mock/stats returns the request counters.
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+WORDS = [
+    "genomics", "biologist", "python", "rust", "data", "science", "music", "art",
+    "photography", "runner", "cats", "chef", "climate", "policy", "teacher", "writer",
+    "physics", "astronomy", "design", "games", "linux", "privacy", "history", "books",
+]
+
+# ------------------------- Synthetic graph -------------------------
+class SyntheticGraph:
+    """
+    Deterministic follow graph: `accounts` actors (user0.bench is the logged-in
+    account), each following `follows_per` others chosen with a popularity
+    skew, and bios drawn from WORDS (every `empty_every`-th bio is empty).
+    """
+
+    def __init__(self, accounts=2000, follows_per=100, seed=1, empty_every=7):
+        rnd = random.Random(seed)
+        self.n = max(2, int(accounts))
+        self.profiles = []
+        for i in range(self.n):
+            bio = "" if empty_every and i % empty_every == 0 else " ".join(rnd.sample(WORDS, 3))
+            self.profiles.append({
+                "did": self.did(i),
+                "handle": f"user{i}.bench",
+                "displayName": f"User {i}",
+                "description": bio,
+                "avatar": f"https://cdn.example/avatar/{i}.jpg",
+                "followersCount": 0,
+                "followsCount": 0,
+                "postsCount": rnd.randint(0, 5000),
+            })
+        per = min(max(0, int(follows_per)), self.n - 1)
+        self.follows = []
+        for i in range(self.n):
+            chosen = set()
+            while len(chosen) < per:
+                # Low indices are "popular": skewed toward the front of the list
+                j = int(self.n * rnd.random() ** 2)
+                if j != i:
+                    chosen.add(j)
+            self.follows.append(sorted(chosen))
+        self.followers = [[] for _ in range(self.n)]
+        for i, outs in enumerate(self.follows):
+            for j in outs:
+                self.followers[j].append(i)
+        for i in range(self.n):
+            self.profiles[i]["followsCount"] = len(self.follows[i])
+            self.profiles[i]["followersCount"] = len(self.followers[i])
+        self.by_handle = {p["handle"]: i for i, p in enumerate(self.profiles)}
+
+    @staticmethod
+    def did(i):
+        return f"did:plc:bench{i:07d}"
+
+    def index(self, actor):
+        """Index for a DID or handle (None if unknown)."""
+        if actor.startswith("did:plc:bench"):
+            try:
+                i = int(actor[len("did:plc:bench"):])
+            except ValueError:
+                return None
+            return i if 0 <= i < self.n else None
+        return self.by_handle.get(actor.lstrip("@"))
+
+# ------------------------- Server state -------------------------
+class MockPDS:
+    """
+    XRPC state on top of a SyntheticGraph.  Follow records written by
+    createRecord/applyWrites update the logged-in account's follows, so
+    viewer.following and getFollows reflect them.  stats() reports request
+    counts per endpoint, errors injected and bytes sent.
+    """
+
+    ME = 0
+
+    def __init__(self, graph, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0,
+                 rate_window=300, seed=1, token_ttl=0):
+        self.graph = graph
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.rate_limit = int(rate_limit)
+        self.rate_window = int(rate_window)
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.records = {}          # at-uri -> record
+        self.follow_uris = {}      # subject index -> follow record uri
+        self._rkey = 0
+        self._sessions = 0
+        self.token_ttl = float(token_ttl)
+        self._tokens = {}          # token -> (kind, exp); only tracked with token_ttl
+        self.reset_stats()
+        for j in graph.follows[self.ME]:
+            self.follow_uris[j] = self._new_uri("app.bsky.graph.follow")
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts = {}
+            self.errors = 0
+            self.throttled = 0
+            self.bytes_sent = 0
+            self._window_start = time.time()
+            self._window_used = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": sum(self.counts.values()),
+                "by_endpoint": dict(sorted(self.counts.items())),
+                "errors_injected": self.errors,
+                "throttled": self.throttled,
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def _new_uri(self, collection):
+        self._rkey += 1
+        return f"at://{self.graph.did(self.ME)}/{collection}/3mock{self._rkey:09d}"
+
+    # -- request bookkeeping --
+    def admit(self, endpoint):
+        """Count the call, sleep the injected latency; return (status, headers, body) to fail with, or None."""
+        delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        headers = {}
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            if self.rate_limit:
+                now = time.time()
+                if now - self._window_start >= self.rate_window:
+                    self._window_start, self._window_used = now, 0
+                self._window_used += 1
+                reset = int(self._window_start + self.rate_window)
+                headers = {
+                    "RateLimit-Limit": str(self.rate_limit),
+                    "RateLimit-Remaining": str(max(0, self.rate_limit - self._window_used)),
+                    "RateLimit-Reset": str(reset),
+                    "RateLimit-Policy": f"{self.rate_limit};w={self.rate_window}",
+                }
+                if self._window_used > self.rate_limit:
+                    self.throttled += 1
+                    return 429, headers, {"error": "RateLimitExceeded", "message": "Rate Limit Exceeded"}
+            if self.error_rate and self._rnd.random() < self.error_rate:
+                self.errors += 1
+                return 500, headers, {"error": "InternalServerError", "message": "injected failure"}
+        return None, headers, None
+
+    # -- views --
+    def profile_view(self, i):
+        view = dict(self.graph.profiles[i])
+        if i != self.ME:
+            view["viewer"] = {
+                "following": self.follow_uris.get(i),
+                "followedBy": (self.graph.did(self.ME) if self.ME in self.graph.follows[i] else None),
+                "muted": False,
+                "blockedBy": False,
+            }
+        return view
+
+    @staticmethod
+    def _page(items, q, default_limit=50, max_limit=100):
+        limit = min(max_limit, max(1, int((q.get("limit") or [default_limit])[0])))
+        start = int((q.get("cursor") or ["0"])[0] or 0)
+        out = items[start:start + limit]
+        return out, (str(start + limit) if start + limit < len(items) else None)
+
+    # -- GET --
+    def get(self, method, q):
+        g = self.graph
+        if method in ("app.bsky.graph.getFollows", "app.bsky.graph.getFollowers"):
+            i = g.index((q.get("actor") or [""])[0])
+            if i is None:
+                return 400, {"error": "InvalidRequest", "message": "Profile not found"}
+            with self._lock:
+                if method.endswith("getFollows"):
+                    ids = sorted(self.follow_uris) if i == self.ME else g.follows[i]
+                    key = "follows"
+                else:
+                    ids = g.followers[i]
+                    key = "followers"
+                page, cursor = self._page(ids, q)
+                out = {"subject": self.profile_view(i), key: [self.profile_view(j) for j in page]}
+            if cursor:
+                out["cursor"] = cursor
+            return 200, out
+        if method == "app.bsky.actor.getProfiles":
+            actors = q.get("actors") or []
+            if len(actors) > 25:
+                return 400, {"error": "InvalidRequest", "message": "actors must not have more than 25 elements"}
+            with self._lock:
+                views = [self.profile_view(i) for i in (g.index(a) for a in actors) if i is not None]
+            return 200, {"profiles": views}
+        if method == "app.bsky.actor.searchActors":
+            term = " ".join((q.get("q") or q.get("term") or [""])[0].lower().split())
+            hits = [i for i, p in enumerate(g.profiles)
+                    if term and (term in p["description"].lower() or term in p["handle"])]
+            page, cursor = self._page(hits, q, default_limit=25)
+            with self._lock:
+                out = {"actors": [self.profile_view(i) for i in page]}
+            if cursor:
+                out["cursor"] = cursor
+            return 200, out
+        if method == "app.bsky.graph.getLists":
+            with self._lock:
+                lists = [self._list_view(uri) for uri in self.records if "/app.bsky.graph.list/" in uri]
+            page, cursor = self._page(lists, q)
+            out = {"lists": page}
+            if cursor:
+                out["cursor"] = cursor
+            return 200, out
+        if method == "app.bsky.graph.getList":
+            uri = (q.get("list") or [""])[0]
+            with self._lock:
+                if uri not in self.records:
+                    return 400, {"error": "InvalidRequest", "message": "List not found"}
+                items = [{"uri": k, "subject": self.profile_view(g.index(r["subject"]))}
+                         for k, r in self.records.items()
+                         if r.get("list") == uri and g.index(r.get("subject", "")) is not None]
+                page, cursor = self._page(items, q)
+                out = {"list": self._list_view(uri), "items": page}
+            if cursor:
+                out["cursor"] = cursor
+            return 200, out
+        return 501, {"error": "MethodNotImplemented", "message": f"Method Not Implemented: {method}"}
+
+    def _list_view(self, uri):
+        rec = self.records[uri]
+        return {"uri": uri, "cid": "bafymock", "name": rec.get("name"), "purpose": rec.get("purpose"),
+                "description": rec.get("description"), "creator": self.profile_view(self.ME)}
+
+    # -- POST --
+    def post(self, method, body, token=None):
+        me = self.graph.did(self.ME)
+        if method == "com.atproto.server.createSession":
+            if self.graph.index(body.get("identifier") or "") != self.ME:
+                return 401, {"error": "AuthenticationRequired", "message": "Invalid identifier or password"}
+            return 200, self._session()
+        if method == "com.atproto.server.refreshSession":
+            with self._lock:
+                kind, exp = self._tokens.pop(token, (None, 0)) if self.token_ttl else ("refresh", 0)
+            if kind != "refresh":
+                return 400, {"error": "ExpiredToken", "message": "Token has been revoked"}
+            return 200, self._session()
+        if method in ("com.atproto.repo.createRecord", "com.atproto.repo.deleteRecord"):
+            if body.get("repo") not in (me, self.graph.profiles[self.ME]["handle"]):
+                return 400, {"error": "InvalidRequest", "message": "repo must be the session account"}
+            with self._lock:
+                if method.endswith("createRecord"):
+                    return 200, self._create(body.get("collection"), body.get("record") or {})
+                self._delete(body.get("collection"), body.get("rkey"))
+            return 200, {}
+        if method == "com.atproto.repo.applyWrites":
+            results = []
+            with self._lock:
+                for w in body.get("writes") or []:
+                    kind = (w.get("$type") or "").rsplit("#", 1)[-1]
+                    if kind == "create":
+                        res = self._create(w.get("collection"), w.get("value") or {})
+                        results.append({"$type": "com.atproto.repo.applyWrites#createResult", **res})
+                    elif kind == "delete":
+                        self._delete(w.get("collection"), w.get("rkey"))
+                        results.append({"$type": "com.atproto.repo.applyWrites#deleteResult"})
+                    else:
+                        return 400, {"error": "InvalidRequest", "message": f"unsupported write {kind!r}"}
+            return 200, {"results": results}
+        return 501, {"error": "MethodNotImplemented", "message": f"Method Not Implemented: {method}"}
+
+    def _session(self):
+        me = self.graph.profiles[self.ME]
+        with self._lock:
+            self._sessions += 1
+            n = self._sessions
+            if not self.token_ttl:
+                return {"accessJwt": f"mock-access-{n}", "refreshJwt": f"mock-refresh-{n}",
+                        "did": me["did"], "handle": me["handle"]}
+            now = time.time()
+            access = self._jwt("access", n, now + self.token_ttl)
+            refresh = self._jwt("refresh", n, now + 90 * 86400)
+            self._tokens[access] = ("access", now + self.token_ttl)
+            self._tokens[refresh] = ("refresh", now + 90 * 86400)
+        return {"accessJwt": access, "refreshJwt": refresh, "did": me["did"], "handle": me["handle"]}
+
+    def _jwt(self, kind, n, exp):
+        def part(obj):
+            return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+        claims = {"scope": f"com.atproto.{kind}", "sub": self.graph.did(self.ME), "jti": n,
+                  "iat": int(time.time()), "exp": int(exp)}
+        return f"{part({'typ': 'JWT', 'alg': 'none'})}.{part(claims)}.mock"
+
+    def check_auth(self, method, token):
+        """None if `token` may call `method`, else (status, error body)."""
+        if not self.token_ttl or method in ("com.atproto.server.createSession",
+                                            "com.atproto.server.refreshSession"):
+            return None
+        with self._lock:
+            kind, exp = self._tokens.get(token, (None, 0))
+        if kind != "access":
+            return 401, {"error": "InvalidToken", "message": "Bad token"}
+        if exp <= time.time():
+            return 400, {"error": "ExpiredToken", "message": "Token has expired"}
+        return None
+
+    def _create(self, collection, record):
+        uri = self._new_uri(collection)
+        self.records[uri] = record
+        if collection == "app.bsky.graph.follow":
+            j = self.graph.index(record.get("subject") or "")
+            if j is not None:
+                self.follow_uris[j] = uri
+        return {"uri": uri, "cid": "bafymock"}
+
+    def _delete(self, collection, rkey):
+        uri = f"at://{self.graph.did(self.ME)}/{collection}/{rkey}"
+        rec = self.records.pop(uri, None)
+        for j, u in list(self.follow_uris.items()):
+            if u == uri:
+                del self.follow_uris[j]
+                break
+        return rec
+
+# ------------------------- HTTP server -------------------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY, Nagle
+    # plus delayed ACKs add ~40 ms to every keep-alive request.
+    disable_nagle_algorithm = True
+    pds = None  # set by make_server()
+
+    def _reply(self, status, obj, headers=None):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.pds._lock:
+            self.pds.bytes_sent += len(data)
+
+    def _dispatch(self, verb):
+        parts = urlsplit(self.path)
+        method = parts.path.rsplit("/", 1)[-1]
+        if parts.path == "/_mock/stats":
+            # Not counted: lets a harness in another process read the counters
+            return self._reply(200, self.pds.stats())
+        if not parts.path.startswith("/xrpc/"):
+            return self._reply(404, {"error": "NotFound", "message": parts.path})
+        body = {}
+        if verb == "POST":
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                return self._reply(400, {"error": "InvalidRequest", "message": "body is not JSON"})
+        status, headers, fail = self.pds.admit(method)
+        if status is not None:
+            return self._reply(status, fail, headers)
+        auth = self.headers.get("Authorization") or ""
+        token = auth[7:] if auth.startswith("Bearer ") else None
+        denied = self.pds.check_auth(method, token)
+        if denied:
+            return self._reply(*denied, headers)
+        if verb == "GET":
+            status, out = self.pds.get(method, parse_qs(parts.query))
+        else:
+            status, out = self.pds.post(method, body, token)
+        self._reply(status, out, headers)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, *args):
+        pass
+
+def make_server(pds, host="127.0.0.1", port=0):
+    """Return a ThreadingHTTPServer serving `pds` (port 0 picks a free port)."""
+    handler = type("MockPDSHandler", (_Handler,), {"pds": pds})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    return server
+
+def start_background(pds, host="127.0.0.1", port=0):
+    """Serve `pds` on a daemon thread; returns (server, base_url)."""
+    server = make_server(pds, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    ap = argparse.ArgumentParser(description="Local mock Bluesky PDS with a synthetic follow graph.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free one).")
+    ap.add_argument("--accounts", type=int, default=2000, help="Number of synthetic accounts (default: 2000).")
+    ap.add_argument("--follows-per", type=int, default=100, help="Follows per account (default: 100).")
+    ap.add_argument("--seed", type=int, default=1, help="Graph and failure-injection seed.")
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    ap.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random seconds per request.")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    ap.add_argument("--rate-limit", type=int, default=0,
+                    help="Requests per window before 429s (0 = unlimited; also enables RateLimit-* headers).")
+    ap.add_argument("--rate-window", type=int, default=300, help="Rate-limit window in seconds (default: 300).")
+    ap.add_argument("--token-ttl", type=float, default=0,
+                    help="Lifetime of issued accessJwts in seconds (0 = tokens never checked).")
+    args = ap.parse_args()
+
+    graph = SyntheticGraph(args.accounts, args.follows_per, seed=args.seed)
+    pds = MockPDS(graph, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                  rate_limit=args.rate_limit, rate_window=args.rate_window, seed=args.seed,
+                  token_ttl=args.token_ttl)
+    server = make_server(pds, args.host, args.port)
+    # First line of stderr is machine-readable: bluesky_bench.py parses the URL.
+    print(f"Mock PDS on http://{args.host}:{server.server_address[1]} "
+          f"({graph.n} accounts, {args.follows_per} follows each); log in as {graph.profiles[0]['handle']}",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(pds.stats(), indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: a mock PDS (bluesky_mockpds.py) served in-process, and a
+helper that runs bluesky.py against it in a subprocess.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import bluesky_mockpds
+
+HERE = Path(__file__).resolve().parent
+
+
+def start_mock(accounts=300, follows_per=12, seed=3):
+    graph = bluesky_mockpds.SyntheticGraph(accounts=accounts, follows_per=follows_per, seed=seed)
+    pds = bluesky_mockpds.MockPDS(graph)
+    server, url = bluesky_mockpds.start_background(pds)
+    return pds, url, server
+
+
+@pytest.fixture(scope="module")
+def mock_pds():
+    pds, url, server = start_mock()
+    yield pds, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fresh_mock():
+    """A new mock PDS per call (for tests whose runs write follows)."""
+    servers = []
+
+    def make(**kwargs):
+        pds, url, server = start_mock(**kwargs)
+        servers.append(server)
+        return pds, url
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def run_bluesky(url, tmp_path, *args):
+    """Run bluesky.py against the mock at `url` as user0.bench, stdin empty."""
+    creds = tmp_path / "creds.txt"
+    creds.write_text("user0.bench\nmock-password\n", encoding="utf-8")
+    cmd = [sys.executable, str(HERE / "bluesky.py"), "--service", url, "--creds", str(creds),
+           "--no-session-cache", *args]
+    return subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120)
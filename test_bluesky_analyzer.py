@@ -0,0 +1,79 @@
+"""
+The built-in vectorize analyzer must produce exactly the token stream of
+pdf_cluster.py's CountVectorizer, or vector files written with
+--analyzer builtin stop matching those built with scikit-learn.  The golden
+outputs below pin that stream without scikit-learn; with it installed, the
+analyzer is also compared against CountVectorizer directly.
+
+    python -m pytest -q test_bluesky_analyzer.py
+"""
+import pytest
+
+import bluesky
+
+
+SAMPLES = [
+    "",
+    "Plain ASCII bio about the Python data science community",
+    "Café owner in São Paulo, naïve résumé writer, Zürich → Kraków",
+    "Ĳssel ﬁnance ﬂow oﬃce Œuvre straße",
+    "ＦＵＬＬＷＩＤＴＨ ｔｅｘｔ ｆｒｏｍ ＴＯＫＹＯ",
+    "state-of-the-art open-source ML-ops co-op -leading trailing- x-ray",
+    "🦋 Bluesky 🚀 builder 👩‍💻 coffee☕lover 🇩🇪 emoji-heavy",
+    "ab abc a1b2 2fast 42 go! @handle.bsky.social #hashtag https://example.com/path",
+]
+
+
+@pytest.mark.parametrize("sample, expected", [
+    ("", []),
+    ("Plain ASCII bio about the Python data science community",
+     ["plain", "ascii", "bio", "python", "data", "science", "community",
+      "plain ascii", "ascii bio", "bio python", "python data", "data science", "science community"]),
+    ("Café owner in São Paulo, naïve résumé writer",
+     ["cafe", "owner", "sao", "paulo", "naive", "resume", "writer",
+      "cafe owner", "owner sao", "sao paulo", "paulo naive", "naive resume", "resume writer"]),
+    ("state-of-the-art open-source ML-ops co-op x-ray",
+     ["state-of-the-art", "open-source", "ml-ops", "co-op", "x-ray",
+      "state-of-the-art open-source", "open-source ml-ops", "ml-ops co-op", "co-op x-ray"]),
+    ("ab abc a1b2 2fast 42 go! @handle.bsky.social #hashtag",
+     ["abc", "a1b2", "handle", "bsky", "social", "hashtag",
+      "abc a1b2", "a1b2 handle", "handle bsky", "bsky social", "social hashtag"]),
+    ("The and of", []),
+    ("genomics", ["genomics"]),
+])
+def test_builtin_analyzer_golden_tokens(sample, expected):
+    assert bluesky._bsky_build_analyzer("builtin")(sample) == expected
+
+
+def test_builtin_analyzer_counts():
+    counts = bluesky._bsky_text_to_counts("Python python PYTHON data", bluesky._bsky_builtin_analyzer)
+    assert counts == {"python": 3, "data": 1, "python python": 2, "python data": 1}
+
+
+def test_stop_words_size():
+    assert len(bluesky._ENGLISH_STOP_WORDS) == 318
+
+
+@pytest.fixture(scope="module")
+def sklearn_text():
+    return pytest.importorskip("sklearn.feature_extraction.text")
+
+
+@pytest.fixture(scope="module")
+def sklearn_analyzer(sklearn_text):
+    return sklearn_text.CountVectorizer(
+        stop_words="english",
+        ngram_range=(1, 2),
+        strip_accents="unicode",
+        lowercase=True,
+        token_pattern=r"(?u)\b[A-Za-z][A-Za-z0-9\-]{2,}\b",
+    ).build_analyzer()
+
+
+def test_stop_words_match_sklearn(sklearn_text):
+    assert bluesky._ENGLISH_STOP_WORDS == sklearn_text.ENGLISH_STOP_WORDS
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_builtin_analyzer_matches_countvectorizer(sklearn_analyzer, sample):
+    assert bluesky._bsky_build_analyzer("builtin")(sample) == sklearn_analyzer(sample)
@@ -0,0 +1,74 @@
+"""
+--checkpoint/--resume: the Checkpoint file itself, and a degreesearch run
+interrupted by --page-budget and resumed against the mock PDS.
+
+    python -m pytest -q test_bluesky_checkpoint.py
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import bluesky
+from conftest import run_bluesky
+
+
+def test_checkpoint_round_trip(tmp_path):
+    ckpt = bluesky.Checkpoint(tmp_path / "ck.json", "degreesearch", "me.bsky", interval_sec=3600)
+    assert ckpt.load() is None
+    assert ckpt.save(lambda: {"cursor": "abc", "seen": [1, 2]})
+    # Throttled until the interval passed, unless forced
+    assert not ckpt.save(lambda: {"cursor": "def"})
+    assert ckpt.load() == {"cursor": "abc", "seen": [1, 2]}
+    assert ckpt.save(lambda: {"cursor": "def"}, force=True)
+    assert bluesky.Checkpoint(tmp_path / "ck.json", "degreesearch", "me.bsky").load() == {"cursor": "def"}
+    assert not (tmp_path / "ck.json.tmp").exists()
+
+
+@pytest.mark.parametrize("mode, actor", [("vectorize", "me.bsky"), ("degreesearch", "other.bsky")])
+def test_checkpoint_refuses_other_runs(tmp_path, mode, actor):
+    bluesky.Checkpoint(tmp_path / "ck.json", "degreesearch", "me.bsky").save(lambda: {}, force=True)
+    with pytest.raises(SystemExit):
+        bluesky.Checkpoint(tmp_path / "ck.json", mode, actor).load()
+
+
+def test_open_checkpoint(tmp_path):
+    args = SimpleNamespace(checkpoint=None, resume=True)
+    with pytest.raises(SystemExit):
+        bluesky.open_checkpoint(args, "vectorize", "me.bsky")
+    args = SimpleNamespace(checkpoint=str(tmp_path / "ck.json"), resume=True, checkpoint_interval=30.0)
+    ckpt, state = bluesky.open_checkpoint(args, "vectorize", "me.bsky")
+    assert state is None
+    ckpt.save(lambda: {"done_cursor": "x"}, force=True)
+    assert bluesky.open_checkpoint(args, "vectorize", "me.bsky")[1] == {"done_cursor": "x"}
+    args.resume = False
+    assert bluesky.open_checkpoint(args, "vectorize", "me.bsky")[1] is None
+
+
+def _decided(path):
+    return [(r["did"], r["decision"]) for r in map(json.loads, path.read_text(encoding="utf-8").splitlines())]
+
+
+def test_degreesearch_resume_matches_uninterrupted_run(fresh_mock, tmp_path):
+    (tmp_path / "kw.txt").write_text("python\ndata\nmusic\nclimate\n", encoding="utf-8")
+    (tmp_path / "policy.json").write_text("{}\n", encoding="utf-8")
+    common = ["-m", "degreesearch", "--keywords", str(tmp_path / "kw.txt"), "--policy", str(tmp_path / "policy.json"),
+              "--limit", "10", "--degreelimit", "2", "--seed-pages", "2"]
+
+    _, url = fresh_mock(follows_per=30)
+    first = run_bluesky(url, tmp_path, *common, "--page-budget", "2", "--audit", str(tmp_path / "a1.jsonl"),
+                        "--checkpoint", str(tmp_path / "ck.json"))
+    assert first.returncode == 0, first.stderr
+    resumed = run_bluesky(url, tmp_path, *common, "--page-budget", "6", "--audit", str(tmp_path / "a2.jsonl"),
+                          "--checkpoint", str(tmp_path / "ck.json"), "--resume")
+    assert resumed.returncode == 0, resumed.stderr
+    assert "Resuming from checkpoint" in resumed.stdout
+
+    _, url = fresh_mock(follows_per=30)
+    whole = run_bluesky(url, tmp_path, *common, "--page-budget", "6", "--audit", str(tmp_path / "all.jsonl"))
+    assert whole.returncode == 0, whole.stderr
+
+    before, after = _decided(tmp_path / "a1.jsonl"), _decided(tmp_path / "a2.jsonl")
+    assert before and after
+    assert not {d for d, _ in before} & {d for d, _ in after}
+    assert before + after == _decided(tmp_path / "all.jsonl")
@@ -0,0 +1,102 @@
+"""
+SeedFrontier (degreesearch --frontier): best-first scoring, FIFO order and
+the checkpoint round-trip.
+
+    python -m pytest -q test_bluesky_frontier.py
+"""
+import bluesky
+
+
+def seed(name, followers=None, strength=1):
+    s = {"did": f"did:plc:{name}", "handle": name, "strength": strength}
+    if followers is not None:
+        s["followersCount"] = followers
+    return s
+
+
+def key_of(s):
+    return s["did"]
+
+
+def make(strategy="priority"):
+    return bluesky.SeedFrontier(50, strategy=strategy, strength=lambda s: s["strength"])
+
+
+def drain(frontier):
+    out = []
+    while len(frontier):
+        s, depth, cursor = frontier.pop()
+        out.append((s["handle"], cursor))
+    return out
+
+
+def test_fifo_keeps_insertion_order():
+    f = make("fifo")
+    for name in ("a", "b", "c"):
+        f.push(key_of(seed(name, strength=3 if name == "c" else 1)), seed(name), 0)
+    assert drain(f) == [("a", None), ("b", None), ("c", None)]
+
+
+def test_stronger_bio_match_goes_first():
+    f = make()
+    f.push("did:plc:weak", seed("weak"), 0)
+    f.push("did:plc:strong", seed("strong", strength=3), 0)
+    assert f.score("did:plc:strong") > f.score("did:plc:weak")
+    assert [h for h, _ in drain(f)] == ["strong", "weak"]
+
+
+def test_small_accounts_are_capped_by_follower_count():
+    f = make()
+    f.push("did:plc:big", seed("big", followers=10_000), 0)
+    f.push("did:plc:tiny", seed("tiny", followers=3), 0)
+    assert f.score("did:plc:tiny") < f.score("did:plc:big")
+    assert [h for h, _ in drain(f)] == ["big", "tiny"]
+
+
+def test_productive_seed_outranks_fresh_one():
+    f = make()
+    f.push("did:plc:rich", seed("rich"), 0)
+    f.pop()
+    # Page 1 of `rich`: 40 of 50 followers matched; a dud elsewhere keeps the global rate low
+    f.page_done("did:plc:rich", 50, 40)
+    f.push("did:plc:dud", seed("dud"), 0)
+    f.pop()
+    f.page_done("did:plc:dud", 50, 0)
+    f.push("did:plc:fresh", seed("fresh"), 0)
+    f.push("did:plc:rich", seed("rich"), 0, cursor="page2")
+    assert drain(f) == [("rich", "page2"), ("fresh", None)]
+    assert [r["actor"] for r in f.top(2)] == ["rich", "dud"]
+
+
+def test_fresh_counts_unexpanded_entries():
+    f = make()
+    f.push("did:plc:a", seed("a"), 0)
+    f.push("did:plc:a", seed("a"), 0, cursor="c1")
+    assert f.fresh == 1
+    drain(f)
+    assert f.fresh == 0
+
+
+def test_state_round_trip_keeps_pop_order():
+    f = make()
+    for n in range(6):
+        f.push(f"did:plc:s{n}", seed(f"s{n}", strength=1 + n % 3), 0)
+    f.pop()
+    f.page_done("did:plc:s2", 50, 30)
+    # Scores of the waiting entries are now stale; a restore must not re-rank them
+    f.push("did:plc:s2", seed("s2", strength=3), 0, cursor="p2")
+
+    restored = make()
+    restored.restore(f.state(), key_of)
+    assert restored.fresh == f.fresh
+    assert restored.seeds == f.seeds
+    restored.push("did:plc:new", seed("new"), 1)
+    f.push("did:plc:new", seed("new"), 1)
+    assert drain(restored) == drain(f)
+
+
+def test_restore_old_checkpoint_entries():
+    f = make()
+    f.restore({"entries": [[seed("a"), 0, None], [seed("b", strength=3), 0, None]],
+               "seeds": {}, "reviewed": 0, "matched": 0}, key_of)
+    assert [h for h, _ in drain(f)] == ["b", "a"]
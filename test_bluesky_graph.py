@@ -0,0 +1,109 @@
+"""
+Crawl snapshots: CSR construction, GraphBuilder.save / FollowGraph load
+(mmapped and byte-swapped) and k-hop queries.
+
+    python -m pytest -q test_bluesky_graph.py
+"""
+import json
+import random
+import sys
+from array import array
+
+import pytest
+
+import bluesky
+
+
+def person(n, bio=""):
+    return {"did": f"did:plc:n{n}", "handle": f"n{n}.bsky", "description": bio}
+
+
+# n0 -> n1, n2;  n1 -> n2, n3;  n2 -> n0;  n3 not expanded
+EDGES = {0: [1, 2], 1: [2, 3, 2], 2: [0]}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    b = bluesky.GraphBuilder()
+    b.intern("did:plc:n0", "n0.bsky", "root\tbio\nwith  whitespace")
+    for a, outs in EDGES.items():
+        b.add_follows(b.intern(f"did:plc:n{a}"), [person(j, bio=f"bio {j}") for j in outs] + [{"handle": "no-did"}])
+    b.save(tmp_path / "g", root="did:plc:n0", depth=2)
+    g = bluesky.FollowGraph(tmp_path / "g")
+    yield g
+    g.close()
+
+
+def test_build_csr_sorts_rows():
+    offsets, targets = bluesky._build_csr(4, array("I", [2, 0, 2, 0, 3]), array("I", [1, 3, 0, 1, 2]))
+    assert list(offsets) == [0, 2, 2, 4, 5]
+    assert list(targets) == [1, 3, 0, 1, 2]
+
+
+def test_build_csr_matches_adjacency_lists():
+    rnd = random.Random(7)
+    n = 50
+    keys, vals = array("I"), array("I")
+    adj = [[] for _ in range(n)]
+    for _ in range(400):
+        a, b = rnd.randrange(n), rnd.randrange(n)
+        keys.append(a)
+        vals.append(b)
+        adj[a].append(b)
+    offsets, targets = bluesky._build_csr(n, keys, vals)
+    for i in range(n):
+        assert list(targets[offsets[i]:offsets[i + 1]]) == sorted(adj[i])
+
+
+def test_snapshot_round_trip(snapshot):
+    g = snapshot
+    assert len(g) == 4
+    assert g.edges == 5  # the duplicate n1 -> n2 and the DID-less entry are dropped
+    assert g.header["root"] == "did:plc:n0" and g.header["expanded"] == 3
+    ids = {f"n{k}": g.node(f"did:plc:n{k}") for k in range(4)}
+    assert g.node("@n3.bsky") == ids["n3"] and g.node("nobody") is None
+    assert g.expanded == [True, True, True, False]
+    assert g.bios[ids["n0"]] == "root bio with whitespace"
+
+    name = {v: k for k, v in ids.items()}
+    assert sorted(name[j] for j in g.following(ids["n1"])) == ["n2", "n3"]
+    assert sorted(name[j] for j in g.followers(ids["n2"])) == ["n0", "n1"]
+    assert list(g.following(ids["n3"])) == []
+    assert (g.out_degree(ids["n0"]), g.in_degree(ids["n0"])) == (2, 1)
+
+
+def test_khop(snapshot):
+    g = snapshot
+    n = {k: g.node(f"did:plc:n{k}") for k in range(4)}
+    hops = g.khop(n[0], 2)
+    assert {k: hops[n[k]] for k in range(4)} == {0: 0, 1: 1, 2: 1, 3: 2}
+    assert g.khop(n[0], 1, direction="in") == {n[0]: 0, n[2]: 1}
+    assert set(g.khop(n[3], 1, direction="both")) == {n[3], n[1]}
+    assert g.khop(n[3], 5) == {n[3]: 0}
+
+
+def test_snapshot_from_other_byteorder(snapshot, tmp_path):
+    root = tmp_path / "g"
+    following = [list(snapshot.following(i)) for i in range(len(snapshot))]
+    followers = [list(snapshot.followers(i)) for i in range(len(snapshot))]
+    snapshot.close()
+    other = "big" if sys.byteorder == "little" else "little"
+    for name, code in (("out_offsets.bin", "Q"), ("out_targets.bin", "I"),
+                       ("in_offsets.bin", "Q"), ("in_targets.bin", "I")):
+        arr = array(code)
+        arr.frombytes((root / name).read_bytes())
+        arr.byteswap()
+        (root / name).write_bytes(arr.tobytes())
+    header = json.loads((root / "graph.json").read_text(encoding="utf-8"))
+    header["byteorder"] = other
+    (root / "graph.json").write_text(json.dumps(header), encoding="utf-8")
+
+    g = bluesky.FollowGraph(root)
+    assert [list(g.following(i)) for i in range(len(g))] == following
+    assert [list(g.followers(i)) for i in range(len(g))] == followers
+
+
+def test_rejects_other_formats(tmp_path):
+    (tmp_path / "graph.json").write_text(json.dumps({"format": "something-else"}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        bluesky.FollowGraph(tmp_path)
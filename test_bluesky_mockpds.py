@@ -0,0 +1,61 @@
+"""
+End-to-end checks of bluesky.py modes against the local mock PDS
+(bluesky_mockpds.py), served in-process on a free port (see conftest.py).
+
+    python -m pytest -q test_bluesky_mockpds.py
+"""
+import bluesky
+from conftest import run_bluesky
+
+
+def test_crawl_from_handle(mock_pds, tmp_path):
+    pds, url = mock_pds
+    out = run_bluesky(url, tmp_path, "-m", "crawl", "--actor", "user5.bench", "--degreelimit", "1",
+                      "--graph-dir", str(tmp_path / "graph"))
+    assert out.returncode == 0, out.stderr
+    assert "Could not resolve" not in out.stderr
+
+    g = bluesky.FollowGraph(tmp_path / "graph")
+    root = g.node("user5.bench")
+    assert g.header["root"] == pds.graph.did(5)
+    assert g.expanded[root]
+    assert sorted(g.dids[j] for j in g.following(root)) == sorted(pds.graph.did(j) for j in pds.graph.follows[5])
+
+
+def test_crawl_depth_two_respects_node_budget(mock_pds, tmp_path):
+    pds, url = mock_pds
+    out = run_bluesky(url, tmp_path, "-m", "crawl", "--degreelimit", "2", "--crawl-max-nodes", "8",
+                      "--concurrency", "2", "--graph-dir", str(tmp_path / "graph"))
+    assert out.returncode == 0, out.stderr
+
+    g = bluesky.FollowGraph(tmp_path / "graph")
+    assert sum(g.expanded) == 8
+    for i, d in enumerate(g.dids):
+        if g.expanded[i]:
+            j = pds.graph.index(d)
+            assert sorted(g.dids[k] for k in g.following(i)) == sorted(pds.graph.did(x) for x in pds.graph.follows[j])
+
+
+def test_wordmap_actors_with_worker_processes(mock_pds, tmp_path):
+    pds, url = mock_pds
+    actors = tmp_path / "actors.txt"
+    actors.write_text("user3.bench\n@user4.bench\n", encoding="utf-8")
+    out = run_bluesky(url, tmp_path, "-m", "wordmap", "--following", "--actors", str(actors),
+                      "--workers", "2", "--concurrency", "2", "--wordmap-dir", str(tmp_path / "maps"))
+    assert out.returncode == 0, out.stderr
+
+    for i in (3, 4):
+        header, counts, _ = bluesky.read_word_counts(tmp_path / "maps" / f"user{i}.bench.counts.tsv")
+        expected = bluesky.Counter()
+        for j in pds.graph.follows[i]:
+            expected.update(bluesky.wordmap_terms(pds.graph.profiles[j]["description"], 1))
+        assert header["accounts"] == len(pds.graph.follows[i])
+        assert counts == expected
+
+
+def test_expected_counts_by_handle_or_did(mock_pds):
+    pds, url = mock_pds
+    follows = len(pds.graph.follows[7])
+    followers = len(pds.graph.followers[7])
+    for actor in ("user7.bench", "@user7.bench", pds.graph.did(7)):
+        assert bluesky.expected_counts(url, "token", actor, "followsCount", "followersCount") == [follows, followers]
@@ -0,0 +1,90 @@
+"""
+mutuals: _sorted_unique (packed sort, runs merged without numpy),
+sorted_merge, and the three TSVs written against the mock PDS.
+
+    python -m pytest -q test_bluesky_mutuals.py
+"""
+import random
+import sys
+from array import array
+
+import pytest
+
+import bluesky
+from conftest import run_bluesky
+
+
+@pytest.fixture(params=["one run", "many runs"])
+def no_numpy(request, monkeypatch):
+    """Take the pure-Python path of _sorted_words, in one run or in many."""
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    if request.param == "many runs":
+        monkeypatch.setattr(bluesky, "SORT_RUN", 7)
+
+
+def reference(ids):
+    first = {}
+    for k, i in enumerate(ids):
+        first.setdefault(i, k)
+    unique = sorted(first)
+    return unique, [first[i] for i in unique]
+
+
+def test_sorted_unique_matches_reference(no_numpy):
+    rnd = random.Random(5)
+    ids = array("I", (rnd.randrange(40) for _ in range(200)))
+    ids.append(0xFFFFFFFF)
+    unique, pos = reference(ids)
+    out, out_pos = bluesky._sorted_unique(ids)
+    assert (list(out), list(out_pos)) == (unique, pos)
+
+
+def test_sorted_unique_without_positions(no_numpy):
+    ids = array("I", [9, 3, 9, 1, 3, 3, 0xFFFFFFFF, 1])
+    out, pos = bluesky._sorted_unique(ids, positions=False)
+    assert list(out) == [1, 3, 9, 0xFFFFFFFF]
+    assert pos is None
+
+
+def test_sorted_unique_empty(no_numpy):
+    out, pos = bluesky._sorted_unique(array("I"))
+    assert (list(out), list(pos)) == ([], [])
+    assert list(bluesky._sorted_unique(array("I"), positions=False)[0]) == []
+
+
+@pytest.mark.parametrize("a, b", [
+    ([], []),
+    ([1, 2, 3], []),
+    ([], [4, 5]),
+    ([1, 3, 5, 7], [2, 3, 4, 7, 9, 11]),
+    ([10, 20], [1, 2]),
+])
+def test_sorted_merge(a, b):
+    both, only_a, only_b = bluesky.sorted_merge(array("I", a), array("I", b))
+    assert list(both) == sorted(set(a) & set(b))
+    assert list(only_a) == sorted(set(a) - set(b))
+    assert list(only_b) == sorted(set(b) - set(a))
+
+
+def _tsv(path):
+    header, *rows = path.read_text(encoding="utf-8").splitlines()
+    return header.split("\t"), [row.split("\t") for row in rows]
+
+
+def test_mutuals_against_mock(mock_pds, tmp_path):
+    pds, url = mock_pds
+    g = pds.graph
+    out = run_bluesky(url, tmp_path, "-m", "mutuals", "--mutuals-dir", str(tmp_path / "m"), "--limit", "17")
+    assert out.returncode == 0, out.stderr
+
+    follows, followers = set(g.follows[pds.ME]), set(g.followers[pds.ME])
+    expected = {"mutuals": follows & followers, "not_following_back": follows - followers,
+                "fans": followers - follows}
+    for name, idx in expected.items():
+        header, rows = _tsv(tmp_path / "m" / f"{name}.tsv")
+        assert header[:2] == ["did", "handle"]
+        assert sorted((r[0], r[1]) for r in rows) == sorted((g.did(i), g.profiles[i]["handle"]) for i in idx)
+
+    header, rows = _tsv(tmp_path / "m" / "not_following_back.tsv")
+    assert header[-1] == "follow_uri"
+    assert all(r[2] == pds.follow_uris[g.index(r[0])] for r in rows)
@@ -0,0 +1,129 @@
+"""
+--policy decisions: DecisionPolicy rule order, PolicyRunner's checkpointed
+'ask' bucket, and the rules reaching candidates in degreesearch (mock PDS).
+
+    python -m pytest -q test_bluesky_policy.py
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import bluesky
+from conftest import run_bluesky
+
+
+def actor(name, bio="python and data"):
+    return {"did": f"did:plc:{name}", "handle": f"{name}.bsky", "description": bio}
+
+
+def policy(**rules):
+    return bluesky.DecisionPolicy(rules)
+
+
+@pytest.mark.parametrize("rules, who, hits, expected", [
+    # deny beats allow, allow beats every later rule
+    ({"allow": ["did:plc:x"], "deny": ["x.bsky"]}, actor("x"), ["python"], ("skip", "deny list")),
+    ({"allow": ["x.bsky"], "min_keyword_matches": 5}, actor("x", bio=""), [], ("follow", "allow list")),
+    # empty_bio is decided before keyword matching
+    ({"empty_bio": "ask"}, actor("x", bio=""), [], ("ask", "empty bio")),
+    ({}, actor("x", bio=" "), [], ("skip", "empty bio")),
+    ({"min_keyword_matches": 2}, actor("x"), ["python"], ("skip", "1 keyword match(es) < 2")),
+    # stats rules, then follow_keyword_matches
+    ({"min_posts": 10}, actor("x"), ["python"], ("ask", "no profile stats")),
+    ({"min_posts": 10, "missing_stats": "skip"}, actor("x"), ["python"], ("skip", "no profile stats")),
+    ({"follow_keyword_matches": 2}, actor("x"), ["python"], ("ask", "1 keyword match(es) < 2 for auto-follow")),
+    ({"follow_keyword_matches": 2}, actor("x"), ["python", "data"], ("follow", "all rules passed")),
+])
+def test_rule_order(rules, who, hits, expected):
+    assert policy(**rules).decide(who, hits) == expected
+
+
+@pytest.mark.parametrize("profile, expected", [
+    ({"postsCount": 3, "followersCount": 10, "followsCount": 10}, "skip"),
+    ({"postsCount": 50, "followersCount": 1, "followsCount": 100}, "skip"),
+    ({"postsCount": 50, "followersCount": 100, "followsCount": 100}, "follow"),
+])
+def test_stats_rules(profile, expected):
+    p = policy(min_posts=10, min_follower_ratio=0.5)
+    assert p.decide(actor("x"), ["python"], profile)[0] == expected
+
+
+def test_invalid_decision_is_rejected():
+    with pytest.raises(ValueError):
+        policy(empty_bio="maybe")
+
+
+def test_allow_file_is_relative_to_policy(tmp_path):
+    (tmp_path / "allow.txt").write_text("friend.bsky\n\n", encoding="utf-8")
+    (tmp_path / "policy.json").write_text(json.dumps({"allow_file": "allow.txt"}), encoding="utf-8")
+    p = bluesky.DecisionPolicy.load(tmp_path / "policy.json")
+    assert p.pre_decide(actor("friend", bio="")) == ("follow", "allow list")
+
+
+def test_runner_admits_only_follow_or_ask(tmp_path):
+    (tmp_path / "policy.json").write_text(json.dumps({"allow": ["friend.bsky"], "deny": ["foe.bsky"]}),
+                                          encoding="utf-8")
+    runner = bluesky.PolicyRunner(SimpleNamespace(policy=str(tmp_path / "policy.json")), "https://pds", "jwt", "test")
+    assert runner.admits(actor("friend", bio="no keywords here"))
+    assert not runner.admits(actor("foe"))
+    assert not runner.admits(actor("nobody", bio=""))  # empty_bio defaults to skip
+    assert not runner.admits(actor("other", bio="no keywords here"))
+
+
+def test_runner_state_round_trip(tmp_path):
+    (tmp_path / "policy.json").write_text(json.dumps({"follow_keyword_matches": 2}), encoding="utf-8")
+    args = SimpleNamespace(policy=str(tmp_path / "policy.json"), audit=str(tmp_path / "audit.jsonl"),
+                           review_file=str(tmp_path / "review.jsonl"))
+    runner = bluesky.PolicyRunner(args, "https://pds", "jwt", "degreesearch")
+    runner.decide(actor("a"), ["python"])
+    runner.decide(actor("b"), ["python", "data"])
+
+    resumed = bluesky.PolicyRunner(args, "https://pds", "jwt", "degreesearch")
+    resumed.restore(json.loads(json.dumps(runner.state())))
+    assert [d["actor"]["did"] for d in resumed.deferred] == ["did:plc:a"]
+    assert resumed.counts == runner.counts
+    resumed.finish(args, "did:plc:me")
+    resumed.finish(args, "did:plc:me")
+    lines = (tmp_path / "review.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["actor"]["did"] for l in lines] == ["did:plc:a"]
+    assert len((tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def _audit(path):
+    return [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_degreesearch_asks_about_empty_bios(fresh_mock, tmp_path):
+    pds, url = fresh_mock(follows_per=30)
+    (tmp_path / "kw.txt").write_text("python\ndata\nmusic\nclimate\n", encoding="utf-8")
+    (tmp_path / "policy.json").write_text(json.dumps({"empty_bio": "ask"}), encoding="utf-8")
+    out = run_bluesky(url, tmp_path, "-m", "degreesearch", "--keywords", str(tmp_path / "kw.txt"),
+                      "--policy", str(tmp_path / "policy.json"), "--audit", str(tmp_path / "audit.jsonl"),
+                      "--review-file", str(tmp_path / "review.jsonl"), "--limit", "25", "--page-budget", "3")
+    assert out.returncode == 0, out.stderr
+
+    empty = [r for r in _audit(tmp_path / "audit.jsonl") if r["reason"] == "empty bio"]
+    assert empty and all(r["decision"] == "ask" and r["matched"] == [] for r in empty)
+    assert all(pds.graph.profiles[pds.graph.index(r["did"])]["description"] == "" for r in empty)
+    queued = [json.loads(l)["actor"]["did"] for l in (tmp_path / "review.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert {r["did"] for r in empty} <= set(queued)
+
+
+def test_degreesearch_resume_does_not_requeue_reviewed_asks(fresh_mock, tmp_path):
+    _, url = fresh_mock(follows_per=30)
+    (tmp_path / "kw.txt").write_text("python\ndata\nmusic\nclimate\n", encoding="utf-8")
+    (tmp_path / "policy.json").write_text(json.dumps({"follow_keyword_matches": 2}), encoding="utf-8")
+    common = ["-m", "degreesearch", "--keywords", str(tmp_path / "kw.txt"), "--policy", str(tmp_path / "policy.json"),
+              "--review-file", str(tmp_path / "review.jsonl"), "--checkpoint", str(tmp_path / "ck.json"),
+              "--limit", "10", "--degreelimit", "2"]
+    first = run_bluesky(url, tmp_path, *common, "--page-budget", "2", "--audit", str(tmp_path / "a1.jsonl"))
+    assert first.returncode == 0, first.stderr
+    resumed = run_bluesky(url, tmp_path, *common, "--page-budget", "5", "--audit", str(tmp_path / "a2.jsonl"),
+                          "--resume")
+    assert resumed.returncode == 0, resumed.stderr
+
+    asked = [r["did"] for path in ("a1.jsonl", "a2.jsonl") for r in _audit(tmp_path / path) if r["decision"] == "ask"]
+    queued = [json.loads(l)["actor"]["did"] for l in (tmp_path / "review.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert asked
+    assert queued == asked
@@ -0,0 +1,95 @@
+"""
+Compact seen-sets: DidInterner, IdSet and BloomSet, including the
+checkpoint state round-trip through restore_seen_set.
+
+    python -m pytest -q test_bluesky_seensets.py
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import bluesky
+
+
+def plc(n):
+    # did:plc identifiers are 24 base32 characters
+    alphabet = "abcdefghijklmnopqrstuvwxyz234567"
+    tail = ""
+    for _ in range(24):
+        n, r = divmod(n, 32)
+        tail += alphabet[r]
+    return "did:plc:" + tail
+
+
+KEYS = [plc(n * 7919) for n in range(3000)] + ["did:web:example.com", "someone.bsky.social", "did:plc:short"]
+
+
+def test_interner_ids_are_dense_and_stable():
+    interner = bluesky.DidInterner()
+    ids = [interner.intern(k) for k in KEYS]
+    assert ids == list(range(len(KEYS)))
+    assert [interner.intern(k) for k in KEYS] == ids
+    assert [interner.key(i) for i in ids] == KEYS
+    assert interner.get("did:plc:" + "z" * 24) is None
+    assert "did:web:example.com" in interner and "other.bsky" not in interner
+
+
+def test_id_set_round_trip():
+    interner = bluesky.DidInterner()
+    seen = bluesky.IdSet(interner)
+    seen.update(KEYS[::3])
+    seen.add(KEYS[0])
+    assert len(seen) == len(KEYS[::3])
+    assert all(k in seen for k in KEYS[::3])
+    assert not any(k in seen for k in KEYS[1::3])
+
+    restored = bluesky.IdSet(bluesky.DidInterner())
+    bluesky.restore_seen_set(restored, json.loads(json.dumps(seen.state())))
+    assert sorted(restored) == sorted(KEYS[::3])
+    assert len(restored) == len(seen)
+
+
+def test_id_sets_share_one_interner():
+    interner = bluesky.DidInterner()
+    a, b = bluesky.IdSet(interner), bluesky.IdSet(interner)
+    a.add(KEYS[5])
+    b.add(KEYS[9])
+    assert KEYS[5] not in b and KEYS[9] not in a
+    assert len(interner) == 2
+
+
+def test_bloom_set_has_no_false_negatives_and_few_false_positives():
+    bloom = bluesky.BloomSet(fp_rate=0.01, capacity=1000)
+    bloom.update(KEYS[:2000])
+    # A new key that already tests positive is not counted again
+    assert 1980 <= len(bloom) <= 2000
+    assert len(bloom.layers) > 1  # grew past its first layer
+    assert all(k in bloom for k in KEYS[:2000])
+    false_pos = sum(k in bloom for k in KEYS[2000:])
+    assert false_pos <= 0.03 * len(KEYS[2000:])
+
+
+def test_bloom_state_round_trip():
+    args = SimpleNamespace(seen_set="bloom", bloom_fp_rate=0.001, bloom_capacity=1000)
+    bloom = bluesky.make_seen_set(args)
+    bloom.update(KEYS[:1500])
+
+    restored = bluesky.make_seen_set(args)
+    bluesky.restore_seen_set(restored, json.loads(json.dumps(bloom.state())))
+    assert len(restored) == len(bloom)
+    assert [k in restored for k in KEYS] == [k in bloom for k in KEYS]
+    restored.add(KEYS[2000])
+    assert KEYS[2000] in restored
+
+
+def test_bloom_checkpoint_needs_bloom_run():
+    bloom = bluesky.BloomSet(capacity=1000)
+    bloom.add(KEYS[0])
+    with pytest.raises(SystemExit):
+        bluesky.restore_seen_set(bluesky.IdSet(bluesky.DidInterner()), bloom.state())
+
+
+def test_invalid_fp_rate():
+    with pytest.raises(ValueError):
+        bluesky.BloomSet(fp_rate=1.5)
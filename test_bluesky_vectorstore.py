@@ -0,0 +1,72 @@
+"""
+VectorStore (vectorize --vector-layout shards): shared vocabulary, DID
+index, re-adds and the export back to per-account bsky-vec-1 files.
+
+    python -m pytest -q test_bluesky_vectorstore.py
+"""
+import gzip
+import json
+
+import bluesky
+
+
+def _payload(did, bio):
+    return {"filename": did.replace(":", "_"), "md5": "0", "meta": {"did": did},
+            "token_counts": bluesky._bsky_text_to_counts(bio, bluesky._bsky_builtin_analyzer)}
+
+
+def test_vector_store_vocabulary(tmp_path):
+    store = bluesky.VectorStore(tmp_path / "store")
+    store.add(_payload("did:plc:a", "Python data science"))
+    store.add(_payload("did:plc:b", "data engineering python"))
+    store.close()
+
+    reader = bluesky.VectorStoreReader(tmp_path / "store")
+    assert reader.vocab == ["python", "data", "science", "python data", "data science",
+                            "engineering", "data engineering", "engineering python"]
+    assert reader.get("did:plc:b")["token_counts"] == {
+        "data": 1, "engineering": 1, "python": 1, "data engineering": 1, "engineering python": 1,
+    }
+    assert reader.get("did:plc:missing") is None
+
+
+def test_vector_store_blocks_and_shards(tmp_path):
+    store = bluesky.VectorStore(tmp_path / "store", shard_size=3, block_size=2)
+    for n in range(7):
+        store.add(_payload(f"did:plc:{n}", f"genomics term{n}"))
+    store.close()
+
+    reader = bluesky.VectorStoreReader(tmp_path / "store")
+    assert len(reader.shards) > 1
+    assert len(reader) == 7
+    for n in range(7):
+        assert reader.get(f"did:plc:{n}")["token_counts"][f"term{n}"] == 1
+    assert sorted(p["meta"]["did"] for p in reader) == [f"did:plc:{n}" for n in range(7)]
+
+
+def test_vector_store_append_replaces_record(tmp_path):
+    store = bluesky.VectorStore(tmp_path / "store")
+    store.add(_payload("did:plc:a", "python"))
+    store.close()
+    store = bluesky.VectorStore(tmp_path / "store", append=True)
+    store.add(_payload("did:plc:a", "climate policy"))
+    store.close()
+
+    reader = bluesky.VectorStoreReader(tmp_path / "store")
+    assert len(reader) == 1
+    assert reader.get("did:plc:a")["token_counts"] == {"climate": 1, "policy": 1, "climate policy": 1}
+    assert [p["token_counts"] for p in reader] == [{"climate": 1, "policy": 1, "climate policy": 1}]
+
+
+def test_export_legacy_vectors(tmp_path):
+    store = bluesky.VectorStore(tmp_path / "store")
+    store.add(_payload("did:plc:a", "Python data"))
+    store.close()
+
+    written, skipped = bluesky.export_legacy_vectors(tmp_path / "store", tmp_path / "out")
+    assert (written, skipped) == (1, 0)
+    with gzip.open(tmp_path / "out" / "did_plc_a.pdfvec.json.gz", "rt", encoding="utf-8") as fh:
+        payload = json.load(fh)
+    assert payload["version"] == "bsky-vec-1"
+    assert payload["token_counts"] == {"python": 1, "data": 1, "python data": 1}
+    assert bluesky.export_legacy_vectors(tmp_path / "store", tmp_path / "out") == (0, 1)
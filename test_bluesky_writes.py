@@ -0,0 +1,83 @@
+"""
+WriteBatcher replay rules: which applyWrites failures are replayed per op,
+and which are reported as failed without re-sending anything.
+
+    python -m pytest -q test_bluesky_writes.py
+"""
+import pytest
+
+import bluesky
+
+
+class FakeServer:
+    """Stands in for run_curl: answers applyWrites with `batch_error` (or success)."""
+
+    def __init__(self, batch_error=None, bad_subject=None):
+        self.batch_error = batch_error
+        self.bad_subject = bad_subject
+        self.calls = []
+
+    def __call__(self, method, url, headers=None, data=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls.append(endpoint)
+        if endpoint == "com.atproto.repo.applyWrites":
+            if self.batch_error is not None:
+                raise self.batch_error
+            return {"results": [{"uri": f"at://me/{w['collection']}/{n}"} for n, w in enumerate(data["writes"])]}
+        if endpoint == "com.atproto.repo.createRecord":
+            if data["record"].get("subject") == self.bad_subject:
+                raise bluesky.XrpcError("rejected", error="InvalidRequest", status=400)
+            return {"uri": f"at://me/{data['collection']}/one"}
+        if endpoint == "com.atproto.repo.deleteRecord":
+            return {}
+        raise AssertionError(f"unexpected call {url}")
+
+
+def run_batch(monkeypatch, server, subjects=("did:plc:a", "did:plc:b", "did:plc:c")):
+    monkeypatch.setattr(bluesky, "run_curl", server)
+    results = []
+    with bluesky.WriteBatcher("https://pds", "jwt", "did:plc:me",
+                              on_result=lambda tag, ok, info: results.append((tag, ok))) as writes:
+        for s in subjects:
+            writes.follow(s, tag=s)
+    return results
+
+
+def test_batch_success_reports_every_op(monkeypatch):
+    server = FakeServer()
+    assert run_batch(monkeypatch, server) == [("did:plc:a", True), ("did:plc:b", True), ("did:plc:c", True)]
+    assert server.calls == ["com.atproto.repo.applyWrites"]
+
+
+def test_rejected_batch_is_replayed_per_op(monkeypatch):
+    server = FakeServer(bluesky.XrpcError("bad op", error="InvalidRequest", status=400), bad_subject="did:plc:b")
+    assert run_batch(monkeypatch, server) == [("did:plc:a", True), ("did:plc:b", False), ("did:plc:c", True)]
+    assert server.calls == ["com.atproto.repo.applyWrites"] + ["com.atproto.repo.createRecord"] * 3
+
+
+@pytest.mark.parametrize("status", [500, 502, 429, 401])
+def test_unknown_outcome_is_never_resent(monkeypatch, status):
+    # A 5xx may come after the batch was committed, 429/401 were already
+    # retried by run_curl: report failure, send nothing more.
+    server = FakeServer(bluesky.XrpcError("boom", error="InternalServerError", status=status))
+    assert run_batch(monkeypatch, server) == [("did:plc:a", False), ("did:plc:b", False), ("did:plc:c", False)]
+    assert server.calls == ["com.atproto.repo.applyWrites"]
+
+
+def test_network_error_is_never_resent(monkeypatch):
+    server = FakeServer(ConnectionResetError("reset"))
+    assert run_batch(monkeypatch, server) == [("did:plc:a", False), ("did:plc:b", False), ("did:plc:c", False)]
+    assert server.calls == ["com.atproto.repo.applyWrites"]
+
+
+def test_batches_split_at_max_per_call(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(bluesky, "run_curl", server)
+    results = []
+    with bluesky.WriteBatcher("https://pds", "jwt", "did:plc:me", max_per_call=2,
+                              on_result=lambda tag, ok, info: results.append(tag)) as writes:
+        for n in range(5):
+            writes.follow(f"did:plc:{n}", tag=n)
+        writes.unfollow("at://did:plc:me/app.bsky.graph.follow/3abc", tag="un")
+    assert results == [0, 1, 2, 3, 4, "un"]
+    assert server.calls == ["com.atproto.repo.applyWrites"] * 3